@@ -0,0 +1,100 @@
+# app/checkpoint.py
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from app.review_strategy import PROMPT_VERSION
+from app.settings import settings
+
+
+def batch_key(batch: List[Dict]) -> str:
+    """
+    Content hash of every prompt input of a batch (prompt version, review model,
+    files, parts, patches, scope context and static findings), stable across reruns.
+    """
+    h = hashlib.sha1()
+    h.update(f"{PROMPT_VERSION}\0{settings.openai_model}\0".encode("utf-8"))
+    for p in batch:
+        h.update(
+            f"{p['filename']}\0{p.get('part', 0)}/{p.get('parts', 0)}\0".encode("utf-8")
+        )
+        h.update(p["patch"].encode("utf-8"))
+        h.update(b"\0")
+        h.update((p.get("context") or "").encode("utf-8"))
+        h.update(b"\0")
+        found = p.get("static_findings") or []
+        h.update(json.dumps(found, sort_keys=True).encode("utf-8"))
+        h.update(b"\1")
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """
+    Append-only JSONL journal of one review run, keyed by repo, PR and head SHA:
+
+        {"type": "llm", "key": <batch_key>, "result": {text, finish_reason, ...}}
+        {"type": "posted", "key": <batch_key>, "kind": "review"|"comment", "ids": [...]}
+
+    A rerun reuses recorded LLM results and skips batches that were already posted,
+    so it resumes at the first incomplete batch. `path=None` disables journaling.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.llm: Dict[str, Dict] = {}
+        self.posted: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def for_run(
+        cls, repo: str, pr_number: int, head_sha: Optional[str]
+    ) -> "Checkpoint":
+        # Without the head SHA a journal could be replayed against a different diff
+        if not settings.checkpoint_dir or not head_sha:
+            return cls(None)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{repo}-{pr_number}-{head_sha}")
+        return cls(os.path.join(settings.checkpoint_dir, f"{slug}.jsonl"))
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a killed run
+                    continue
+                if rec.get("type") == "llm":
+                    self.llm[rec["key"]] = rec["result"]
+                elif rec.get("type") == "posted":
+                    self.posted[rec["key"]] = rec
+
+    def _append(self, rec: Dict) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            # Journaling is best-effort; the review itself must not fail on it
+            print(f"Checkpoint write skipped: {e}")
+
+    def llm_result(self, key: str) -> Optional[Dict]:
+        return self.llm.get(key)
+
+    def record_llm(self, key: str, result: Dict) -> None:
+        self.llm[key] = result
+        self._append({"type": "llm", "key": key, "result": result})
+
+    def is_posted(self, key: str) -> bool:
+        return key in self.posted
+
+    def record_post(self, key: str, kind: str, ids: List) -> None:
+        rec = {"type": "posted", "key": key, "kind": kind, "ids": ids}
+        self.posted[key] = rec
+        self._append(rec)
@@ -1,7 +1,12 @@
 import asyncio
+import contextlib
 import json
 import os
-from typing import List, Dict
+import re
+import time
+from typing import Iterable, List, Dict, Optional, Tuple
+
+import httpx
 
 from app.settings import settings
 from app.services.github import GitHubClient
@@ -12,13 +17,36 @@ from app.review_strategy import (
     parse_llm_json_or_fallback,
     RULES_PREAMBLE,
 )
-from app.inline_mapper import guess_line_for_hint
+from app.inline_mapper import commentable_lines, guess_line_for_hint
 from app.file_filters import should_include
-from app.diff_slimmer import slim_patch_to_changed  # <-- slimming helper
+from app.diff_slimmer import slim_patch_to_changed, split_patch_by_hunks
+from app.diff_compactor import compact_patch
+from app.structural_slimmer import slimmer_for
+from app.hunk_dedup import dedup_hunks, fan_out_line
+from app.file_priority import rank_candidates
+from app.pr_files import PRFile
+from app.local_diff import iter_local_files
+from app.scope_context import (
+    BlobCache,
+    add_scope_context,
+    api_blob_reader,
+    local_blob_reader,
+)
+from app.token_budget import split_batch
+from app.triage import TriageCache, triage_patches
+from app.static_checks import run_static_checks
+from app.checkpoint import Checkpoint, batch_key
+from app.comment_sync import CommentSync, with_marker
+from app.findings import SEVERITIES, FindingsTable
+from app.findings_db import record_run
+from app.live_summary import LiveSummary
+from app.report_stream import REPORT_STREAM_FILE, STREAM_VERSION, ReportStream
 
 SEVERITY_ORDER = {"low": 1, "medium": 2, "high": 3}
 STATUS_FILE = ".review_event"
 REPORT_FILE = ".review_report.json"
+# GitHub rejects review/comment bodies longer than this
+GITHUB_MAX_BODY_CHARS = 65536
 
 
 def _write_event(event: str):
@@ -37,10 +65,22 @@ def _write_report(report: dict):
         pass
 
 
+@contextlib.contextmanager
+def _timed(timings: Optional[Dict[str, List[float]]], stage: str):
+    """Append the wall time of the block to timings[stage] (reported per run)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.setdefault(stage, []).append(round(time.perf_counter() - t0, 6))
+
+
 def _truncate_patch(patch: str, max_chars: int) -> str:
     if patch and len(patch) > max_chars:
         tail = "\n\n...[truncated]..."
-        return patch[: max_chars - len(tail)] + tail
+        # A precision format builds the cut string in one copy (no slice + concat)
+        return f"{patch:.{max(0, max_chars - len(tail))}}{tail}"
     return patch or ""
 
 
@@ -51,27 +91,22 @@ def _markdown_header() -> str:
     return hdr
 
 
-def _decision_from_severities(files: List[Dict]) -> str:
-    """Compute a decision based on the configured gate and comment severities."""
+def _decision_from_severity(most_severe: int) -> str:
+    """Compute a decision from the configured gate and the highest severity code."""
     gate = (settings.severity_gate or "off").lower()
     if gate == "off":
         return "comment"
     threshold = SEVERITY_ORDER.get(gate, 3)  # default "high"
-    most_severe = 0
-    for f in files:
-        for c in f.get("comments", []):
-            sev = SEVERITY_ORDER.get(str(c.get("severity", "medium")).lower(), 2)
-            most_severe = max(most_severe, sev)
     return "request_changes" if most_severe >= threshold else "comment"
 
 
 def chunk_patches(patches: List[Dict], max_chars: int) -> List[List[Dict]]:
-    """Greedy chunking of patches so each batch stays under max_chars."""
+    """Greedy chunking of patches (and their scope context) under max_chars per batch."""
     batches: List[List[Dict]] = []
     cur: List[Dict] = []
     cur_len = 0
     for p in patches:
-        plen = len(p["patch"])
+        plen = len(p["patch"]) + len(p.get("context", ""))
         if cur and cur_len + plen > max_chars:
             batches.append(cur)
             cur = []
@@ -83,59 +118,379 @@ def chunk_patches(patches: List[Dict], max_chars: int) -> List[List[Dict]]:
     return batches
 
 
+_CHANGE_LINE_RE = re.compile(r"^(?:\+(?!\+\+)|-(?!--))", re.M)
+
+
+def _split_text(text: str, max_chars: int) -> List[str]:
+    """Split at line boundaries into pieces of <= max_chars (hard-cut overlong lines)."""
+    pieces: List[str] = []
+    cur = ""
+    for ln in text.splitlines(keepends=True):
+        while len(ln) > max_chars:
+            if cur:
+                pieces.append(cur)
+                cur = ""
+            pieces.append(ln[:max_chars])
+            ln = ln[max_chars:]
+        if len(cur) + len(ln) > max_chars:
+            pieces.append(cur)
+            cur = ""
+        cur += ln
+    if cur or not pieces:
+        pieces.append(cur)
+    return pieces
+
+
+def chunk_review(
+    body: str, comments: List[Dict], max_body_chars: int, max_comments: int
+) -> List[Tuple[str, List[Dict]]]:
+    """
+    Split one review into as few (body, comments) payloads as GitHub accepts:
+    bodies of <= max_body_chars and <= max_comments inline comments each.
+    Continuation payloads are marked "(continued i/n)".
+    """
+    marker_room = 40
+    bodies = _split_text(body, max(1, max_body_chars - marker_room))
+    step = max(1, max_comments)
+    groups = [comments[i : i + step] for i in range(0, len(comments), step)] or [[]]
+    n = max(len(bodies), len(groups))
+    out: List[Tuple[str, List[Dict]]] = []
+    for i in range(n):
+        part = bodies[i] if i < len(bodies) else ""
+        if i:
+            part = f"_(continued {i + 1}/{n})_\n\n{part}"
+        out.append((part, groups[i] if i < len(groups) else []))
+    return out
+
+
 def _has_changes(p: str) -> bool:
     """Return True if unified diff has at least one real added/removed line."""
-    for ln in p.splitlines():
-        if ln.startswith("+") and not ln.startswith("+++"):
-            return True
-        if ln.startswith("-") and not ln.startswith("---"):
-            return True
-    return False
-
-
-def _merge_hist(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
-    out = dict(a)
-    for k, v in b.items():
-        out[k] = out.get(k, 0) + int(v)
+    # Scans the string in place instead of materializing its lines
+    return bool(_CHANGE_LINE_RE.search(p or ""))
+
+
+def _batch_metrics(
+    parsed: Dict, findings: FindingsTable, rows: Tuple[int, int]
+) -> Dict:
+    """Severity histogram and counts of one batch, from its rows of the findings table."""
+    return {
+        "severity_histogram": findings.histogram(*rows),
+        "files_count": len(parsed.get("files", [])),
+        "comments_count": rows[1] - rows[0],
+    }
+
+
+def _prepare_candidates(files: Iterable[PRFile]) -> List[Dict]:
+    """
+    Filter PR files and slim/compact their patches; returns [{filename, patch, ...}].
+    Each record's raw patch is released as it is consumed and no raw copy is kept
+    (slimmed hunks carry exact line numbers), so the raw and slimmed copies of the
+    whole PR are never held at the same time.
+    """
+    candidates: List[Dict] = []
+    for f in files:
+        f = PRFile.from_api(f)
+        fname = f.filename
+        if not fname:
+            continue
+        if not should_include(fname, settings.include_globs, settings.exclude_globs):
+            f.release_patch()
+            continue
+        if not f.patch:
+            continue
+
+        # Slim to only changed lines with N lines of context; drop hunks with ignore marker.
+        # IMPORTANT: only slim when there are real +/- changes; otherwise keep patch as-is
+        slimmed = f.release_patch()
+        if settings.only_changed_lines and _has_changes(slimmed):
+            # Languages with a structural slimmer keep enclosing signatures instead
+            # of relying on fixed context windows alone
+            structural = slimmer_for(fname) if settings.structural_slimming else None
+            if structural is not None:
+                slimmed = structural(
+                    slimmed,
+                    settings.changed_context_lines,
+                    settings.ignore_inline_marker or None,
+                )
+            else:
+                slimmed = slim_patch_to_changed(
+                    patch=slimmed,
+                    ctx=settings.changed_context_lines,
+                    marker=(settings.ignore_inline_marker or None),
+                    # Keep output stable for tests that check string suffix exactly
+                    trailing_newline=False,
+                )
+
+        # If slimming removed everything (e.g., all hunks had ignore marker), skip file
+        if not slimmed.strip():
+            continue
+
+        # Collapse whitespace-only, reordered, moved and renamed lines into annotations.
+        # A patch left with annotations only is still reviewed: the annotations say
+        # what changed and the model (or triage) decides whether it matters.
+        if settings.compact_diffs and _has_changes(slimmed):
+            slimmed = compact_patch(
+                slimmed,
+                min_move_lines=settings.compact_min_move_lines,
+                filename=fname,
+            )
+
+        # Keep GitHub's change stats for prioritization
+        entry = {"filename": fname, "patch": slimmed, **f.stats()}
+        if f.sha:
+            entry["sha"] = f.sha  # lets scope context fetch the file's contents
+        candidates.append(entry)
+    return candidates
+
+
+def _select_within_budget(
+    candidates: List[Dict], skipped: Optional[List[Dict]] = None
+) -> List[Dict]:
+    """
+    Split oversized diffs at hunk boundaries and take files in order until
+    `max_files` is reached; files that no longer fit `max_total_patch_chars`
+    are skipped so smaller ones further down can still fill the budget.
+    Every skipped file or dropped part is appended to `skipped` (reported per run).
+    """
+
+    def _skip(fname: str, reason: str, dropped: int = 0, parts: int = 0) -> None:
+        if skipped is not None:
+            entry: Dict = {"filename": fname, "reason": reason}
+            if parts:
+                entry.update({"parts_dropped": dropped, "parts": parts})
+            skipped.append(entry)
+
+    selected: List[Dict] = []
+    total_chars = 0
+    files_taken = 0
+    for c in candidates:
+        fname = c["filename"]
+        # Oversized diffs are split at hunk boundaries instead of being cut mid-hunk;
+        # only a single hunk that alone exceeds the cap still gets truncated.
+        parts = [
+            _truncate_patch(part, settings.max_patch_chars)
+            for part in split_patch_by_hunks(c["patch"], settings.max_patch_chars)
+        ]
+        n_parts = len(parts)
+        max_parts = max(1, settings.max_parts_per_file)
+        if n_parts > max_parts:
+            parts = parts[:max_parts]
+            print(
+                f"{fname}: reviewing {max_parts}/{n_parts} part(s) (max_parts_per_file)."
+            )
+            _skip(fname, "max_parts_per_file", n_parts - max_parts, n_parts)
+
+        # Respect total cap using the slimmed size
+        if total_chars + len(parts[0]) > settings.max_total_patch_chars and selected:
+            print(f"{fname}: skipped, over the total patch budget.")
+            _skip(fname, "over_total_budget")
+            continue
+
+        for i, part in enumerate(parts, start=1):
+            if total_chars + len(part) > settings.max_total_patch_chars and i > 1:
+                print(
+                    f"{fname}: total cap reached; reviewing {i - 1}/{len(parts)} part(s)."
+                )
+                _skip(fname, "total_budget_reached", n_parts - (i - 1), n_parts)
+                break
+            entry = dict(c, patch=part)
+            if len(parts) > 1:
+                entry.update({"part": i, "parts": len(parts)})
+            selected.append(entry)
+            total_chars += len(part)
+        files_taken += 1
+        if files_taken >= settings.max_files:
+            break
+    return selected
+
+
+def _patches_by_filename(batch: List[Dict]) -> Dict[str, str]:
+    """Map filename -> patch, joining the hunk parts of split files in order."""
+    out: Dict[str, str] = {}
+    for p in batch:
+        fname = p["filename"]
+        out[fname] = f"{out[fname]}\n{p['patch']}" if fname in out else p["patch"]
     return out
 
 
-def _metrics_from_parsed(parsed: Dict) -> Dict:
+def _split_truncated(batch: List[Dict]) -> List[List[Dict]]:
     """
-    Build severity histogram and counts from the parsed LLM JSON:
-    {
-      files: [
-        { filename, comments: [{severity: low|medium|high, ...}, ...] },
-        ...
-      ]
-    }
+    Smaller batches to retry a cut-off batch with: halves of the batch, or for a
+    single patch, its hunks in two or more parts. [batch] when it cannot be split.
     """
-    severity = {"low": 0, "medium": 0, "high": 0}
-    files_count = 0
-    comments_count = 0
+    if len(batch) > 1:
+        return split_batch(batch)
+    p = batch[0]
+    parts = split_patch_by_hunks(p["patch"], len(p["patch"]) // 2 + 1)
+    if len(parts) < 2:
+        return [batch]
+    # An already split file keeps its part number; pieces are merged back by
+    # filename for line mapping either way
+    if p.get("parts"):
+        return [[dict(p, patch=part)] for part in parts]
+    return [
+        [dict(p, patch=part, part=i, parts=len(parts))]
+        for i, part in enumerate(parts, start=1)
+    ]
 
-    for f in parsed.get("files", []):
-        files_count += 1
-        for c in f.get("comments", []):
-            sev = str(c.get("severity", "medium")).lower()
-            if sev not in severity:
-                sev = "medium"
-            severity[sev] += 1
-            comments_count += 1
 
-    return {
-        "severity_histogram": severity,
-        "files_count": files_count,
-        "comments_count": comments_count,
-    }
+async def _review_batch(
+    llm: LLMClient,
+    batch: List[Dict],
+    sem: asyncio.Semaphore,
+    timings: Optional[Dict[str, List[float]]] = None,
+    ckpt: Optional[Checkpoint] = None,
+) -> List[Tuple[List[Dict], Dict]]:
+    """
+    Run the LLM on one batch in a worker thread. If the response was cut off at the
+    token budget, split the batch (or a lone file's hunks) and review the parts
+    instead; an unsplittable result is returned truncated. Results recorded by
+    an earlier run of the same PR head (checkpoint journal) are reused.
+    Returns [(batch, result), ...] in batch order.
+    """
+    key = batch_key(batch)
+    result = ckpt.llm_result(key) if ckpt is not None else None
+    if result is not None:
+        print(f"Reusing checkpointed LLM result for a batch of {len(batch)} patch(es).")
+    else:
+        system, user = build_llm_prompt_from_patches(batch)
+        async with sem:
+            with _timed(timings, "llm_batch"):
+                result = await asyncio.to_thread(
+                    llm.review_patches_json, batch, system, user
+                )
+        if ckpt is not None:
+            ckpt.record_llm(key, result)
+    if result.get("finish_reason") == "length" and settings.split_batches_on_truncation:
+        parts = _split_truncated(batch)
+        if len(parts) > 1:
+            print(
+                f"Response truncated at max_tokens={result.get('max_tokens')}; "
+                f"splitting batch of {len(batch)} patch(es) into {len(parts)} "
+                "part(s) and retrying."
+            )
+            halves = await asyncio.gather(
+                *(_review_batch(llm, h, sem, timings, ckpt) for h in parts)
+            )
+            return [pair for pairs in halves for pair in pairs]
+    return [(batch, result)]
+
+
+def _id_of(response) -> List:
+    return [response.get("id")] if isinstance(response, dict) else []
 
 
 async def _post_single_comment(
-    gh: GitHubClient, repo: str, pr_number: int, body: str, event: str
-):
+    gh: GitHubClient,
+    repo: str,
+    pr_number: int,
+    body: str,
+    event: str,
+    sync: Optional[CommentSync] = None,
+    key: Optional[str] = None,
+) -> List:
+    """
+    Returns the comment's id (as a list, like _post_inline_review). With `sync` and a
+    stable `key`, the comment an earlier run posted for the same key is edited instead.
+    """
     # event is "COMMENT" or "REQUEST_CHANGES" — we still post a single issue comment for visibility
     _write_event(event)
-    await gh.post_issue_comment(repo, pr_number, body)
+    if sync is not None and key:
+        return _id_of(await sync.upsert(key, body))
+    return _id_of(await gh.post_issue_comment(repo, pr_number, body))
+
+
+def _pending_conflict(e: httpx.HTTPStatusError) -> bool:
+    # A pending review of the bot's user already exists (left over by another run):
+    # probes would all fail for that reason, not because of their comments
+    return "pending review" in e.response.text.lower()
+
+
+async def _find_unplaceable(
+    gh_reviews: GitHubReviewsClient,
+    repo: str,
+    pr_number: int,
+    comments_payload: List[Dict],
+    known_rejected: bool = False,
+) -> List[Dict]:
+    """
+    Bisect the comments with pending (event-less, unpublished) reviews that are
+    deleted right away, isolating the ones GitHub answers 422 for. With
+    `known_rejected` the probe of the whole list is skipped.
+    """
+    if not known_rejected:
+        try:
+            res = await gh_reviews.create_review(
+                repo=repo,
+                pull_number=pr_number,
+                body="",
+                comments=comments_payload,
+                event=None,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 422 or _pending_conflict(e):
+                raise
+        else:
+            await gh_reviews.delete_pending_review(repo, pr_number, res["id"])
+            return []
+        if len(comments_payload) <= 1:
+            return list(comments_payload)
+    mid = len(comments_payload) // 2
+    rejected = await _find_unplaceable(
+        gh_reviews, repo, pr_number, comments_payload[:mid]
+    )
+    return rejected + await _find_unplaceable(
+        gh_reviews, repo, pr_number, comments_payload[mid:]
+    )
+
+
+async def _create_review_bisect(
+    gh_reviews: GitHubReviewsClient,
+    repo: str,
+    pr_number: int,
+    body: str,
+    comments_payload: List[Dict],
+    event: str,
+) -> Tuple[Optional[Dict], List[Dict]]:
+    """
+    Post one review. When GitHub answers 422 (a comment it cannot place), probe the
+    comments for the bad ones, drop them and post a single review with the rest.
+    Returns (review, rejected comments); review is None when every comment was
+    rejected. A 422 not caused by the comments is re-raised. Reviews of one PR are
+    posted one at a time, as GitHub allows a single pending review per user.
+    """
+    async with gh_reviews.pending_review_lock(repo, pr_number):
+        try:
+            res = await gh_reviews.create_review(
+                repo=repo,
+                pull_number=pr_number,
+                body=body,
+                comments=comments_payload,
+                event=event,
+            )
+            return res, []
+        except httpx.HTTPStatusError as e:
+            if (
+                e.response.status_code != 422
+                or not comments_payload
+                or _pending_conflict(e)
+            ):
+                raise
+            error = e
+        # A lone comment is probed on its own; a longer list starts with its halves
+        rejected = await _find_unplaceable(
+            gh_reviews, repo, pr_number, comments_payload, len(comments_payload) > 1
+        )
+        if not rejected:
+            # Every comment places fine: the body or event is what GitHub refuses
+            raise error
+        kept = [c for c in comments_payload if not any(c is r for r in rejected)]
+        if not kept:
+            return None, rejected
+        res = await gh_reviews.create_review(
+            repo=repo, pull_number=pr_number, body=body, comments=kept, event=event
+        )
+        return res, rejected
 
 
 async def _post_inline_review(
@@ -146,216 +501,626 @@ async def _post_inline_review(
     body: str,
     comments_payload: List[Dict],
     event: str,
-):
+    sync: Optional[CommentSync] = None,
+    key: Optional[str] = None,
+) -> Tuple[str, List]:
+    """Returns ("review", review ids) or ("comment", [comment id]) after a fallback."""
+    # Marked like the issue comments so a rerun can edit this summary in place
+    review_body = with_marker(body, key) if sync is not None and key else body
     try:
-        await gh_reviews.create_review(
-            repo=repo,
-            pull_number=pr_number,
-            body=body,
-            comments=comments_payload,
-            event=event,
-        )
-        _write_event(event)
-        print(
-            f"Posted PR review with {len(comments_payload)} inline comment(s), event={event}."
+        review, rejected = await _create_review_bisect(
+            gh_reviews, repo, pr_number, review_body, comments_payload, event
         )
     except Exception as e:
         print(f"Inline review failed ({e}); falling back to single comment.")
-        await _post_single_comment(gh, repo, pr_number, body, event)
+        return "comment", await _post_single_comment(
+            gh, repo, pr_number, body, event, sync, key
+        )
+    if review is None:
+        print("GitHub rejected every inline comment; falling back to single comment.")
+        return "comment", await _post_single_comment(
+            gh, repo, pr_number, body, event, sync, key
+        )
+    _write_event(event)
+    posted = len(comments_payload) - len(rejected)
+    print(
+        f"Posted PR review with {posted} inline comment(s), event={event}"
+        + (f"; {len(rejected)} rejected by GitHub." if rejected else ".")
+    )
+    return "review", _id_of(review)
+
+
+def _inline_comments(
+    batch: List[Dict],
+    parsed: Dict,
+    findings: Optional[FindingsTable] = None,
+    first_row: int = 0,
+) -> List[Dict]:
+    """
+    Map the parsed findings of one batch to RIGHT-side inline review comments. With
+    `findings`, the placed line is recorded on the batch's rows (from `first_row`).
+    """
+    # Parts of a split file are merged back under one filename for line mapping
+    filename_to_patch = _patches_by_filename(batch)
+    dedup_by_file = {p["filename"]: p["dedup"] for p in batch if p.get("dedup")}
+    comments_payload: List[Dict] = []
+    count = 0
+    row = first_row
+    for f in parsed.get("files", []):
+        fname = f.get("filename")
+        comments = f.get("comments", [])
+        base, row = row, row + len(comments)
+        if not fname or fname not in filename_to_patch:
+            continue
+        patch = filename_to_patch[fname]
+        # GitHub rejects the whole review if one comment is outside the diff
+        valid_lines = commentable_lines(patch)
+        for j, c in enumerate(comments):
+            if count >= settings.max_inline_comments:
+                break
+            # Static-check findings know their line; LLM ones only give a hint
+            line = c.get("line")
+            if not isinstance(line, int):
+                line = guess_line_for_hint(patch, c.get("line_hint", "") or "")
+            if line is None:
+                continue
+            if line not in valid_lines:
+                print(f"{fname}:{line} is not a RIGHT-side diff line; comment dropped.")
+                continue
+            msg = c.get("message", "").strip()
+            if not msg:
+                continue
+            if findings is not None:
+                findings.line[base + j] = line
+            # Deduplicated hunks: place the same finding in every copy
+            targets = [(fname, line)] + fan_out_line(dedup_by_file.get(fname), line)
+            for path, target_line in targets:
+                if count >= settings.max_inline_comments:
+                    break
+                comments_payload.append(
+                    {"path": path, "side": "RIGHT", "line": target_line, "body": msg}
+                )
+                count += 1
+    return comments_payload
+
+
+async def _post_batch(
+    gh_reviews: GitHubReviewsClient,
+    gh: GitHubClient,
+    repo: str,
+    pr_number: int,
+    body: str,
+    comments_payload: List[Dict],
+    event: str,
+    sem: asyncio.Semaphore,
+    timings: Optional[Dict[str, List[float]]] = None,
+    note: str = "",
+    ckpt: Optional[Checkpoint] = None,
+    key: Optional[str] = None,
+    sync: Optional[CommentSync] = None,
+    comment_key: Optional[str] = None,
+):
+    """
+    Post one batch: inline review (falling back to a comment) or a single comment.
+    With a checkpoint `key`, batches posted by an earlier run are skipped and new
+    posts are journaled with their ids. With `sync`, inline comments already on the
+    PR are not re-posted and the batch's issue comment (`comment_key`) is edited.
+    """
+    if ckpt is not None and key and ckpt.is_posted(key):
+        print("Batch was already posted by an earlier run; skipping.")
+        return
+    async with sem:
+        with _timed(timings, "post"):
+            if comments_payload and sync is not None:
+                fresh = await sync.unposted(comments_payload)
+                if len(fresh) < len(comments_payload):
+                    print(
+                        f"{len(comments_payload) - len(fresh)} inline comment(s) "
+                        "unchanged since the last run; not re-posted."
+                    )
+                comments_payload = fresh
+            if comments_payload:
+                kind, ids = await _post_inline_review(
+                    gh_reviews,
+                    gh,
+                    repo,
+                    pr_number,
+                    body,
+                    comments_payload,
+                    event,
+                    sync,
+                    comment_key,
+                )
+            else:
+                # Fall back to single comment if not inline mode or no mappable inline comments
+                kind = "comment"
+                ids = await _post_single_comment(
+                    gh, repo, pr_number, body, event, sync, comment_key
+                )
+    if ckpt is not None and key:
+        ckpt.record_post(key, kind, ids)
+    if note and not comments_payload:
+        print(note)
+
+
+async def _post_consolidated(
+    gh_reviews: GitHubReviewsClient,
+    gh: GitHubClient,
+    repo: str,
+    pr_number: int,
+    header: str,
+    footer: str,
+    sections: List[Tuple[str, str, List[Dict]]],
+    overall_event: str,
+    sem: asyncio.Semaphore,
+    timings: Optional[Dict[str, List[float]]] = None,
+    ckpt: Optional[Checkpoint] = None,
+    key: Optional[str] = None,
+    sync: Optional[CommentSync] = None,
+):
+    """
+    Post all batches as one review: merged summaries, every inline comment and the
+    rolled-up event. Payloads over GitHub's limits are posted as continuation reviews.
+    """
+    if len(sections) == 1:
+        summary = sections[0][1]
+    else:
+        summary = "\n\n".join(f"### {tag}\n{md}" for tag, md, _ in sections)
+    comments = [c for _, _, payload in sections for c in payload]
+    chunks = chunk_review(
+        header + summary + footer,
+        comments,
+        GITHUB_MAX_BODY_CHARS,
+        settings.max_comments_per_review,
+    )
+    for i, (body, payload) in enumerate(chunks):
+        # Only the first payload carries REQUEST_CHANGES; the rest just continue it
+        event = overall_event if i == 0 else "COMMENT"
+        await _post_batch(
+            gh_reviews,
+            gh,
+            repo,
+            pr_number,
+            body,
+            payload,
+            event,
+            sem,
+            timings,
+            note=f"Posted consolidated review {i + 1}/{len(chunks)} (event={event}).",
+            ckpt=ckpt,
+            key=f"{key}:{i}" if key else None,
+            sync=sync,
+            comment_key=f"consolidated-{i + 1}",
+        )
+
+
+async def _apply_labels(
+    gh: GitHubClient,
+    repo: str,
+    pr_number: int,
+    overall_event: str,
+    max_severity: int,
+    timings: Optional[Dict[str, List[float]]] = None,
+):
+    """Apply PR labels summarizing the review outcome + highest severity code."""
+    try:
+        prefix = (settings.label_prefix or "gpt-review").strip() or "gpt-review"
+        outcome_label = f"{prefix}:{'request-changes' if overall_event == 'REQUEST_CHANGES' else 'comment'}"
+        # No findings at all still labels as low
+        sev_label = f"{prefix}:{SEVERITIES[max(1, max_severity)]}"
+
+        with _timed(timings, "labels"):
+            await gh.add_labels(repo, pr_number, [outcome_label, sev_label])
+    except Exception as e:
+        # Non-fatal: labeling is best-effort
+        print(f"Labeling skipped: {e}")
 
 
 async def main() -> int:
+    # Per-stage wall times for this run (written to the report; used by tools/load_test.py)
+    timings: Dict[str, List[float]] = {}
+    run_started = time.perf_counter()
     repo = settings.github_repository or os.getenv("GITHUB_REPOSITORY")
     pr_number = settings.pull_request_number or os.getenv("PULL_REQUEST_NUMBER")
     token = settings.github_token or os.getenv("GITHUB_TOKEN")
     if pr_number is not None and isinstance(pr_number, str):
         pr_number = int(pr_number)
 
-    if not repo or not pr_number or not token or not settings.openai_api_key:
+    needs_openai_key = settings.llm_backend.lower() != "fake"
+    if (
+        not repo
+        or not pr_number
+        or not token
+        or (needs_openai_key and not settings.openai_api_key)
+    ):
         print(
             "Missing required configuration. Need GITHUB_TOKEN, OPENAI_API_KEY, GITHUB_REPOSITORY, PULL_REQUEST_NUMBER."
         )
         return 2
+    local_diff = settings.diff_source.lower() == "git"
+    if local_diff and not settings.base_sha:
+        print("diff_source=git needs BASE_SHA (the PR base commit).")
+        return 2
 
-    gh = GitHubClient(token=token)
-    files = await gh.list_pr_files(repo, int(pr_number))
+    # Batch records are appended as they finish; the JSON report is written at the end
+    # Per-batch sections go to the job summary as they finish (GitHub Actions only)
+    live = LiveSummary.from_env()
+    stream = ReportStream() if settings.report_stream else None
+    if stream is None:
+        # ci_summary prefers the stream; don't leave one from an earlier run behind
+        with contextlib.suppress(OSError):
+            os.remove(REPORT_STREAM_FILE)
+    else:
+        stream.write(
+            "run",
+            {
+                "version": STREAM_VERSION,
+                "repo": repo,
+                "pr": int(pr_number),
+                "review_mode": settings.review_mode,
+                "severity_gate": settings.severity_gate,
+                "max_files": settings.max_files,
+                "max_inline_comments": settings.max_inline_comments,
+                "consolidated": settings.consolidate_batches,
+                "live_summary": live is not None,
+            },
+        )
 
-    # Filter + per-file truncation + total limit (pre-batching)
-    selected: List[Dict] = []
-    total_chars = 0
-    for f in files:
-        fname = f.get("filename")
-        if not fname:
-            continue
-        if not should_include(fname, settings.include_globs, settings.exclude_globs):
-            continue
-        if "patch" not in f or not f["patch"]:
-            continue
+    gh = GitHubClient(token=token)
+    gh_reviews = GitHubReviewsClient(token=token)
+    # Reruns edit the bot's own comments instead of stacking new ones
+    sync = (
+        CommentSync(gh, gh_reviews, repo, int(pr_number))
+        if settings.update_existing_comments
+        else None
+    )
+    if local_diff:
+        # Streamed from the checkout while preparing; nothing to fetch up front
+        files = iter_local_files(
+            settings.base_sha, settings.head_sha or "HEAD", settings.git_repo_dir
+        )
+    else:
+        with _timed(timings, "fetch_files"):
+            files = await gh.list_pr_files(repo, int(pr_number))
 
-        # Truncate large file diff
-        patch = _truncate_patch(f["patch"], settings.max_patch_chars)
+    # Filter + slim + compact every file first so duplicate hunks can be found PR-wide,
+    # and rank by review value
+    with _timed(timings, "prepare"):
+        candidates = _prepare_candidates(files)
+        if settings.dedup_hunks:
+            candidates = dedup_hunks(candidates)
+        if settings.prioritize_files:
+            candidates = rank_candidates(candidates)
+    del files
 
-        # Slim to only changed lines with N lines of context; drop hunks with ignore marker.
-        # IMPORTANT: only slim when there are real +/- changes; otherwise keep patch as-is
-        slimmed = patch
-        if settings.only_changed_lines and _has_changes(patch):
-            slimmed = slim_patch_to_changed(
-                patch=patch,
-                ctx=settings.changed_context_lines,
-                marker=(settings.ignore_inline_marker or None),
+    # Deterministic rulepack checks: their findings go out first as batch 1, and
+    # patches with nothing left for a model skip triage and the LLM
+    static_pair: Optional[Tuple[List[Dict], Dict]] = None
+    if settings.static_checks:
+        with _timed(timings, "static_checks"):
+            static_parsed, checked, candidates = run_static_checks(
+                candidates, settings.static_checks_skip_llm
             )
-            # Keep output stable for tests that check string suffix exactly
-            slimmed = slimmed.rstrip("\n")
-
-        # If slimming removed everything (e.g., all hunks had ignore marker), skip file
-        if not slimmed.strip():
-            continue
+        if static_parsed is not None:
+            static_pair = (checked, {"text": json.dumps(static_parsed), "static": True})
 
-        # Respect total cap using the slimmed size
-        if total_chars + len(slimmed) > settings.max_total_patch_chars and selected:
-            # stop taking more files once we hit the total cap
-            break
+    llm = LLMClient(api_key=settings.openai_api_key, model=settings.openai_model)
+    # Cheap-model triage before the budget is filled: only patches it flags go to
+    # the full review model, and what trivial ones would have used goes to others
+    trivial: List[str] = []
+    if settings.triage_model and candidates:
+        with _timed(timings, "triage"):
+            candidates, skipped = await triage_patches(
+                llm,
+                candidates,
+                settings.triage_model,
+                TriageCache(settings.triage_cache_dir or None),
+                settings.triage_batch_chars,
+                settings.llm_concurrency,
+            )
+        trivial = list(dict.fromkeys(p["filename"] for p in skipped))
+        print(
+            f"Triage: {len(skipped)} trivial patch(es) skipped, {len(candidates)} left."
+        )
 
-        selected.append({"filename": fname, "patch": slimmed})
-        total_chars += len(slimmed)
-        if len(selected) >= settings.max_files:
-            break
+    # Split oversized diffs and fill the total budget
+    budget_skipped: List[Dict] = []
+    selected = _select_within_budget(candidates, budget_skipped)
+    # Only the selected (slimmed, split) patches are needed from here on
+    del candidates
 
-    if not selected:
-        body = "🤖 No text patches found to review after filtering (maybe only binary/large/excluded files)."
-        await gh.post_issue_comment(repo, int(pr_number), body)
+    if not selected and static_pair is None:
+        reason = "all_triaged_trivial" if trivial else "no_patches_after_filtering"
+        body = (
+            f"🤖 All {len(trivial)} changed file(s) were triaged as trivial; no full review needed."
+            if trivial
+            else "🤖 No text patches found to review after filtering (maybe only binary/large/excluded files)."
+        )
+        if sync is not None:
+            await sync.upsert("no-patches", body)
+        else:
+            await gh.post_issue_comment(repo, int(pr_number), body)
         _write_event("COMMENT")
         # write a minimal report so CI summary has something to show
         _write_report(
             {
                 "overall_event": "COMMENT",
                 "batches": [],
-                "reason": "no_patches_after_filtering",
+                "reason": reason,
+                "triaged_trivial": trivial,
+                "budget_skipped": budget_skipped,
                 "review_mode": settings.review_mode,
                 "severity_gate": settings.severity_gate,
                 "max_files": settings.max_files,
                 "max_inline_comments": settings.max_inline_comments,
+                "timings": timings,
             }
         )
+        if stream is not None:
+            stream.write(
+                "summary",
+                {
+                    "overall_event": "COMMENT",
+                    "reason": reason,
+                    "triaged_trivial": trivial,
+                    "budget_skipped": budget_skipped,
+                    "total_batches": 0,
+                    "timings": timings,
+                },
+            )
+            stream.close()
         print(body)
         return 0
 
+    # Add the enclosing function/class of each hunk, only for what will be reviewed
+    if settings.scope_context:
+        with _timed(timings, "scope_context"):
+            read_blob = (
+                local_blob_reader(settings.git_repo_dir)
+                if local_diff
+                else api_blob_reader(gh, repo)
+            )
+            enriched = await add_scope_context(
+                selected,
+                read_blob,
+                BlobCache(settings.blob_cache_dir or None),
+                settings.scope_context_max_lines,
+            )
+        print(f"Added enclosing-scope context to {enriched} patch(es).")
+
     # Batch the selected patches
     batches = chunk_patches(selected, settings.max_total_patch_chars)
-    total_batches = len(batches)
+    total_batches = len(batches) + (static_pair is not None)
+    if live is not None:
+        live.start(total_batches)
 
-    llm = LLMClient(api_key=settings.openai_api_key, model=settings.openai_model)
     inline_mode = settings.review_mode.lower() == "review"
     header_base = _markdown_header()
     footer = "\n\n---\n_This is an automated first-pass review. Treat suggestions as guidance._"
 
-    gh_reviews = GitHubReviewsClient(token=token)
-
     # For the final rollup report
     all_batches_meta: List[Dict] = []
-    overall_sev = {"low": 0, "medium": 0, "high": 0}
-    overall_files = 0
-    overall_comments = 0
+    # Every finding of every batch, for metrics, gates and labels
+    findings = FindingsTable()
+    overall_event = "COMMENT"
+    reviewed_files = set()
 
-    # Process each batch independently
-    for idx, batch in enumerate(batches, start=1):
-        system, user = build_llm_prompt_from_patches(batch)
-        raw = llm.review_patches_json(batch, system, user)["text"]
-        parsed = parse_llm_json_or_fallback(raw)
-
-        # Per-batch metrics
-        m = _metrics_from_parsed(parsed)
-        overall_sev = _merge_hist(overall_sev, m["severity_histogram"])
-        overall_files += m["files_count"]
-        overall_comments += m["comments_count"]
-
-        # Decide event (respect local gate)
-        llm_decision = str(parsed.get("decision", "comment")).lower()
-        local_decision = _decision_from_severities(parsed.get("files", []))
-        final_decision = llm_decision
-        if (
-            settings.severity_gate.lower() != "off"
-            and local_decision == "request_changes"
-        ):
-            final_decision = "request_changes"
-        event = (
-            "COMMENT" if final_decision in ("approve", "comment") else "REQUEST_CHANGES"
-        )
+    # LLM-review all batches concurrently (bounded). Results are consumed in batch
+    # order and each batch is handed to the posting stage as soon as it is ready, so
+    # GitHub writes overlap with LLM work on later batches.
+    sem = asyncio.Semaphore(max(1, settings.llm_concurrency))
+    post_sem = asyncio.Semaphore(max(1, settings.github_post_concurrency))
+    llm_started = time.perf_counter()
+    # Journal of finished LLM calls and posts for this PR head; a rerun resumes
+    ckpt = Checkpoint.for_run(repo, int(pr_number), settings.head_sha)
+    review_tasks = [
+        asyncio.create_task(_review_batch(llm, b, sem, timings, ckpt)) for b in batches
+    ]
+    if static_pair is not None:
+        # Already known; consumed like a finished LLM batch
+        static_done = asyncio.get_running_loop().create_future()
+        static_done.set_result([static_pair])
+        review_tasks.insert(0, static_done)
+    post_tasks: List[asyncio.Task] = []
+    consolidated: List[Tuple[str, str, List[Dict]]] = []
+    consolidated_keys: List[str] = []
+    labels_task: Optional[asyncio.Task] = None
+    fail_fast: Optional[Dict[str, int]] = None
 
-        # Build body with batch tag
-        summary_md = parsed.get("summary_markdown", "").strip() or "_No summary_"
-        header = header_base.replace(
-            "## 🤖 GPT Code Review",
-            f"## 🤖 GPT Code Review (batch {idx}/{total_batches})",
-        )
-        body = header + summary_md + footer
-
-        # Inline placement for this batch
-        filename_to_patch = {p["filename"]: p["patch"] for p in batch}
-        comments_payload: List[Dict] = []
-        count = 0
-        if inline_mode:
-            for f in parsed.get("files", []):
-                fname = f.get("filename")
-                if not fname or fname not in filename_to_patch:
-                    continue
-                patch = filename_to_patch[fname]
-                for c in f.get("comments", []):
-                    if count >= settings.max_inline_comments:
-                        break
-                    hint = c.get("line_hint", "") or ""
-                    line = guess_line_for_hint(patch, hint)
-                    if line is None:
-                        continue
-                    msg = c.get("message", "").strip()
-                    if not msg:
-                        continue
-                    comments_payload.append(
-                        {
-                            "path": fname,
-                            "side": "RIGHT",
-                            "line": line,
-                            "body": msg,
-                        }
+    for idx, task in enumerate(review_tasks, start=1):
+        pairs = await task
+        for part, (batch, result) in enumerate(pairs, start=1):
+            # Truncated batches are split; their halves share the batch number
+            tag = f"batch {idx}/{total_batches}"
+            if len(pairs) > 1:
+                tag += f", part {part}/{len(pairs)}"
+            parsed = parse_llm_json_or_fallback(result["text"])
+
+            # Per-batch metrics
+            rows = findings.add_parsed(parsed, len(all_batches_meta) + 1)
+            m = _batch_metrics(parsed, findings, rows)
+            reviewed_files.update(
+                f.get("filename") for f in parsed.get("files", []) if f.get("filename")
+            )
+
+            # Decide event (respect local gate)
+            llm_decision = str(parsed.get("decision", "comment")).lower()
+            local_decision = _decision_from_severity(findings.max_severity(*rows))
+            final_decision = llm_decision
+            if (
+                settings.severity_gate.lower() != "off"
+                and local_decision == "request_changes"
+            ):
+                final_decision = "request_changes"
+            event = (
+                "COMMENT"
+                if final_decision in ("approve", "comment")
+                else "REQUEST_CHANGES"
+            )
+            if event == "REQUEST_CHANGES":
+                overall_event = "REQUEST_CHANGES"
+
+            # Build body with batch tag
+            summary_md = parsed.get("summary_markdown", "").strip() or "_No summary_"
+            if result.get("finish_reason") == "length":
+                names = ", ".join(f"`{f}`" for f in _patches_by_filename(batch))
+                summary_md += (
+                    "\n\n_The response was cut off at the token budget; "
+                    f"{names} only partially reviewed._"
+                )
+            header = header_base.replace(
+                "## 🤖 GPT Code Review", f"## 🤖 GPT Code Review ({tag})"
+            )
+            body = header + summary_md + footer
+
+            # The static batch may hold the same patches as an LLM batch
+            key = ("static-" if result.get("static") else "") + batch_key(batch)
+
+            comments_payload = (
+                _inline_comments(batch, parsed, findings, rows[0])
+                if inline_mode
+                else []
+            )
+
+            if settings.consolidate_batches:
+                # Posted once, after the last batch
+                consolidated.append((tag, summary_md, comments_payload))
+                consolidated_keys.append(key)
+            else:
+                # Post review/comment for this batch in the background
+                post_tasks.append(
+                    asyncio.create_task(
+                        _post_batch(
+                            gh_reviews,
+                            gh,
+                            repo,
+                            int(pr_number),
+                            body,
+                            comments_payload,
+                            event,
+                            post_sem,
+                            timings,
+                            note=(
+                                f"[{tag}] "
+                                f"{'No inline placements; ' if inline_mode and not comments_payload else ''}"
+                                f"posted single comment (decision: {final_decision})."
+                            ),
+                            ckpt=ckpt,
+                            key=key,
+                            sync=sync,
+                            comment_key=f"batch-{idx}"
+                            + (f".{part}" if len(pairs) > 1 else ""),
+                        )
                     )
-                    count += 1
+                )
 
-        # Post review/comment for this batch
-        if inline_mode and comments_payload:
-            await _post_inline_review(
-                gh_reviews, gh, repo, int(pr_number), body, comments_payload, event
+            # Collect minimal per-batch metadata for reporting
+            all_batches_meta.append(
+                {
+                    "batch": len(all_batches_meta) + 1,
+                    "total_batches": total_batches,
+                    "final_decision": final_decision,
+                    "event": event,
+                    "summary_excerpt": summary_md[:180],
+                    "files_in_batch": list(_patches_by_filename(batch)),
+                    "inline_comments_posted": len(comments_payload)
+                    if inline_mode
+                    else 0,
+                    "metrics": m,  # <-- per-batch metrics
+                    "max_tokens": result.get("max_tokens"),
+                    "finish_reason": result.get("finish_reason"),
+                    "static": result.get("static", False),
+                }
             )
-        else:
-            # Fall back to single comment if not inline mode or no mappable inline comments
-            await _post_single_comment(gh, repo, int(pr_number), body, event)
-            print(
-                f"[batch {idx}/{total_batches}] "
-                f"{'No inline placements; ' if inline_mode and not comments_payload else ''}"
-                f"posted single comment (decision: {final_decision})."
+            if stream is not None:
+                stream.write("batch", all_batches_meta[-1])
+            if live is not None:
+                live.batch(all_batches_meta[-1], total_batches)
+
+        # With the gate enforced on CI the job fails as soon as a finding reaches
+        # severity_gate; the remaining batches are not worth their LLM calls then
+        gate_tripped = (
+            settings.fail_fast_gate
+            and settings.enforce_gate_on_ci
+            and _decision_from_severity(findings.max_severity()) == "request_changes"
+        )
+        # Labels go out as soon as the outcome can no longer change: after the last
+        # batch, or earlier once a batch already requested changes at high severity
+        final = (
+            idx == len(review_tasks)
+            or gate_tripped
+            or (overall_event == "REQUEST_CHANGES" and findings.max_severity() >= 3)
+        )
+        if settings.enable_auto_labels and labels_task is None and final:
+            labels_task = asyncio.create_task(
+                _apply_labels(
+                    gh,
+                    repo,
+                    int(pr_number),
+                    overall_event,
+                    findings.max_severity(),
+                    timings,
+                )
             )
+        if gate_tripped and idx < len(review_tasks):
+            # Batches still queued on the semaphore never reach the LLM; calls already
+            # in flight finish in their threads but their results are dropped
+            pending = review_tasks[idx:]
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            fail_fast = {"after_batch": idx, "skipped_batches": len(pending)}
+            msg = (
+                f"Severity gate ({settings.severity_gate}) tripped in batch "
+                f"{idx}/{total_batches}; skipped the remaining {len(pending)} batch(es)."
+            )
+            print(msg)
+            if live is not None:
+                live.note(msg)
+            break
+    timings.setdefault("llm", []).append(round(time.perf_counter() - llm_started, 6))
 
-        # Collect minimal per-batch metadata for reporting
-        all_batches_meta.append(
-            {
-                "batch": idx,
-                "total_batches": total_batches,
-                "final_decision": final_decision,
-                "event": event,
-                "summary_excerpt": summary_md[:180],
-                "files_in_batch": [p["filename"] for p in batch],
-                "inline_comments_posted": len(comments_payload) if inline_mode else 0,
-                "metrics": m,  # <-- per-batch metrics
-            }
+    # Every batch record is in; totals reflect splits
+    for meta in all_batches_meta:
+        meta["total_batches"] = len(all_batches_meta)
+
+    if consolidated:
+        post_tasks.append(
+            asyncio.create_task(
+                _post_consolidated(
+                    gh_reviews,
+                    gh,
+                    repo,
+                    int(pr_number),
+                    header_base,
+                    footer,
+                    consolidated,
+                    overall_event,
+                    post_sem,
+                    timings,
+                    ckpt=ckpt,
+                    key="consolidated-" + "-".join(k[:12] for k in consolidated_keys),
+                    sync=sync,
+                )
+            )
         )
 
-    # Roll up an overall event across batches (REQUEST_CHANGES wins if any batch requested it)
-    overall_event = "COMMENT"
-    for m in all_batches_meta:
-        if m.get("event") == "REQUEST_CHANGES":
-            overall_event = "REQUEST_CHANGES"
-            break
+    with _timed(timings, "post_wait"):
+        await asyncio.gather(*post_tasks)
+        if labels_task is not None:
+            await labels_task
 
+    # Roll up an overall event across batches (REQUEST_CHANGES wins if any batch requested it)
     _write_event(overall_event)
+
+    timings["total"] = [round(time.perf_counter() - run_started, 6)]
+    metrics = {
+        "overall_severity_histogram": findings.histogram(),
+        "findings_per_file": findings.per_file(),
+        "overall_files_reviewed": len(reviewed_files),
+        "llm_usage": dict(llm.usage),
+        "overall_comments": len(findings),
+    }
     _write_report(
         {
             "overall_event": overall_event,
@@ -363,32 +1128,40 @@ async def main() -> int:
             "severity_gate": settings.severity_gate,
             "max_files": settings.max_files,
             "max_inline_comments": settings.max_inline_comments,
-            "metrics": {
-                "overall_severity_histogram": overall_sev,
-                "overall_files_reviewed": overall_files,
-                "overall_comments": overall_comments,
-            },
+            "consolidated": settings.consolidate_batches,
+            "live_summary": live is not None,
+            "fail_fast": fail_fast,
+            "triaged_trivial": trivial,
+            "budget_skipped": budget_skipped,
+            "metrics": metrics,
             "batches": all_batches_meta,
+            "timings": timings,
         }
     )
-
-    # Optional: apply PR labels summarizing the review outcome + highest severity
-    try:
-        if settings.enable_auto_labels:
-            prefix = (settings.label_prefix or "gpt-review").strip() or "gpt-review"
-            outcome_label = f"{prefix}:{'request-changes' if overall_event == 'REQUEST_CHANGES' else 'comment'}"
-
-            if overall_sev.get("high", 0) > 0:
-                sev_label = f"{prefix}:high"
-            elif overall_sev.get("medium", 0) > 0:
-                sev_label = f"{prefix}:medium"
-            else:
-                sev_label = f"{prefix}:low"
-
-            await gh.add_labels(repo, int(pr_number), [outcome_label, sev_label])
-    except Exception as e:
-        # Non-fatal: labeling is best-effort
-        print(f"Labeling skipped: {e}")
+    if stream is not None:
+        stream.write(
+            "summary",
+            {
+                "overall_event": overall_event,
+                "total_batches": len(all_batches_meta),
+                "fail_fast": fail_fast,
+                "budget_skipped": budget_skipped,
+                "metrics": metrics,
+                "timings": timings,
+            },
+        )
+        stream.close()
+    if settings.findings_db:
+        record_run(
+            settings.findings_db,
+            repo,
+            int(pr_number),
+            settings.head_sha,
+            overall_event,
+            dict(llm.usage),
+            findings,
+            len(reviewed_files),
+        )
 
     return 0
 
@@ -0,0 +1,137 @@
+# app/comment_sync.py
+import asyncio
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from app.settings import settings
+
+# Hidden HTML comment that identifies a bot-owned issue comment across runs
+MARKER_FMT = "<!-- gpt-pr-review:{key} -->"
+_MARKER_RE = re.compile(r"<!-- gpt-pr-review:(\S+) -->")
+# Author of comments posted with Actions' GITHUB_TOKEN
+DEFAULT_BOT_LOGIN = "github-actions[bot]"
+
+
+def with_marker(body: str, key: str) -> str:
+    return f"{body}\n\n{MARKER_FMT.format(key=key)}"
+
+
+def marker_key(body: str) -> Optional[str]:
+    m = _MARKER_RE.search(body or "")
+    return m.group(1) if m else None
+
+
+def _inline_key(c: Dict) -> Tuple:
+    return (c.get("path"), c.get("line"), (c.get("body") or "").strip())
+
+
+def _written_by(item: Dict, login: str) -> bool:
+    """Whether `login` posted the comment or review; a copied marker is not ours."""
+    user = (item.get("user") or {}).get("login")
+    app = (item.get("performed_via_github_app") or {}).get("slug")
+    return login in (user, f"{app}[bot]" if app else None)
+
+
+class CommentSync:
+    """
+    Edit-in-place view of what earlier runs already posted on a PR. Existing issue
+    comments, reviews and review comments are fetched once (lazily) per run; only
+    those written by the bot's own login count:
+
+    - upsert(key, body): PATCH the issue comment carrying `key`'s marker, else PUT
+      the body of the review carrying it, else POST a new comment
+    - unposted(comments): drop inline comments already on the same path/line/body
+    """
+
+    def __init__(
+        self,
+        gh: GitHubClient,
+        gh_reviews: GitHubReviewsClient,
+        repo: str,
+        pr_number: int,
+    ):
+        self.gh = gh
+        self.gh_reviews = gh_reviews
+        self.repo = repo
+        self.pr_number = pr_number
+        self._issue_ids: Optional[Dict[str, int]] = None
+        self._review_ids: Dict[str, int] = {}
+        self._login = ""
+        self._inline: Optional[Set[Tuple]] = None
+        self._lock = asyncio.Lock()  # posts run concurrently; fetch each list once
+
+    async def _bot_login(self) -> str:
+        if settings.github_bot_login:
+            return settings.github_bot_login
+        try:
+            return (await self.gh.get_authenticated_user())["login"]
+        except Exception:
+            # Installation tokens (Actions' GITHUB_TOKEN) cannot read /user
+            return DEFAULT_BOT_LOGIN
+
+    async def _marked_ids(self, listed, what: str) -> Dict[str, int]:
+        """
+        Marker key -> id of the most recent listed item the bot itself wrote (an
+        earlier failed edit leaves older copies behind).
+        """
+        ids: Dict[str, int] = {}
+        try:
+            existing = await listed
+        except Exception as e:
+            # Best-effort: without the list we just post new ones
+            print(f"Could not list existing {what} ({e}); posting new ones.")
+            return ids
+        for c in existing:
+            key = marker_key(c.get("body", ""))
+            if key and _written_by(c, self._login) and c["id"] > ids.get(key, -1):
+                ids[key] = c["id"]
+        return ids
+
+    async def _issue_comment_ids(self) -> Dict[str, int]:
+        async with self._lock:
+            if self._issue_ids is None:
+                self._login = await self._bot_login()
+                self._issue_ids = await self._marked_ids(
+                    self.gh.list_issue_comments(self.repo, self.pr_number), "comments"
+                )
+                self._review_ids = await self._marked_ids(
+                    self.gh_reviews.list_reviews(self.repo, self.pr_number), "reviews"
+                )
+            return self._issue_ids
+
+    async def upsert(self, key: str, body: str) -> Dict:
+        body = with_marker(body, key)
+        existing = (await self._issue_comment_ids()).get(key)
+        review = self._review_ids.get(key)
+        try:
+            if existing is not None:
+                return await self.gh.update_issue_comment(self.repo, existing, body)
+            if review is not None:
+                # Review mode: the summary lives in an earlier review's body
+                return await self.gh_reviews.update_review(
+                    self.repo, self.pr_number, review, body
+                )
+        except httpx.HTTPError as e:
+            # Deleted since it was listed, or not editable (e.g. 403): post a fresh one
+            print(f"Could not update the earlier '{key}' summary ({e}); posting anew.")
+        res = await self.gh.post_issue_comment(self.repo, self.pr_number, body)
+        if isinstance(res, dict) and res.get("id") is not None:
+            self._issue_ids[key] = res["id"]
+        return res
+
+    async def unposted(self, comments: List[Dict]) -> List[Dict]:
+        async with self._lock:
+            if self._inline is None:
+                try:
+                    existing = await self.gh_reviews.list_review_comments(
+                        self.repo, self.pr_number
+                    )
+                except Exception as e:
+                    print(f"Could not list review comments ({e}); posting all.")
+                    existing = []
+                self._inline = {_inline_key(c) for c in existing}
+        return [c for c in comments if _inline_key(c) not in self._inline]
@@ -0,0 +1,317 @@
+# app/diff_compactor.py
+import keyword
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.review_strategy import language_of
+
+# Annotation lines start with "\" like git's "\ No newline at end of file",
+# so line mapping treats them as neither context nor changes.
+ANNOTATION_PREFIX = "\\ [compacted] "
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`")
+# Leading indentation is syntax in these; re-indenting a line changes behaviour
+INDENT_SENSITIVE = ("Python", "YAML")
+# Only these lines can be reordered without changing behaviour
+_REORDERABLE_RE = re.compile(
+    r"^\s*(?:import\s|from\s+\S+\s+import\s|#include\s|using\s"
+    r"|(?:const|let|var)\s+\w+\s*=\s*require\()"
+)
+# Flipping one of these is a behaviour change, never a rename
+_LITERAL_WORDS = {"true", "false", "null", "nil", "undefined"}
+# A line defining {name}: a def/class/declaration keyword or a plain assignment
+_DEFINITION_RE = (
+    r"^\s*(?:(?:export\s+)?(?:async\s+)?(?:def|class|function|func|fn|struct|interface"
+    r"|type|const|let|var)\s+{name}\b|{name}\s*=[^=])"
+)
+MAX_MOVE_CANDIDATES = 32  # per removed line, bounds the move search on repetitive diffs
+
+
+class _Line:
+    __slots__ = ("tag", "text", "old_no", "new_no", "note")
+
+    def __init__(self, tag: str, text: str, old_no: int, new_no: int):
+        self.tag = tag  # " ", "+", "-" or "\\"
+        self.text = text
+        self.old_no = old_no
+        self.new_no = new_no
+        self.note: Optional[str] = None  # set on elided lines; "" = elided, no note
+
+
+def _norm(text: str, keep_indent: bool = False) -> str:
+    """
+    Comparison form of a line: whitespace runs outside string literals collapsed to
+    one space; literals and (with keep_indent) the leading indentation kept verbatim.
+    """
+    body = text.lstrip()
+    out = [text[: len(text) - len(body)] if keep_indent else ""]
+    pos = 0
+    for m in _STRING_RE.finditer(body):
+        out.append(_WS_RE.sub(" ", body[pos : m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(_WS_RE.sub(" ", body[pos:]))
+    return "".join(out).rstrip()
+
+
+def _same_ignoring_whitespace(
+    dels: List[_Line], adds: List[_Line], keep_indent: bool
+) -> bool:
+    if keep_indent:
+        # Line structure and indentation are significant; only inner runs may differ
+        return len(dels) == len(adds) and all(
+            _norm(d.text, True) == _norm(a.text, True) for d, a in zip(dels, adds)
+        )
+    # Reflowed across lines: compare the blocks joined into one line
+    return _norm(" ".join(d.text.strip() for d in dels)) == _norm(
+        " ".join(a.text.strip() for a in adds)
+    )
+
+
+def _parse(patch: str) -> Tuple[List[str], List[Tuple[str, List[_Line]]]]:
+    """Split into (preamble, [(header, lines)]) tracking old/new line numbers."""
+    preamble: List[str] = []
+    hunks: List[Tuple[str, List[_Line]]] = []
+    old_no = new_no = 0
+    for raw in patch.splitlines():
+        m = _HUNK_RE.match(raw)
+        if m:
+            old_no, new_no = int(m.group(1)), int(m.group(2))
+            hunks.append((raw, []))
+            continue
+        if not hunks:
+            preamble.append(raw)
+            continue
+        tag = raw[:1] if raw[:1] in ("+", "-", "\\") else " "
+        text = raw[1:] if raw[:1] in ("+", "-", " ", "\\") else raw
+        hunks[-1][1].append(_Line(tag, text, old_no, new_no))
+        if tag in (" ", "-"):
+            old_no += 1
+        if tag in (" ", "+"):
+            new_no += 1
+    return preamble, hunks
+
+
+def _change_blocks(lines: List[_Line]) -> List[Tuple[List[_Line], List[_Line]]]:
+    """Runs of '-' lines immediately followed by runs of '+' lines."""
+    blocks: List[Tuple[List[_Line], List[_Line]]] = []
+    i = 0
+    while i < len(lines):
+        if lines[i].tag not in ("+", "-"):
+            i += 1
+            continue
+        dels: List[_Line] = []
+        adds: List[_Line] = []
+        while i < len(lines) and lines[i].tag == "-":
+            dels.append(lines[i])
+            i += 1
+        while i < len(lines) and lines[i].tag == "+":
+            adds.append(lines[i])
+            i += 1
+        blocks.append((dels, adds))
+    return blocks
+
+
+def _elide(lines: List[_Line], note: str) -> None:
+    for n, ln in enumerate(lines):
+        ln.note = note if n == 0 else ""
+
+
+def _single_substitution(old: str, new: str) -> Optional[Tuple[str, str]]:
+    """(old_tok, new_tok) if the lines differ by exactly one renamed identifier."""
+    # Edits inside string literals are content changes, not renames
+    if _STRING_RE.findall(old) != _STRING_RE.findall(new):
+        return None
+    a = _TOKEN_RE.findall(_STRING_RE.sub('""', old))
+    b = _TOKEN_RE.findall(_STRING_RE.sub('""', new))
+    if len(a) != len(b) or len(a) < 2:
+        return None
+    diffs = {(x, y) for x, y in zip(a, b) if x != y}
+    if len(diffs) != 1:
+        return None
+    x, y = next(iter(diffs))
+    for tok in (x, y):
+        if (
+            not tok.isidentifier()
+            or keyword.iskeyword(tok)
+            or tok.lower() in _LITERAL_WORDS
+        ):
+            return None
+    return x, y
+
+
+def _identifiers(text: str) -> List[str]:
+    return [
+        t for t in _TOKEN_RE.findall(_STRING_RE.sub('""', text)) if t.isidentifier()
+    ]
+
+
+def _is_rename(old: str, pairs: List[Tuple[_Line, _Line]], new_side: Set[str]) -> bool:
+    """
+    Swapping `old` for another name is only a rename when nothing on the new side
+    still uses `old`, or when its definition is renamed along with the uses;
+    otherwise (check_auth -> skip_auth) a different function is now being called.
+    """
+    if old not in new_side:
+        return True
+    definition = re.compile(_DEFINITION_RE.format(name=re.escape(old)))
+    return any(definition.match(d.text) for d, _ in pairs)
+
+
+def _mark_in_place(
+    blocks,
+    min_rename: int,
+    min_reorder: int,
+    keep_indent: bool,
+    new_side: Optional[Set[str]] = None,
+) -> None:
+    """
+    Whitespace-only edits, reordered imports/declarations and lockstep renames.
+    `new_side` holds the identifiers on the new side of the whole patch.
+    """
+    renames: Dict[Tuple[str, str], List[Tuple[_Line, _Line]]] = {}
+    for dels, adds in blocks:
+        if not dels or not adds:
+            continue
+        if _same_ignoring_whitespace(dels, adds, keep_indent):
+            _elide(dels, "")
+            _elide(adds, f"whitespace-only change ({len(adds)} line(s))")
+            continue
+        if (
+            len(dels) == len(adds) >= min_reorder
+            and all(_REORDERABLE_RE.match(ln.text) for ln in dels + adds)
+            and sorted(_norm(d.text, keep_indent) for d in dels)
+            == sorted(_norm(a.text, keep_indent) for a in adds)
+        ):
+            _elide(dels, "")
+            _elide(adds, f"reordered {len(adds)} line(s)")
+            continue
+        if len(dels) == len(adds):
+            subs = [_single_substitution(d.text, a.text) for d, a in zip(dels, adds)]
+            if all(subs) and len(set(subs)) == 1:
+                for pair in zip(dels, adds):
+                    renames.setdefault(subs[0], []).append(pair)
+
+    for (old, new), pairs in renames.items():
+        if len(pairs) < min_rename or not _is_rename(old, pairs, new_side or set()):
+            continue
+        for d, a in pairs:
+            if d.note is None and a.note is None:
+                d.note = ""
+                a.note = f"renamed `{old}` -> `{new}` ({len(pairs)} line(s) in file)"
+
+
+def _mark_moves(hunks, min_lines: int, keep_indent: bool) -> None:
+    """Blocks of >= min_lines removed in one place and added verbatim elsewhere."""
+    seq = [ln for _, lines in hunks for ln in lines]
+    added_at: Dict[str, List[int]] = {}
+    for j, ln in enumerate(seq):
+        if ln.tag == "+" and ln.note is None:
+            key = _norm(ln.text, keep_indent)
+            if len(key) > 1:  # blank lines and lone braces are not move anchors
+                added_at.setdefault(key, []).append(j)
+
+    i = 0
+    while i < len(seq):
+        ln = seq[i]
+        if ln.tag != "-" or ln.note is not None:
+            i += 1
+            continue
+        best_len, best_j = 0, -1
+        for j in added_at.get(_norm(ln.text, keep_indent), [])[:MAX_MOVE_CANDIDATES]:
+            k = 0
+            while (
+                i + k < len(seq)
+                and j + k < len(seq)
+                and seq[i + k].tag == "-"
+                and seq[j + k].tag == "+"
+                and seq[i + k].note is None
+                and seq[j + k].note is None
+                and _norm(seq[i + k].text, keep_indent)
+                == _norm(seq[j + k].text, keep_indent)
+            ):
+                k += 1
+            if k > best_len:
+                best_len, best_j = k, j
+        if best_len >= min_lines:
+            dels, adds = seq[i : i + best_len], seq[best_j : best_j + best_len]
+            _elide(dels, f"moved {best_len} line(s) to new line {adds[0].new_no}")
+            _elide(adds, f"moved {best_len} line(s) from old line {dels[0].old_no}")
+            i += best_len
+        else:
+            i += 1
+
+
+def _segment_header(seg: List[_Line], suffix: str) -> str:
+    old_cnt = sum(1 for x in seg if x.tag in (" ", "-"))
+    new_cnt = sum(1 for x in seg if x.tag in (" ", "+"))
+    return f"@@ -{seg[0].old_no},{old_cnt} +{seg[0].new_no},{new_cnt} @@{suffix}"
+
+
+def _emit(preamble: List[str], hunks) -> str:
+    out: List[str] = list(preamble)
+    for header, lines in hunks:
+        if all(ln.note is None for ln in lines):
+            out.append(header)
+            out.extend(ln.tag + ln.text for ln in lines)
+            continue
+
+        # Keep the function-context text after the header's closing '@@'
+        suffix = header[header.index("@@", 2) + 2 :] if header.count("@@") >= 2 else ""
+        seg: List[_Line] = []
+        for ln in lines:
+            if ln.note is None:
+                seg.append(ln)
+                continue
+            if seg:
+                out.append(_segment_header(seg, suffix))
+                out.extend(x.tag + x.text for x in seg)
+                seg = []
+            if ln.note:
+                out.append(ANNOTATION_PREFIX + ln.note)
+        if seg:
+            out.append(_segment_header(seg, suffix))
+            out.extend(x.tag + x.text for x in seg)
+    return "\n".join(out)
+
+
+def compact_patch(
+    patch: str,
+    min_move_lines: int = 3,
+    min_rename_lines: int = 2,
+    filename: str = "",
+) -> str:
+    """
+    Collapse low-signal edits into one-line annotations before prompt building:
+    whitespace-only/reflowed blocks, reordered imports/declarations, blocks moved
+    verbatim within the file, and the same identifier renamed on several lines.
+    Re-indentation in indentation-sensitive languages (by `filename`), edits inside
+    string literals and keyword/literal flips are never folded, nor is swapping a
+    name that the new side still uses (unless its definition is renamed too).
+    Kept lines get fresh '@@' headers so RIGHT-side line numbers stay correct.
+    Returns the patch unchanged when nothing was compacted.
+    """
+    if not patch:
+        return patch
+    preamble, hunks = _parse(patch)
+    if not hunks:
+        return patch
+
+    keep_indent = language_of(filename) in INDENT_SENSITIVE
+    blocks = [b for _, lines in hunks for b in _change_blocks(lines)]
+    new_side = {
+        tok
+        for _, lines in hunks
+        for ln in lines
+        if ln.tag in (" ", "+")
+        for tok in _identifiers(ln.text)
+    }
+    _mark_in_place(blocks, min_rename_lines, min_move_lines, keep_indent, new_side)
+    _mark_moves(hunks, min_move_lines, keep_indent)
+
+    if not any(ln.note is not None for _, lines in hunks for ln in lines):
+        return patch
+    return _emit(preamble, hunks)
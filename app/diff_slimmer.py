@@ -1,73 +1,188 @@
 # app/diff_slimmer.py
-from typing import List, Optional
+import functools
+import re
+from typing import List, Optional, Tuple, Union
 
+# The slimmer works on (start, end) offsets into the original patch string instead of
+# materialized lines: hunk headers and changed lines are located with regex scans,
+# context windows by walking newlines, and kept runs are emitted as slices with a
+# single join at the end, so a multi-megabyte generated diff is copied at most once.
+Span = Tuple[int, int]
+
+# Patterns are anchored on a literal "\n" rather than ^/re.M so the regex engine can
+# use its fast literal search
+_HUNK_HEADER_RE = re.compile(r"\n@@ ")
+# A maximal block of consecutive changed lines (group 1, after its leading newline)
+_CHANGE_BLOCK_RE = re.compile(r"\n([+-][^\n]*(?:\n[+-][^\n]*)*)")
+_HEADER_NUMS_RE = re.compile(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _line_end(text: str, pos: int, end: int) -> int:
+    nl = text.find("\n", pos, end)
+    return end if nl == -1 else nl
+
+
+@functools.lru_cache(maxsize=8)
+def _next_lines_re(n: int) -> re.Pattern:
+    return re.compile(r"(?:\n[^\n]*){0,%d}" % n)
+
+
+def _widen(patch: str, start: int, end: int, lo: int, hi: int, ctx: int) -> Span:
+    """Extend the line run [start, end) by `ctx` lines each way within [lo, hi)."""
+    for _ in range(ctx):
+        if start <= lo:
+            break
+        prev = patch.rfind("\n", lo, start - 1)
+        start = lo if prev == -1 else prev + 1
+    if ctx:
+        end = _next_lines_re(ctx).match(patch, end, hi).end()
+    return start, end
+
+
+def _kept_runs(patch: str, start: int, end: int, ctx: int) -> List[Span]:
+    """Offset runs within a hunk body [start, end) to keep: changes plus `ctx` context."""
+    blocks: List[Span] = []
+    # `start` follows the header's newline, so scan from that newline
+    for m in _CHANGE_BLOCK_RE.finditer(patch, start - 1, end):
+        s, e = m.span(1)
+        # Windows of changes at most 2*ctx+1 lines apart overlap or touch: one run
+        if blocks and patch.count("\n", blocks[-1][1], s) <= 2 * ctx + 1:
+            blocks[-1] = (blocks[-1][0], e)
+        else:
+            blocks.append((s, e))
+    return [_widen(patch, s, e, start, end, ctx) for s, e in blocks]
+
+
+def _emit(ranges: List[Union[Span, str]], start: int, end: int) -> None:
+    """Append [start, end) to `ranges`, merging with the previous range when adjacent."""
+    if ranges and isinstance(ranges[-1], tuple) and ranges[-1][1] + 1 == start:
+        ranges[-1] = (ranges[-1][0], end)
+    else:
+        ranges.append((start, end))
 
-def _collect_hunk(lines: List[str], start_idx: int) -> (List[str], int):
-    """
-    Collect a unified-diff hunk starting at a header line '@@ ... @@'.
-    Returns (hunk_lines_without_header, next_index_after_hunk).
-    """
-    i = start_idx + 1  # skip header itself
-    hunk: List[str] = []
-    while i < len(lines) and not lines[i].startswith("@@ "):
-        hunk.append(lines[i])
-        i += 1
-    return hunk, i
 
+def _line_counts(patch: str, start: int, end: int) -> Tuple[int, int]:
+    """(old-side, new-side) line counts of the whole hunk-body lines in [start, end)."""
+    if end <= start:
+        return 0, 0
+    # `start` follows a newline: count lines by the character after each newline
+    n = patch.count("\n", start, end) + 1
+    removed = patch.count("\n-", start - 1, end)
+    added = patch.count("\n+", start - 1, end)
+    notes = patch.count("\n\\", start - 1, end)
+    return n - added - notes, n - removed - notes
 
-def slim_patch_to_changed(patch: str, ctx: int, marker: Optional[str] = None) -> str:
+
+def _run_header(patch: str, hs: int, he: int, body_start: int, s: int, e: int) -> str:
+    """Hunk header with the exact line numbers of the kept run [s, e) of a hunk."""
+    m = _HEADER_NUMS_RE.match(patch, hs, he)
+    if m is None:
+        return patch[hs:he]
+    old_before, new_before = _line_counts(patch, body_start, s - 1)
+    old_n, new_n = _line_counts(patch, s, e)
+
+    def rng(start: str, count: Optional[str], before: int, n: int) -> str:
+        # An empty range names the line before it (git's "0,0" at the file start)
+        first = int(start) + (count == "0") + before
+        return f"{first},{n}" if n else f"{first - 1},0"
+
+    old = rng(m.group(1), m.group(2), old_before, old_n)
+    new = rng(m.group(3), m.group(4), new_before, new_n)
+    return f"@@ -{old} +{new} @@{patch[m.end() : he]}"
+
+
+def slim_patch_to_changed(
+    patch: str, ctx: int, marker: Optional[str] = None, trailing_newline: bool = True
+) -> str:
     """
     Keep only changed lines (+/-) plus `ctx` lines of surrounding context for each hunk.
+    Every kept run of a slimmed hunk gets its own header with exact line numbers.
     If `marker` is provided and appears in any line of a hunk, the entire hunk is dropped.
-    Returns a slimmer unified diff string (may be empty).
+    Returns a slimmer unified diff string (may be empty), ending in a newline unless
+    `trailing_newline` is False.
     """
     if not patch:
         return patch
 
-    out: List[str] = []
-    lines = patch.splitlines()
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        if line.startswith("@@ "):
-            # Start of a hunk
-            header = line
-            hunk, i = _collect_hunk(lines, i)
-
-            # Drop hunks containing the ignore marker
-            if marker and any(marker in hl for hl in hunk):
-                continue
-
-            # Identify indices of changed lines
-            change_idxs = [
-                idx for idx, hl in enumerate(hunk) if hl.startswith(("+", "-"))
-            ]
-            if not change_idxs:
-                # No actual +/- changes → skip
-                continue
-
-            # Build kept ranges with context
-            kept: List[str] = []
-            last_end = -1
-            for idx in change_idxs:
-                win_start = max(0, idx - ctx)
-                win_end = min(len(hunk), idx + ctx + 1)
-                # If this window doesn't overlap the previous, append fresh; else extend
-                if win_start > last_end:
-                    kept.extend(hunk[win_start:win_end])
-                else:
-                    # extend overlapping region
-                    extend_from = max(0, last_end)
-                    kept.extend(hunk[extend_from:win_end])
-                last_end = win_end
-
-            out.append(header)
-            out.extend(kept)
+    # Lines outside hunks (file headers, etc.) are ignored for slimming
+    headers = [m.start() + 1 for m in _HUNK_HEADER_RE.finditer(patch)]
+    if patch.startswith("@@ "):
+        headers.insert(0, 0)
+    # A final newline terminates the last line rather than starting an empty one
+    text_end = len(patch) - 1 if patch.endswith("\n") else len(patch)
+    # Output as offsets into `patch`, plus the headers written for slimmed hunks
+    ranges: List[Union[Span, str]] = []
+    for i, hs in enumerate(headers):
+        hunk_end = headers[i + 1] - 1 if i + 1 < len(headers) else text_end
+        he = _line_end(patch, hs, hunk_end)
+        body_start = he + 1
+        if body_start > hunk_end:
+            continue
+        # Drop hunks containing the ignore marker (markers never span lines)
+        if marker and patch.find(marker, body_start, hunk_end) != -1:
+            continue
+        runs = _kept_runs(patch, body_start, hunk_end, ctx)
+        if not runs:
+            # No actual +/- changes → skip
             continue
+        if runs == [(body_start, hunk_end)]:
+            _emit(ranges, hs, hunk_end)  # nothing elided: header and body as-is
+            continue
+        for s, e in runs:
+            ranges.append(_run_header(patch, hs, he, body_start, s, e))
+            ranges.append((s, e))
+
+    if not ranges:
+        return ""
+    if len(ranges) == 1:
+        s, e = ranges[0]
+        if trailing_newline and patch.startswith("\n", e):
+            e += 1
+            trailing_newline = False
+        if s == 0 and e == len(patch) and not trailing_newline:
+            return patch  # nothing slimmed away
+        if not trailing_newline:
+            return patch[s:e]
+    pieces = [r if isinstance(r, str) else patch[r[0] : r[1]] for r in ranges]
+    if trailing_newline:
+        pieces.append("")
+    return "\n".join(pieces)
+
+
+def split_patch_by_hunks(patch: str, max_chars: int) -> List[str]:
+    """
+    Split a unified diff into sub-patches of at most `max_chars`, cutting only at
+    hunk boundaries so every part keeps its own '@@' header (and line numbers).
+    A single hunk larger than `max_chars` becomes its own part; callers decide
+    whether to truncate it. Lines before the first hunk stay with the first part.
+    Each part is a single slice of `patch`.
+    """
+    if not patch or len(patch) <= max_chars:
+        return [patch] if patch else []
 
-        # Outside hunks (file headers, etc.) are ignored for slimming
-        i += 1
+    # Segment [start, end) offsets: [preamble + hunk1, hunk2, ...] without the
+    # newline that separates them
+    starts: List[int] = [0]
+    pos = 0 if patch.startswith("@@ ") else patch.find("\n@@ ") + 1
+    if pos > 0 or patch.startswith("@@ "):
+        while True:
+            nxt = patch.find("\n@@ ", pos + 1)
+            if nxt == -1:
+                break
+            starts.append(nxt + 1)
+            pos = nxt + 1
+    ends = [s - 1 for s in starts[1:]] + [len(patch)]
 
-    return ("\n".join(out) + "\n") if out else ""
+    parts: List[str] = []
+    cur_start = None
+    cur_end = 0
+    for s, e in zip(starts, ends):
+        if cur_start is not None and e - cur_start > max_chars:
+            parts.append(patch[cur_start:cur_end])
+            cur_start = None
+        if cur_start is None:
+            cur_start = s
+        cur_end = e
+    if cur_start is not None:
+        parts.append(patch[cur_start:cur_end])
+    return parts
@@ -0,0 +1,84 @@
+# app/file_priority.py
+import math
+import os
+import re
+from typing import Dict, List
+
+from app.file_filters import matches_any
+from app.review_strategy import language_of
+from app.rulepacks import get_rulepack
+from app.settings import settings
+from app.token_budget import count_changed_lines
+
+_TEST_PATH_RE = re.compile(
+    r"(^|/)(tests?|__tests__|spec)/|(^|/)test_[^/]*$|_test\.[^/]+$|\.(test|spec)\.[^/]+$"
+)
+
+# Docs/data rather than code (everything else unknown to LANG_BY_EXT counts as code)
+NON_CODE_EXTS = {
+    ".md",
+    ".rst",
+    ".txt",
+    ".json",
+    ".yaml",
+    ".yml",
+    ".toml",
+    ".ini",
+    ".cfg",
+    ".csv",
+    ".svg",
+}
+
+# Score weights; only the relative order matters
+RULEPACK_LANG = 3.0  # languages we ship rules for (see app/rulepacks.py)
+OTHER_CODE = 1.0
+SENSITIVE_PATH = 4.0
+TEST_FILE = -2.0
+ADDED_FILE = 1.0
+REMOVED_FILE = -3.0
+
+
+def is_test_path(path: str) -> bool:
+    return bool(_TEST_PATH_RE.search(path or ""))
+
+
+def score_file(candidate: Dict) -> float:
+    """
+    Higher = review first. Uses language/rulepack coverage, security-sensitive paths,
+    churn (additions + deletions), file status, test vs source and how many other
+    files share its deduplicated hunks.
+    """
+    path = candidate["filename"]
+    score = 0.0
+
+    lang = language_of(path)
+    if get_rulepack([lang]):
+        score += RULEPACK_LANG
+    elif os.path.splitext(path)[1].lower() not in NON_CODE_EXTS:
+        score += OTHER_CODE
+
+    if matches_any(path, settings.priority_paths):
+        score += SENSITIVE_PATH
+    if is_test_path(path):
+        score += TEST_FILE
+
+    status = candidate.get("status")
+    if status == "added":
+        score += ADDED_FILE
+    elif status == "removed":
+        score += REMOVED_FILE
+
+    # Diminishing returns: a 1000-line change is not 100x more important than 10 lines
+    churn = candidate.get("changes")
+    if churn is None:
+        churn = count_changed_lines(candidate.get("patch", ""))
+    score += math.log2(1 + churn) / 2
+
+    copies = sum(len(d[2]) for d in candidate.get("dedup", []))
+    score += math.log2(1 + copies)
+    return score
+
+
+def rank_candidates(candidates: List[Dict]) -> List[Dict]:
+    """Stable sort by descending score (ties keep GitHub API order)."""
+    return sorted(candidates, key=score_file, reverse=True)
@@ -0,0 +1,117 @@
+# app/findings.py
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Severity codes index SEVERITIES; 0 means "no findings" in max/gate computations
+SEVERITIES = ("", "low", "medium", "high")
+_SEV_CODE = {"low": 1, "medium": 2, "high": 3}
+_DEFAULT_SEV = 2  # missing/unknown severities count as medium
+NO_LINE = -1
+
+
+def severity_code(value) -> int:
+    # Exact-case values (the common case) skip the str()/lower() round trip
+    code = _SEV_CODE.get(value) if isinstance(value, str) else None
+    if code is None:
+        code = _SEV_CODE.get(str(value or "").lower(), _DEFAULT_SEV)
+    return code
+
+
+class FindingsTable:
+    """
+    Columnar store of review findings, one row per LLM comment across all batches:
+    parallel typed arrays of file id, rule id, batch number, severity code and placed
+    line (NO_LINE until an inline comment is placed). Filenames and rule names
+    (a comment's optional "rule"; "" when absent) are interned once.
+    Histograms, gates and per-file counts are single passes over a column (or a
+    row range of one batch) instead of re-walking the parsed JSON.
+    """
+
+    __slots__ = (
+        "filenames",
+        "_file_ids",
+        "rules",
+        "_rule_ids",
+        "file_id",
+        "rule_id",
+        "batch",
+        "severity",
+        "line",
+    )
+
+    def __init__(self):
+        self.filenames: List[str] = []
+        self._file_ids: Dict[str, int] = {}
+        self.rules: List[str] = [""]
+        self._rule_ids: Dict[str, int] = {"": 0}
+        self.file_id = array("I")
+        self.rule_id = array("I")
+        self.batch = array("I")
+        self.severity = array("B")
+        self.line = array("i")
+
+    def __len__(self) -> int:
+        return len(self.severity)
+
+    def _intern(self, filename: str) -> int:
+        fid = self._file_ids.get(filename)
+        if fid is None:
+            fid = self._file_ids[filename] = len(self.filenames)
+            self.filenames.append(filename)
+        return fid
+
+    def _rule(self, rule) -> int:
+        rule = str(rule or "")
+        rid = self._rule_ids.get(rule)
+        if rid is None:
+            rid = self._rule_ids[rule] = len(self.rules)
+            self.rules.append(rule)
+        return rid
+
+    def add_parsed(self, parsed: Dict, batch: int) -> Tuple[int, int]:
+        """Append the comments of one parsed LLM response; returns their row range."""
+        start = len(self)
+        for f in parsed.get("files", []):
+            comments = f.get("comments", [])
+            if not comments:
+                continue
+            fid = self._intern(f.get("filename") or "")
+            n = len(comments)
+            self.file_id.extend([fid] * n)
+            self.rule_id.extend([self._rule(c.get("rule")) for c in comments])
+            self.batch.extend([batch] * n)
+            self.severity.extend([severity_code(c.get("severity")) for c in comments])
+            self.line.extend([NO_LINE] * n)
+        return start, len(self)
+
+    # --- aggregates ------------------------------------------------------------------
+    def _severities(self, start: int, end: Optional[int]) -> array:
+        if start == 0 and end is None:
+            return self.severity
+        return self.severity[start:end]
+
+    def histogram(self, start: int = 0, end: Optional[int] = None) -> Dict[str, int]:
+        """{"low", "medium", "high"} counts over all rows or a row range."""
+        counts = self._severities(start, end).tobytes()
+        return {
+            name: counts.count(code) for code, name in enumerate(SEVERITIES) if code
+        }
+
+    def max_severity(self, start: int = 0, end: Optional[int] = None) -> int:
+        return max(self._severities(start, end), default=0)
+
+    def per_file(self) -> Dict[str, int]:
+        """Findings per filename, most first."""
+        counts = [0] * len(self.filenames)
+        for fid in self.file_id:
+            counts[fid] += 1
+        order = sorted(range(len(counts)), key=counts.__getitem__, reverse=True)
+        return {self.filenames[i]: counts[i] for i in order if counts[i]}
+
+    def rows(self) -> Iterator[Tuple[str, str, int, int, int]]:
+        """(filename, rule, batch, severity code, line) per finding."""
+        files, rules = self.filenames, self.rules
+        for fid, rid, b, sev, ln in zip(
+            self.file_id, self.rule_id, self.batch, self.severity, self.line
+        ):
+            yield files[fid], rules[rid], b, sev, ln
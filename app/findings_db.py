@@ -0,0 +1,196 @@
+# app/findings_db.py
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from app.findings import NO_LINE, FindingsTable
+
+# Append-only: one `runs` row per review run and its findings. repo/pr are repeated
+# on findings so the per-repo/per-file indexes serve queries without a join.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    pr INTEGER NOT NULL,
+    head_sha TEXT,
+    created_at TEXT NOT NULL,
+    overall_event TEXT,
+    files_reviewed INTEGER,
+    comments INTEGER,
+    llm_calls INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    repo TEXT NOT NULL,
+    pr INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    rule TEXT NOT NULL DEFAULT '',
+    severity INTEGER NOT NULL,
+    line INTEGER,
+    batch INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_runs_repo_pr ON runs(repo, pr, created_at);
+CREATE INDEX IF NOT EXISTS ix_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS ix_findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS ix_findings_repo_pr ON findings(repo, pr);
+CREATE INDEX IF NOT EXISTS ix_findings_file ON findings(repo, file);
+CREATE INDEX IF NOT EXISTS ix_findings_rule ON findings(rule, severity);
+CREATE INDEX IF NOT EXISTS ix_findings_severity ON findings(severity, run_id);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_run(
+    path: str,
+    repo: str,
+    pr: int,
+    head_sha: Optional[str],
+    overall_event: str,
+    usage: Dict[str, int],
+    findings: FindingsTable,
+    files_reviewed: int,
+    created_at: Optional[str] = None,
+) -> Optional[int]:
+    """Append one run and its findings; returns the run id (None if the write failed)."""
+    created_at = created_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    try:
+        conn = connect(path)
+        try:
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO runs (repo, pr, head_sha, created_at, overall_event,"
+                    " files_reviewed, comments, llm_calls, prompt_tokens,"
+                    " completion_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        repo,
+                        pr,
+                        head_sha,
+                        created_at,
+                        overall_event,
+                        files_reviewed,
+                        len(findings),
+                        usage.get("calls", 0),
+                        usage.get("prompt_tokens", 0),
+                        usage.get("completion_tokens", 0),
+                    ),
+                )
+                run_id = cur.lastrowid
+                conn.executemany(
+                    "INSERT INTO findings (run_id, repo, pr, file, rule, severity,"
+                    " line, batch) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            run_id,
+                            repo,
+                            pr,
+                            f,
+                            rule,
+                            sev,
+                            None if ln == NO_LINE else ln,
+                            b,
+                        )
+                        for f, rule, b, sev, ln in findings.rows()
+                    ),
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        # The database is for trend reports; the review itself must not fail on it
+        print(f"Findings DB write skipped: {e}")
+        return None
+    return run_id
+
+
+# --- queries ----------------------------------------------------------------------
+def _where(clauses: List[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def hot_files(
+    conn: sqlite3.Connection,
+    repo: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 10,
+) -> List[Dict]:
+    """Files with the most findings, counting only the latest run of each PR."""
+    clauses = ["f.run_id IN (SELECT MAX(id) FROM runs GROUP BY repo, pr)"]
+    params: List = []
+    if repo:
+        clauses.append("f.repo = ?")
+        params.append(repo)
+    if since:
+        clauses.append("f.run_id IN (SELECT id FROM runs WHERE created_at >= ?)")
+        params.append(since)
+    rows = conn.execute(
+        "SELECT f.repo, f.file, COUNT(*) AS findings,"
+        " SUM(f.severity = 3) AS high, COUNT(DISTINCT f.pr) AS prs"
+        f" FROM findings f {_where(clauses)}"
+        " GROUP BY f.repo, f.file ORDER BY findings DESC, high DESC, f.file LIMIT ?",
+        (*params, limit),
+    )
+    return [dict(r) for r in rows]
+
+
+def severity_trend(
+    conn: sqlite3.Connection,
+    repo: Optional[str] = None,
+    since: Optional[str] = None,
+    bucket: str = "day",
+) -> List[Dict]:
+    """Findings per severity per day (or ISO-ish week) across all runs."""
+    period = "substr(r.created_at, 1, 10)"
+    if bucket == "week":
+        period = "strftime('%Y-W%W', r.created_at)"
+    clauses: List[str] = []
+    params: List = []
+    if repo:
+        clauses.append("r.repo = ?")
+        params.append(repo)
+    if since:
+        clauses.append("r.created_at >= ?")
+        params.append(since)
+    rows = conn.execute(
+        f"SELECT {period} AS period, COUNT(DISTINCT r.id) AS runs,"
+        " SUM(f.severity = 1) AS low, SUM(f.severity = 2) AS medium,"
+        " SUM(f.severity = 3) AS high"
+        f" FROM runs r JOIN findings f ON f.run_id = r.id {_where(clauses)}"
+        " GROUP BY period ORDER BY period",
+        params,
+    )
+    return [dict(r) for r in rows]
+
+
+def tokens_per_pr(
+    conn: sqlite3.Connection,
+    repo: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict]:
+    """LLM usage per PR summed over all of its runs (reruns cost tokens too)."""
+    clauses: List[str] = []
+    params: List = []
+    if repo:
+        clauses.append("repo = ?")
+        params.append(repo)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    rows = conn.execute(
+        "SELECT repo, pr, COUNT(*) AS runs, SUM(llm_calls) AS llm_calls,"
+        " SUM(prompt_tokens) AS prompt_tokens,"
+        " SUM(completion_tokens) AS completion_tokens,"
+        " SUM(prompt_tokens + completion_tokens) AS total_tokens"
+        f" FROM runs {_where(clauses)}"
+        " GROUP BY repo, pr ORDER BY total_tokens DESC, repo, pr LIMIT ?",
+        (*params, limit),
+    )
+    return [dict(r) for r in rows]
@@ -0,0 +1,128 @@
+# app/hunk_dedup.py
+import hashlib
+import re
+from typing import Dict, FrozenSet, List, Tuple
+
+from app.inline_mapper import commentable_lines
+
+# (filename, new_start, commentable RIGHT-side lines of that copy)
+Copy = Tuple[str, int, FrozenSet[int]]
+
+# Same "\" convention as compaction annotations: ignored by line mapping
+DEDUP_PREFIX = "\\ [dedup] "
+MAX_NAMES_IN_NOTE = 5
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def _split_hunks(patch: str) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    preamble: List[str] = []
+    hunks: List[Tuple[str, List[str]]] = []
+    for ln in patch.splitlines():
+        if ln.startswith("@@ "):
+            hunks.append((ln, []))
+        elif hunks:
+            hunks[-1][1].append(ln)
+        else:
+            preamble.append(ln)
+    return preamble, hunks
+
+
+def _new_range(header: str) -> Tuple[int, int]:
+    m = _HUNK_RE.match(header)
+    if not m:
+        return 0, 0
+    return int(m.group(1)), int(m.group(2) or 1)
+
+
+def _hunk_key(body: List[str]) -> str:
+    # Headers are left out so the same edit at different line numbers still matches.
+    # Identical bodies line up from their header's start (slimmed hunks get exact
+    # headers), so one offset maps a line into every copy.
+    return hashlib.sha1("\n".join(body).encode("utf-8")).hexdigest()
+
+
+def dedup_hunks(patches: List[Dict]) -> List[Dict]:
+    """
+    Review each unique hunk once across the PR. The first file carrying a hunk keeps
+    it (with an annotation naming the other files); identical hunks are removed from
+    every later file, and files left with no hunks are dropped.
+    Owners get p["dedup"] = [(new_start, new_len, [(filename, new_start, lines), ...])]
+    so findings can be fanned back out with `fan_out_line`; `lines` are the copy's
+    commentable lines, so a target GitHub would reject is never produced.
+    """
+    parsed = [(p, *_split_hunks(p["patch"])) for p in patches]
+
+    owners: Dict[str, Tuple[str, str]] = {}  # key -> (owner filename, owner header)
+    copies: Dict[str, List[Copy]] = {}
+    for p, _, hunks in parsed:
+        for header, body in hunks:
+            key = _hunk_key(body)
+            if key not in owners:
+                owners[key] = (p["filename"], header)
+            elif owners[key][0] != p["filename"]:
+                copies.setdefault(key, []).append(
+                    (
+                        p["filename"],
+                        _new_range(header)[0],
+                        frozenset(commentable_lines("\n".join([header, *body]))),
+                    )
+                )
+
+    if not copies:
+        return patches
+
+    out: List[Dict] = []
+    for p, preamble, hunks in parsed:
+        lines: List[str] = list(preamble)
+        fan_out: List[Tuple[int, int, List[Copy]]] = []
+        kept = 0
+        for header, body in hunks:
+            key = _hunk_key(body)
+            owner = owners[key]
+            if owner[0] != p["filename"]:
+                continue  # reviewed with the owner's copy
+            dups = copies.get(key)
+            lines.append(header)
+            if dups and owner[1] == header:
+                names = [d[0] for d in dups]
+                more = len(names) - MAX_NAMES_IN_NOTE
+                note = ", ".join(names[:MAX_NAMES_IN_NOTE]) + (
+                    f" (+{more} more)" if more > 0 else ""
+                )
+                lines.append(
+                    f"{DEDUP_PREFIX}identical hunk also in {len(dups)} file(s): {note}"
+                )
+                start, length = _new_range(header)
+                fan_out.append((start, length, dups))
+            lines.extend(body)
+            kept += 1
+        if not kept:
+            continue
+        entry = dict(p, patch="\n".join(lines))
+        if fan_out:
+            entry["dedup"] = fan_out
+        out.append(entry)
+
+    print(
+        f"Dedup: {sum(len(v) for v in copies.values())} duplicate hunk(s) "
+        f"folded into {len(copies)} unique hunk(s)."
+    )
+    return out
+
+
+def fan_out_line(
+    dedup: List[Tuple[int, int, List[Copy]]], line: int
+) -> List[Tuple[str, int]]:
+    """
+    Map a RIGHT-side line inside a deduplicated hunk to [(filename, line)] in each
+    copy. Copies where the mapped line is not commentable are left out.
+    """
+    for start, length, dups in dedup or []:
+        if start <= line < start + length:
+            targets = [
+                (fname, dup_start + (line - start), valid)
+                for fname, dup_start, valid in dups
+            ]
+            return [(fname, ln) for fname, ln, valid in targets if ln in valid]
+    return []
@@ -1,4 +1,7 @@
-from typing import List, Optional
+import re
+from typing import List, Optional, Set
+
+_HUNK_NEW_START_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
 
 
 def find_addition_lines(patch: str) -> List[int]:
@@ -34,6 +37,9 @@ def find_addition_lines(patch: str) -> List[int]:
         # File header "+"
         if ln.startswith("+++"):
             continue
+        # "\ No newline at end of file" / compaction annotations occupy no line
+        if ln.startswith("\\"):
+            continue
         if ln.startswith("---"):
             continue
 
@@ -78,7 +84,7 @@ def _first_added_line_containing(patch: str, token: str) -> Optional[int]:
                 current_target_line = 0
             continue
 
-        if ln.startswith("+++") or ln.startswith("---"):
+        if ln.startswith("+++") or ln.startswith("---") or ln.startswith("\\"):
             continue
 
         if ln.startswith("+") and not ln.startswith("+++"):
@@ -112,3 +118,26 @@ def guess_line_for_hint(patch: str, hint: str) -> Optional[int]:
     # Fallback: first added line heuristic
     candidates = find_addition_lines(patch)
     return candidates[0] if candidates else None
+
+
+def commentable_lines(patch: str) -> Set[int]:
+    """
+    RIGHT-side line numbers GitHub accepts for a review comment on this patch:
+    added and context lines inside a hunk (deleted lines exist only on the LEFT).
+    """
+    lines: Set[int] = set()
+    current_target_line = 0
+    in_hunk = False
+    for ln in (patch or "").splitlines():
+        if ln.startswith("@@ "):
+            m = _HUNK_NEW_START_RE.match(ln)
+            current_target_line = int(m.group(1)) - 1 if m else 0
+            in_hunk = m is not None
+            continue
+        if not in_hunk or ln.startswith("\\"):
+            continue
+        if ln.startswith("-"):
+            continue
+        current_target_line += 1
+        lines.add(current_target_line)
+    return lines
@@ -0,0 +1,71 @@
+# app/live_summary.py
+import os
+from typing import Dict, List, Optional
+
+from app.settings import settings
+
+
+def batch_section(b: Dict, total_batches) -> List[str]:
+    """Markdown lines for one batch record of the report."""
+    lines = [f"### Batch {b.get('batch')}/{total_batches}"]
+    lines.append(f"- **Event:** `{b.get('event')}`")
+    files_list = ", ".join(b.get("files_in_batch", [])) or "—"
+    lines.append(f"- **Files:** `{files_list}`")
+    m = b.get("metrics", {})
+    sh = m.get("severity_histogram", {})
+    lines.append(
+        f"- **Severities:** high={sh.get('high', 0)}, medium={sh.get('medium', 0)}, low={sh.get('low', 0)}"
+    )
+    excerpt = (b.get("summary_excerpt") or "").strip()
+    if excerpt:
+        lines.append("")
+        lines.append("> " + excerpt.replace("\n", "\n> "))
+        lines.append("")
+    return lines
+
+
+class LiveSummary:
+    """
+    Appends each batch's section to the Actions job summary (GITHUB_STEP_SUMMARY) as
+    soon as the batch is reviewed. tools/ci_summary.py then only adds the outcome
+    and totals. Best-effort: the first failed write turns it off.
+    """
+
+    def __init__(self, path: str):
+        self.path: Optional[str] = path
+
+    @classmethod
+    def from_env(cls) -> Optional["LiveSummary"]:
+        path = os.environ.get("GITHUB_STEP_SUMMARY")
+        if not path or not settings.enable_job_summary or not settings.live_job_summary:
+            return None
+        return cls(path)
+
+    def _append(self, lines: List[str]) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"Live job summary disabled: {e}")
+            self.path = None
+
+    def start(self, total_batches: int) -> None:
+        title = settings.summary_title or "GPT Code Review"
+        self._append(
+            [
+                f"# {title}",
+                "",
+                f"_Reviewing {total_batches} batch(es); results appear as each finishes._",
+                "",
+                "## Batches",
+                "",
+            ]
+        )
+
+    def batch(self, meta: Dict, total_batches: int) -> None:
+        self._append(batch_section(meta, total_batches))
+
+    def note(self, text: str) -> None:
+        self._append([f"_{text}_", ""])
@@ -0,0 +1,121 @@
+# app/local_diff.py
+import subprocess
+from typing import Iterable, Iterator, List, Optional
+
+from app.pr_files import PRFile, is_wanted
+
+# Stable, machine-readable diff regardless of the runner's git config
+_GIT_DIFF_ARGS = [
+    "-c",
+    "core.quotePath=false",
+    "diff",
+    "--no-color",
+    "--no-ext-diff",
+    "--find-renames",
+    "--full-index",  # full blob SHAs on the index line
+]
+
+_NULL_SHA = "0" * 40
+
+
+class _FileDiff:
+    """Accumulates one file's section of `git diff` output."""
+
+    def __init__(self, header: str):
+        # "diff --git a/<old> b/<new>"; exact for paths without " b/", refined by
+        # the ---/+++ and rename lines below
+        self.filename = header.rsplit(" b/", 1)[-1]
+        self.status = "modified"
+        self.additions = 0
+        self.deletions = 0
+        self.sha: Optional[str] = None  # blob SHA on the head side
+        self.lines: Optional[List[str]] = None  # patch lines once the first @@ is seen
+        self.keep = True
+
+    def header_line(self, line: str) -> None:
+        if line.startswith("new file mode"):
+            self.status = "added"
+        elif line.startswith("deleted file mode"):
+            self.status = "removed"
+        elif line.startswith("rename to "):
+            self.status = "renamed"
+            self.filename = line[len("rename to ") :]
+        elif line.startswith("index "):
+            # "index <old>..<new>[ <mode>]"
+            new = line[len("index ") :].split(" ", 1)[0].partition("..")[2]
+            self.sha = new if new and new != _NULL_SHA else None
+        elif line.startswith("+++ b/"):
+            self.filename = line[len("+++ b/") :]
+        elif line.startswith("--- a/") and self.status == "removed":
+            self.filename = line[len("--- a/") :]
+
+    def to_pr_file(self) -> PRFile:
+        patch = "\n".join(self.lines) if self.lines and self.keep else None
+        return PRFile(
+            filename=self.filename,
+            status=self.status,
+            additions=self.additions,
+            deletions=self.deletions,
+            changes=self.additions + self.deletions,
+            patch=patch,
+            sha=self.sha,
+        )
+
+
+def parse_git_diff(lines: Iterable[str]) -> Iterator[PRFile]:
+    """
+    Turn `git diff` output into PRFile records shaped like the files API: the patch
+    starts at the first '@@' header and has no trailing newline; binary files have
+    no patch. Patch lines of files the include/exclude globs drop are never kept.
+    """
+    cur: Optional[_FileDiff] = None
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("diff --git "):
+            if cur is not None:
+                yield cur.to_pr_file()
+            cur = _FileDiff(line)
+            continue
+        if cur is None:
+            continue
+        if cur.lines is None:
+            if not line.startswith("@@"):
+                cur.header_line(line)
+                continue
+            cur.keep = is_wanted(cur.filename)
+            cur.lines = []
+        if line.startswith("+"):
+            cur.additions += 1
+        elif line.startswith("-"):
+            cur.deletions += 1
+        if cur.keep:
+            cur.lines.append(line)
+    if cur is not None:
+        yield cur.to_pr_file()
+
+
+def iter_local_files(
+    base: str, head: str = "HEAD", repo_dir: str = "."
+) -> Iterator[PRFile]:
+    """
+    Stream the PR's files from a local checkout: `git diff base...head` (changes on
+    head since the merge base, like the PR files view), one PRFile per file as its
+    section of the diff is read. No 3000-file or per-file patch size limits apply.
+    """
+    proc = subprocess.Popen(
+        ["git", *_GIT_DIFF_ARGS, f"{base}...{head}"],
+        cwd=repo_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+        errors="replace",
+    )
+    try:
+        yield from parse_git_diff(proc.stdout)
+    finally:
+        proc.stdout.close()
+        err = proc.stderr.read()
+        proc.stderr.close()
+        code = proc.wait()
+    if code != 0:
+        raise RuntimeError(f"git diff {base}...{head} failed ({code}): {err.strip()}")
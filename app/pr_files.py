@@ -0,0 +1,84 @@
+# app/pr_files.py
+from typing import Dict, Iterable, List, Optional, Union
+
+from app.file_filters import should_include
+from app.settings import settings
+
+# GitHub change stats carried through to prioritization/reporting
+FILE_STATS_KEYS = ("status", "additions", "deletions", "changes")
+
+
+class PRFile:
+    """
+    Compact record for one PR file. Unlike the raw API object it drops blob/raw/contents
+    URLs and commit SHAs, and only holds the patch while it is still needed (None for
+    files excluded at ingestion or once the patch has been prepared). `sha` is the
+    file's blob SHA at the PR head, used to fetch (and cache) its full contents.
+    """
+
+    __slots__ = (
+        "filename",
+        "status",
+        "additions",
+        "deletions",
+        "changes",
+        "patch",
+        "sha",
+    )
+
+    def __init__(
+        self,
+        filename: str,
+        status: Optional[str] = None,
+        additions: Optional[int] = None,
+        deletions: Optional[int] = None,
+        changes: Optional[int] = None,
+        patch: Optional[str] = None,
+        sha: Optional[str] = None,
+    ):
+        self.filename = filename
+        self.status = status
+        self.additions = additions
+        self.deletions = deletions
+        self.changes = changes
+        self.patch = patch
+        self.sha = sha
+
+    @classmethod
+    def from_api(cls, obj: Union[Dict, "PRFile"], keep_patch: bool = True) -> "PRFile":
+        if isinstance(obj, PRFile):
+            return obj
+        return cls(
+            filename=obj.get("filename") or "",
+            status=obj.get("status"),
+            additions=obj.get("additions"),
+            deletions=obj.get("deletions"),
+            changes=obj.get("changes"),
+            patch=obj.get("patch") if keep_patch else None,
+            sha=obj.get("sha"),
+        )
+
+    def stats(self) -> Dict:
+        """The GitHub change stats that were present on the API object."""
+        return {
+            k: getattr(self, k) for k in FILE_STATS_KEYS if getattr(self, k) is not None
+        }
+
+    def release_patch(self) -> Optional[str]:
+        """Return the patch and drop this record's reference to it."""
+        patch, self.patch = self.patch, None
+        return patch
+
+
+def is_wanted(filename: str) -> bool:
+    return bool(filename) and should_include(
+        filename, settings.include_globs, settings.exclude_globs
+    )
+
+
+def ingest_files(objs: Iterable[Dict]) -> List[PRFile]:
+    """
+    Convert one page of API objects to PRFile records, discarding the patch of files
+    that include/exclude globs filter out (vendored deps, lockfiles, ...).
+    """
+    return [PRFile.from_api(o, keep_patch=is_wanted(o.get("filename"))) for o in objs]
@@ -0,0 +1,51 @@
+# app/report_stream.py
+import json
+from typing import Dict, Iterator
+
+REPORT_STREAM_FILE = ".review_report.jsonl"
+STREAM_VERSION = 1
+
+
+class ReportStream:
+    """
+    Append-only JSON Lines report: a "run" record when the review starts, one "batch"
+    record per batch as soon as it is reviewed, and a "summary" record at the end.
+    Every record is flushed on write, so a crashed or cancelled run still leaves the
+    batches it finished. Writes are best-effort, like the JSON report.
+    """
+
+    def __init__(self, path: str = REPORT_STREAM_FILE):
+        self.path = path
+        try:
+            self._f = open(path, "w", encoding="utf-8")
+        except OSError as e:
+            print(f"Report stream disabled: {e}")
+            self._f = None
+
+    def write(self, record_type: str, record: Dict) -> None:
+        if self._f is None:
+            return
+        line = json.dumps({"type": record_type, **record}, separators=(",", ":"))
+        try:
+            self._f.write(line + "\n")
+            self._f.flush()
+        except OSError:
+            self.close()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def read_report_stream(path: str = REPORT_STREAM_FILE) -> Iterator[Dict]:
+    """
+    Yield the records of a report stream one line at a time. The bot always writes
+    UTF-8, so no encoding detection is done; a final line without its newline is a
+    write still in progress (or cut short) and is skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n") or not line.strip():
+                continue
+            yield json.loads(line)
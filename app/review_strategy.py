@@ -23,11 +23,41 @@ LANG_BY_EXT = {
 }
 
 
-def _language_of(filename: str) -> str:
+def language_of(filename: str) -> str:
     _, ext = os.path.splitext(filename or "")
     return LANG_BY_EXT.get(ext.lower(), "Code")
 
 
+def _part_note(patch: Dict) -> str:
+    # Hunk parts of a split file; findings are still reported under the plain filename
+    if not patch.get("parts"):
+        return ""
+    return f"_(part {patch['part']}/{patch['parts']} of this file's hunks)_\n"
+
+
+def _context_note(patch: Dict) -> str:
+    # Enclosing scopes added by app/scope_context.py; reference only, not under review
+    if not patch.get("context"):
+        return ""
+    return (
+        "\nEnclosing scope at the PR head (for reference; review only the diff):\n"
+        f"```\n{patch['context']}\n```"
+    )
+
+
+def _static_note(patch: Dict) -> str:
+    # Findings app/static_checks.py already reports for this patch
+    found = patch.get("static_findings")
+    if not found:
+        return ""
+    listed = "\n".join(f"- line {c['line']}: {c['message']}" for c in found)
+    return f"\nAlready reported by static checks (do not repeat these):\n{listed}"
+
+
+# Bump when the review prompt changes so checkpointed results of the old prompt
+# are not reused
+PROMPT_VERSION = "1"
+
 JSON_INSTRUCTIONS = (
     "Return ONLY JSON with this exact shape:\n"
     "{\n"
@@ -48,7 +78,7 @@ JSON_INSTRUCTIONS = (
 
 
 def build_llm_prompt_from_patches(patches: List[Dict]) -> Tuple[str, str]:
-    langs = sorted({_language_of(p["filename"]) for p in patches}) if patches else []
+    langs = sorted({language_of(p["filename"]) for p in patches}) if patches else []
     lang_line = (
         f"Target languages: {', '.join(langs)}." if langs else "Target language: Code."
     )
@@ -60,7 +90,11 @@ def build_llm_prompt_from_patches(patches: List[Dict]) -> Tuple[str, str]:
     else:
         extra = ""
 
-    files_md = [f"### {p['filename']}\n```\n{p['patch']}\n```" for p in patches]
+    files_md = [
+        f"### {p['filename']}\n{_part_note(p)}```\n{p['patch']}\n```"
+        f"{_context_note(p)}{_static_note(p)}"
+        for p in patches
+    ]
     files_blob = "\n\n".join(files_md) if files_md else "_No patches_"
 
     system = (
@@ -1,3 +1,5 @@
+import re
+
 PYTHON_SEC_RULES = [
     "Avoid exec/eval on untrusted input.",
     "Check for hardcoded secrets (API keys, passwords).",
@@ -18,3 +20,63 @@ def get_rulepack(langs):
     if "JavaScript" in langs or "TypeScript" in langs:
         rules.extend(JS_STYLE_RULES)
     return rules
+
+
+# Compiled counterparts of the rules above for app/static_checks.py, matched against
+# added lines before any LLM call:
+#   (rule id, language families (empty = all), pattern, message, severity, code_only)
+# code_only patterns see the line with string literals and trailing comments blanked.
+LOCAL_RULES = [
+    (
+        "py-eval",
+        ("Python",),
+        re.compile(r"(?<![\w.])(?:eval|exec)\s*\("),
+        PYTHON_SEC_RULES[0],
+        "high",
+        True,
+    ),
+    (
+        "py-shell",
+        ("Python",),
+        re.compile(r"\bshell\s*=\s*True\b"),
+        PYTHON_SEC_RULES[2],
+        "high",
+        True,
+    ),
+    (
+        "hardcoded-secret",
+        (),
+        # Keys naming a kind of secret (token_type, password_field, secret_name)
+        # are left out, and the value must mix letters and digits so "bearer" or
+        # "prod-db" is not taken for a credential
+        re.compile(
+            r"\b(?!\w*(?:type|field|name|label|header|path|file|env|var)['\"]?\s*[:=])"
+            r"\w*(?:password|passwd|secret|api_?key|token)\w*['\"]?\s*[:=]\s*"
+            r"['\"](?=[^'\"\s]*\d)(?=[^'\"\s]*[A-Za-z])[^'\"\s]{8,}['\"]",
+            re.I,
+        ),
+        PYTHON_SEC_RULES[1],
+        "medium",
+        False,
+    ),
+    (
+        "js-var",
+        ("JavaScript", "TypeScript"),
+        re.compile(r"\bvar\s+[A-Za-z_$]"),
+        JS_STYLE_RULES[0],
+        "low",
+        True,
+    ),
+    (
+        "js-eqeq",
+        ("JavaScript", "TypeScript"),
+        re.compile(r"(?<![=!<>])[=!]=(?!=)"),
+        JS_STYLE_RULES[1],
+        "low",
+        True,
+    ),
+]
+
+# Pattern guesses rather than certain findings: a line flagged only by these still
+# goes to the model
+HEURISTIC_RULES = ("hardcoded-secret",)
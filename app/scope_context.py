@@ -0,0 +1,262 @@
+# app/scope_context.py
+import asyncio
+import os
+import re
+import subprocess
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.inline_mapper import commentable_lines
+from app.services.github import GitHubClient
+
+Span = Tuple[int, int]  # 1-based, inclusive new-file line range
+BlobReader = Callable[[str], Awaitable[Optional[bytes]]]
+
+_HUNK_NEW_START_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+_MODIFIERS = (
+    r"(?:(?:export|default|pub(?:\([\w:]+\))?|public|private|protected|internal|"
+    r"static|final|abstract|override|virtual|async|unsafe)\s+)"
+)
+# Lines that open a function/class-like scope in the languages we review
+_SCOPE_RE = re.compile(
+    rf"^\s*(?:{_MODIFIERS}*(?:def|class|function|func|fn|interface|struct|impl|"
+    r"trait|enum|module)\b"
+    # Java/C#-style methods: modifiers, return type, name(
+    rf"|{_MODIFIERS}+[\w<>\[\],.? ]+?\s+\w+\s*\("
+    # JS/TS arrow functions and function expressions bound to a name
+    r"|(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?"
+    r"(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|\w+\s*=>))"
+)
+_MAX_BLOB_BYTES = 2_000_000  # generated/minified files are not worth the context
+
+
+class BlobCache:
+    """
+    File contents keyed by git blob SHA. Blobs are immutable, so entries never go
+    stale: memory serves every batch of a run, `directory` (if set) later runs.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._mem: Dict[str, str] = {}
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.directory, sha[:2], sha)
+
+    def get(self, sha: str) -> Optional[str]:
+        if sha in self._mem:
+            return self._mem[sha]
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(sha), "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        self._mem[sha] = text
+        return text
+
+    def put(self, sha: str, text: str) -> None:
+        self._mem[sha] = text
+        if not self.directory:
+            return
+        path = self._path(sha)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Caching is best-effort; the review itself must not fail on it
+            print(f"Blob cache write skipped: {e}")
+
+
+def local_blob_reader(repo_dir: str = ".") -> BlobReader:
+    """Read blobs from the local checkout's object store."""
+
+    async def read(sha: str) -> Optional[bytes]:
+        r = await asyncio.to_thread(
+            subprocess.run,
+            ["git", "cat-file", "blob", sha],
+            cwd=repo_dir,
+            capture_output=True,
+        )
+        return r.stdout if r.returncode == 0 else None
+
+    return read
+
+
+def api_blob_reader(gh: GitHubClient, repo: str) -> BlobReader:
+    """Read blobs through the git blobs API."""
+
+    async def read(sha: str) -> Optional[bytes]:
+        return await gh.get_blob(repo, sha)
+
+    return read
+
+
+def _decode(data: Optional[bytes]) -> Optional[str]:
+    if not data or len(data) > _MAX_BLOB_BYTES or b"\0" in data[:8000]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def changed_spans(patch: str) -> List[Span]:
+    """New-file line range touched by each hunk (deletions count as the next line)."""
+    spans: List[Span] = []
+    lo = hi = None
+    line = 0
+    for ln in patch.split("\n"):
+        if ln.startswith("@@ "):
+            if lo is not None:
+                spans.append((lo, hi))
+            lo = hi = None
+            m = _HUNK_NEW_START_RE.match(ln)
+            line = int(m.group(1)) - 1 if m else 0
+            continue
+        if ln.startswith("\\"):
+            continue
+        if ln.startswith("-"):
+            at = line + 1
+        else:
+            line += 1
+            if not ln.startswith("+"):
+                continue
+            at = line
+        lo = at if lo is None else min(lo, at)
+        hi = at if hi is None else max(hi, at)
+    if lo is not None:
+        spans.append((lo, hi))
+    return spans
+
+
+def _indent(s: str) -> int:
+    return len(s) - len(s.lstrip(" \t"))
+
+
+def _scope_end(lines: List[str], start: int) -> int:
+    """
+    Last line of the scope opened at `start`: up to the next line indented at or left
+    of it, including a closing brace/paren (but not a signature continuation).
+    """
+    depth = _indent(lines[start - 1])
+    end = start
+    for i in range(start + 1, len(lines) + 1):
+        s = lines[i - 1]
+        if not s.strip():
+            continue
+        if _indent(s) > depth:
+            end = i
+            continue
+        stripped = s.strip()
+        if stripped[:1] in ")]}" or stripped == "end":
+            end = i
+            if stripped.endswith((":", "{")):
+                # ") -> int:" / ") {" closes a multi-line signature, not the scope
+                continue
+        break
+    return end
+
+
+def enclosing_scope(lines: List[str], span: Span, max_lines: int) -> Optional[Span]:
+    """
+    Innermost function/class-like scope around `span`, found by indentation. A scope
+    longer than `max_lines` is reduced to its opening line (the signature).
+    """
+    if not lines:
+        return None
+    lo = min(max(span[0], 1), len(lines))
+    hi = min(max(span[1], lo), len(lines))
+    body = [lines[i - 1] for i in range(lo, hi + 1) if lines[i - 1].strip()]
+    if not body:
+        return None
+    depth = min(_indent(s) for s in body)
+    start = None
+    for i in range(lo - 1, 0, -1):
+        s = lines[i - 1]
+        if not s.strip() or _indent(s) >= depth:
+            continue
+        if _SCOPE_RE.match(s):
+            start = i
+            break
+        if s.lstrip()[:1] in ")]}":
+            # Tail of a multi-line signature or of a sibling block
+            continue
+        # An if/for/... block: the scope must sit further left still
+        depth = _indent(s)
+    if start is None:
+        return None
+    end = _scope_end(lines, start)
+    if end < hi:
+        return None
+    if end - start + 1 > max_lines:
+        return (start, start)
+    return (start, end)
+
+
+def scope_context(patch: str, lines: List[str], max_lines: int) -> str:
+    """
+    Enclosing scopes of the patch's hunks that the patch does not already show in
+    full, as "[lines a-b]" blocks of head-revision code; "" when there are none.
+    """
+    scopes: List[Span] = []
+    for span in changed_spans(patch):
+        scope = enclosing_scope(lines, span, max_lines)
+        if scope is not None and scope not in scopes:
+            scopes.append(scope)
+    # Keep only the outermost of nested scopes (both would repeat the same lines)
+    scopes = [
+        s
+        for s in scopes
+        if not any(o != s and o[0] <= s[0] and s[1] <= o[1] for o in scopes)
+    ]
+    visible = commentable_lines(patch)
+    blocks = []
+    for a, b in sorted(scopes):
+        if all(i in visible for i in range(a, b + 1)):
+            continue
+        blocks.append(f"[lines {a}-{b}]\n" + "\n".join(lines[a - 1 : b]))
+    return "\n".join(blocks)
+
+
+async def add_scope_context(
+    patches: List[Dict],
+    read_blob: BlobReader,
+    cache: BlobCache,
+    max_lines: int,
+    concurrency: int = 4,
+) -> int:
+    """
+    Attach `context` (enclosing scopes) to patches whose entry carries the file's blob
+    `sha`. Each blob is read once, from `cache` if possible. Returns the count enriched.
+    """
+    texts: Dict[str, Optional[str]] = {}
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def load(sha: str) -> None:
+        text = cache.get(sha)
+        if text is None:
+            async with sem:
+                try:
+                    text = _decode(await read_blob(sha))
+                except Exception as e:
+                    # Best-effort: the patch is still reviewed without context
+                    print(f"Blob {sha[:12]} not fetched ({e}); no scope context.")
+            if text is not None:
+                cache.put(sha, text)
+        texts[sha] = text
+
+    await asyncio.gather(
+        *(load(s) for s in {p["sha"] for p in patches if p.get("sha")})
+    )
+
+    enriched = 0
+    for p in patches:
+        text = texts.get(p.get("sha"))
+        if not text:
+            continue
+        ctx = scope_context(p["patch"], text.split("\n"), max_lines)
+        if ctx:
+            p["context"] = ctx
+            enriched += 1
+    return enriched
@@ -1,11 +1,64 @@
-from typing import List, Dict
+import asyncio
+import base64
+import time
+from typing import List, Dict, Optional
 import httpx
 
+from app.pr_files import PRFile, ingest_files
+from app.settings import settings
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def rate_limit_wait(r: httpx.Response) -> Optional[float]:
+    """
+    Seconds GitHub asks us to wait before retrying, or None if not rate limited.
+    A malformed Retry-After falls back to X-RateLimit-Reset; with neither usable the
+    response is not retried.
+    """
+    if r.status_code not in (403, 429):
+        return None
+    retry_after = _seconds(r.headers.get("Retry-After"))
+    if retry_after is not None:
+        return max(0.0, retry_after)
+    reset = _seconds(r.headers.get("X-RateLimit-Reset"))
+    if r.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+        return max(0.0, reset - time.time())
+    return None
+
+
+async def send(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs
+) -> httpx.Response:
+    """
+    Send a request, retrying once when GitHub rate-limits it (primary or secondary
+    limit) and the advised wait is within settings.github_rate_limit_max_wait.
+    """
+    r = await client.request(method, url, **kwargs)
+    wait = rate_limit_wait(r)
+    if wait is not None and wait <= settings.github_rate_limit_max_wait:
+        await asyncio.sleep(wait)
+        r = await client.request(method, url, **kwargs)
+    return r
+
 
 class GitHubClient:
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.token = token
-        self.base_url = "https://api.github.com"
+        # Point at GitHub Enterprise or a local stand-in (tools/fake_github.py)
+        self.base_url = (base_url or settings.github_api_url).rstrip("/")
+        # e.g. httpx.ASGITransport(app) to talk to an in-process fake server
+        self.transport = transport
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -14,28 +67,87 @@ class GitHubClient:
             "X-GitHub-Api-Version": "2022-11-28",
         }
 
-    async def list_pr_files(self, repo: str, pr_number: int) -> List[Dict]:
+    async def get_authenticated_user(self) -> Dict:
+        """GET /user (403 for installation tokens such as Actions' GITHUB_TOKEN)."""
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(
+                client, "GET", f"{self.base_url}/user", headers=self._headers()
+            )
+            r.raise_for_status()
+            return r.json()
+
+    async def list_pr_files(self, repo: str, pr_number: int) -> List[PRFile]:
+        """
+        All files of the PR as compact PRFile records. Each page is converted as it
+        arrives, so only one page of raw API JSON is alive at a time and patches of
+        files excluded by include/exclude globs are never retained.
+        """
         url = f"{self.base_url}/repos/{repo}/pulls/{pr_number}/files"
-        files: List[Dict] = []
-        async with httpx.AsyncClient(timeout=30) as client:
+        files: List[PRFile] = []
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
             page = 1
             while True:
-                r = await client.get(
-                    url, headers=self._headers(), params={"per_page": 100, "page": page}
+                r = await send(
+                    client,
+                    "GET",
+                    url,
+                    headers=self._headers(),
+                    params={"per_page": 100, "page": page},
                 )
                 r.raise_for_status()
                 chunk = r.json()
-                files.extend(chunk)
+                files.extend(ingest_files(chunk))
                 if len(chunk) < 100:
                     break
                 page += 1
         return files
 
+    async def get_blob(self, repo: str, sha: str) -> bytes:
+        """Raw contents of a git blob (the PR files API gives each file's blob SHA)."""
+        url = f"{self.base_url}/repos/{repo}/git/blobs/{sha}"
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(client, "GET", url, headers=self._headers())
+            r.raise_for_status()
+            data = r.json()
+        return base64.b64decode(data.get("content") or "")
+
+    async def list_issue_comments(self, repo: str, issue_number: int) -> List[Dict]:
+        url = f"{self.base_url}/repos/{repo}/issues/{issue_number}/comments"
+        comments: List[Dict] = []
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            page = 1
+            while True:
+                r = await send(
+                    client,
+                    "GET",
+                    url,
+                    headers=self._headers(),
+                    params={"per_page": 100, "page": page},
+                )
+                r.raise_for_status()
+                chunk = r.json()
+                comments.extend(chunk)
+                if len(chunk) < 100:
+                    break
+                page += 1
+        return comments
+
+    async def update_issue_comment(self, repo: str, comment_id: int, body: str) -> Dict:
+        url = f"{self.base_url}/repos/{repo}/issues/comments/{comment_id}"
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(
+                client, "PATCH", url, headers=self._headers(), json={"body": body}
+            )
+            r.raise_for_status()
+            return r.json()
+
     async def post_issue_comment(self, repo: str, issue_number: int, body: str) -> Dict:
         # PRs are issues under the hood; this posts a single top-level comment to the PR
         url = f"{self.base_url}/repos/{repo}/issues/{issue_number}/comments"
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(url, headers=self._headers(), json={"body": body})
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(
+                client, "POST", url, headers=self._headers(), json={"body": body}
+            )
             r.raise_for_status()
             return r.json()
 
@@ -45,9 +157,14 @@ class GitHubClient:
         """
         url = f"{self.base_url}/repos/{repo}/issues/{issue_number}/labels"
         headers = self._headers()
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                url, headers=headers, json={"labels": labels}, timeout=30.0
+        async with httpx.AsyncClient(transport=self.transport) as client:
+            r = await send(
+                client,
+                "POST",
+                url,
+                headers=headers,
+                json={"labels": labels},
+                timeout=30.0,
             )
             r.raise_for_status()
             return r.json()
@@ -1,16 +1,38 @@
-from typing import Dict, List
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
 import httpx
 
+from app.services.github import send
+from app.settings import settings
+
 
 class GitHubReviewsClient:
     """
     Minimal wrapper for creating a single PR review with multiple inline comments.
-    Falls back to a top-level issue comment if needed in the CLI.
+    The CLI retries without comments GitHub cannot place, and falls back to a
+    top-level issue comment if none can be placed.
     """
 
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.token = token
-        self.base_url = "https://api.github.com"
+        # Point at GitHub Enterprise or a local stand-in (tools/fake_github.py)
+        self.base_url = (base_url or settings.github_api_url).rstrip("/")
+        # e.g. httpx.ASGITransport(app) to talk to an in-process fake server
+        self.transport = transport
+        self._pending_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+    def pending_review_lock(self, repo: str, pull_number: int) -> asyncio.Lock:
+        """
+        GitHub allows one pending review per user and PR: hold this while one exists
+        so concurrent posts to the same PR do not collide.
+        """
+        return self._pending_locks.setdefault((repo, pull_number), asyncio.Lock())
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -25,20 +47,88 @@ class GitHubReviewsClient:
         pull_number: int,
         body: str,
         comments: List[Dict],
-        event: str = "COMMENT",  # COMMENT, REQUEST_CHANGES, APPROVE
+        event: Optional[str] = "COMMENT",  # COMMENT, REQUEST_CHANGES, APPROVE
     ) -> Dict:
         """
         POST /repos/{owner}/{repo}/pulls/{pull_number}/reviews
         payload includes:
         - body: review summary markdown
-        - event: e.g. "COMMENT"
+        - event: e.g. "COMMENT"; None leaves the review PENDING (not published)
         - comments: list of {path, body, line, side} items
-          (We use 'line' on the 'RIGHT' side of the diff. For partial failures,
-           GitHub rejects the whole request; caller should fall back to a single comment.)
+          (We use 'line' on the 'RIGHT' side of the diff. One unplaceable comment makes
+           GitHub reject the whole request with 422; the CLI probes the bad ones out
+           with pending reviews.)
         """
         url = f"{self.base_url}/repos/{repo}/pulls/{pull_number}/reviews"
-        payload = {"body": body, "event": event, "comments": comments}
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(url, headers=self._headers(), json=payload)
+        payload: Dict = {"body": body, "comments": comments}
+        if event is not None:
+            payload["event"] = event
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(client, "POST", url, headers=self._headers(), json=payload)
             r.raise_for_status()
             return r.json()
+
+    async def delete_pending_review(
+        self, repo: str, pull_number: int, review_id: int
+    ) -> None:
+        """DELETE /repos/{owner}/{repo}/pulls/{pull_number}/reviews/{review_id}"""
+        url = f"{self.base_url}/repos/{repo}/pulls/{pull_number}/reviews/{review_id}"
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(client, "DELETE", url, headers=self._headers())
+            r.raise_for_status()
+
+    async def update_review(
+        self, repo: str, pull_number: int, review_id: int, body: str
+    ) -> Dict:
+        """PUT /repos/{owner}/{repo}/pulls/{pull_number}/reviews/{review_id} (body only)."""
+        url = f"{self.base_url}/repos/{repo}/pulls/{pull_number}/reviews/{review_id}"
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            r = await send(
+                client, "PUT", url, headers=self._headers(), json={"body": body}
+            )
+            r.raise_for_status()
+            return r.json()
+
+    async def list_reviews(self, repo: str, pull_number: int) -> List[Dict]:
+        """GET /repos/{owner}/{repo}/pulls/{pull_number}/reviews (all pages)."""
+        url = f"{self.base_url}/repos/{repo}/pulls/{pull_number}/reviews"
+        reviews: List[Dict] = []
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            page = 1
+            while True:
+                r = await send(
+                    client,
+                    "GET",
+                    url,
+                    headers=self._headers(),
+                    params={"per_page": 100, "page": page},
+                )
+                r.raise_for_status()
+                chunk = r.json()
+                reviews.extend(chunk)
+                if len(chunk) < 100:
+                    break
+                page += 1
+        return reviews
+
+    async def list_review_comments(self, repo: str, pull_number: int) -> List[Dict]:
+        """GET /repos/{owner}/{repo}/pulls/{pull_number}/comments (all pages)."""
+        url = f"{self.base_url}/repos/{repo}/pulls/{pull_number}/comments"
+        comments: List[Dict] = []
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            page = 1
+            while True:
+                r = await send(
+                    client,
+                    "GET",
+                    url,
+                    headers=self._headers(),
+                    params={"per_page": 100, "page": page},
+                )
+                r.raise_for_status()
+                chunk = r.json()
+                comments.extend(chunk)
+                if len(chunk) < 100:
+                    break
+                page += 1
+        return comments
@@ -1,25 +1,81 @@
-from typing import List, Dict
-from openai import OpenAI
+import threading
+from typing import List, Dict, Optional
 from app.settings import settings
+from app.token_budget import max_tokens_for_batch
+from app.services.llm_backends import make_backend
 
 
 class LLMClient:
-    def __init__(self, api_key: str, model: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str, backend=None):
+        # "openai" (default) or an offline "fake" (see app/services/llm_backends.py)
+        self.backend = backend or make_backend(
+            settings.llm_backend,
+            api_key=api_key,
+            options={
+                "latency": settings.fake_llm_latency,
+                "tokens_per_second": settings.fake_llm_tokens_per_second,
+                "mode": settings.fake_llm_mode,
+            },
+        )
         self.model = model
+        # Per-thread call options/results, so batches can run in worker threads
+        self._call = threading.local()
+        # Running totals across all calls of this client
+        self._usage_lock = threading.Lock()
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _record_usage(self, usage: Optional[Dict]) -> None:
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            for k in ("prompt_tokens", "completion_tokens"):
+                self.usage[k] += int((usage or {}).get(k, 0) or 0)
 
     def complete_json(self, system: str, user: str) -> str:
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=settings.openai_temperature,
-            max_tokens=settings.openai_max_tokens,
+        max_tokens = (
+            getattr(self._call, "max_tokens", None) or settings.openai_max_tokens
         )
-        return resp.choices[0].message.content.strip()
+        model = getattr(self._call, "model", None) or self.model
+        args = (model, system, user, max_tokens, settings.openai_temperature)
+        if settings.llm_stream:
+            parts: List[str] = []
+            out: Dict = {}
+            for chunk in self.backend.stream(*args):
+                parts.append(chunk.get("delta", ""))
+                out.update({k: v for k, v in chunk.items() if k != "delta"})
+            out["text"] = "".join(parts).strip()
+        else:
+            out = self.backend.complete(*args)
+        self._call.finish_reason = out.get("finish_reason")
+        self._call.usage = out.get("usage")
+        self._record_usage(out.get("usage"))
+        return out["text"]
 
     def review_patches_json(self, patches: List[Dict], system: str, user: str) -> Dict:
-        txt = self.complete_json(system, user)
-        return {"text": txt}
+        """
+        Returns {"text", "finish_reason", "max_tokens", "usage"}.
+        finish_reason == "length" means the JSON was cut off at the token budget.
+        """
+        budget = max_tokens_for_batch(patches)
+        self._call.max_tokens = budget
+        self._call.finish_reason = None
+        self._call.usage = None
+        try:
+            txt = self.complete_json(system, user)
+        finally:
+            self._call.max_tokens = None
+        return {
+            "text": txt,
+            "finish_reason": self._call.finish_reason,
+            "max_tokens": budget,
+            "usage": self._call.usage,
+        }
+
+    def triage_json(self, system: str, user: str, model: str, max_tokens: int) -> str:
+        """One call on a (cheaper) triage model; usage counts toward the same totals."""
+        self._call.model = model
+        self._call.max_tokens = max_tokens
+        try:
+            return self.complete_json(system, user)
+        finally:
+            self._call.model = None
+            self._call.max_tokens = None
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Every backend returns/streams the same shape:
+#   complete(...) -> {"text": str, "finish_reason": "stop"|"length", "usage": {...}}
+#   stream(...)   -> yields {"delta": str}; finish_reason and usage ride on
+#                    whichever items carry them
+# usage = {"prompt_tokens": int, "completion_tokens": int}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap ~4-chars-per-token estimate (good enough for budgets and simulation)."""
+    return max(1, len(text or "") // 4)
+
+
+class OpenAIBackend:
+    def __init__(self, api_key: str):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key)
+
+    def complete(
+        self, model: str, system: str, user: str, max_tokens: int, temperature: float
+    ) -> Dict:
+        resp = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        choice = resp.choices[0]
+        usage = getattr(resp, "usage", None)
+        return {
+            "text": (choice.message.content or "").strip(),
+            "finish_reason": choice.finish_reason,
+            "usage": {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            },
+        }
+
+    def stream(
+        self, model: str, system: str, user: str, max_tokens: int, temperature: float
+    ) -> Iterator[Dict]:
+        chunks = self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in chunks:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                event = {"delta": (choice.delta and choice.delta.content) or ""}
+                # Servers that ignore include_usage send no usage chunk, so the
+                # finish reason goes out with whichever chunk carries it
+                if choice.finish_reason:
+                    event["finish_reason"] = choice.finish_reason
+                if len(event) > 1 or event["delta"]:
+                    yield event
+            if getattr(chunk, "usage", None):
+                yield {
+                    "delta": "",
+                    "usage": {
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                    },
+                }
+
+
+# Added-line patterns the fake "finds", mirroring app/rulepacks.py
+_FAKE_FINDINGS = [
+    (re.compile(r"\b(eval|exec)\s*\("), "Avoid exec/eval on untrusted input.", "high"),
+    (re.compile(r"shell\s*=\s*True"), "Avoid subprocess with shell=True.", "high"),
+    (
+        re.compile(r"(password|secret|api_key|token)\s*=\s*['\"]", re.I),
+        "Possible hardcoded secret.",
+        "high",
+    ),
+    (re.compile(r"\bvar\s+\w+"), "Prefer let/const over var.", "low"),
+    (re.compile(r"\bTODO\b"), "Resolve TODO before merging.", "low"),
+    (re.compile(r"\bprint\("), "Avoid print() in production code.", "low"),
+]
+_FILE_BLOCK_RE = re.compile(
+    r"^### (.+?)\n(?:_\(part [^\n]*\n)?```\n(.*?)\n```", re.M | re.S
+)
+_TRIAGE_ID_RE = re.compile(r"^\[(\d+)\] ")
+
+
+class FakeLLMBackend:
+    """
+    Offline, deterministic stand-in for the model. Parses the files out of the review
+    prompt and returns schema-valid JSON with findings for risky added lines.
+
+    mode: "ok" | "malformed" (prose, not JSON) | "truncated" (cut off, finish_reason=length)
+    Latency = latency + jitter*U(0,1) + completion_tokens / tokens_per_second.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        tokens_per_second: float = 0.0,
+        mode: str = "ok",
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.mode = mode
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()  # backends are called from worker threads
+        self.calls = 0
+
+    def _review(self, user: str) -> Dict:
+        files: List[Dict] = []
+        for fname, patch in _FILE_BLOCK_RE.findall(user):
+            comments = []
+            for ln in patch.splitlines():
+                if not ln.startswith("+") or ln.startswith("+++"):
+                    continue
+                for rx, message, severity in _FAKE_FINDINGS:
+                    m = rx.search(ln)
+                    if m:
+                        comments.append(
+                            {
+                                "line_hint": m.group(0),
+                                "message": message,
+                                "severity": severity,
+                            }
+                        )
+            if comments:
+                files.append({"filename": fname.strip(), "comments": comments})
+
+        n = sum(len(f["comments"]) for f in files)
+        digest = hashlib.sha1(user.encode("utf-8")).hexdigest()[:8]
+        high = any(c["severity"] == "high" for f in files for c in f["comments"])
+        return {
+            "summary_markdown": f"- Fake review {digest}: {n} finding(s) in {len(files)} file(s).",
+            "decision": "request_changes" if high else "comment",
+            "files": files,
+        }
+
+    def _triage(self, user: str) -> Dict:
+        # Patches with something to find need the full review; the rest are trivial
+        verdicts = {}
+        for label, patch in _FILE_BLOCK_RE.findall(user):
+            m = _TRIAGE_ID_RE.match(label)
+            if not m:
+                continue
+            added = [
+                ln
+                for ln in patch.splitlines()
+                if ln.startswith("+") and not ln.startswith("+++")
+            ]
+            risky = any(rx.search(ln) for ln in added for rx, _, _ in _FAKE_FINDINGS)
+            verdicts[m.group(1)] = "review" if risky else "trivial"
+        return {"verdicts": verdicts}
+
+    def _render(self, system: str, user: str, max_tokens: int) -> Dict:
+        with self._lock:
+            self.calls += 1
+        if self.mode == "malformed":
+            text = "Sure! Here are my thoughts on the diff: it looks mostly fine."
+        elif '"verdicts"' in system:
+            text = json.dumps(self._triage(user))
+        else:
+            text = json.dumps(self._review(user))
+        finish_reason = "stop"
+        # Same failure a real model has when the budget is too small
+        if self.mode == "truncated" or estimate_tokens(text) > max_tokens:
+            text = text[: min(len(text) // 2, max_tokens * 4)]
+            finish_reason = "length"
+        return {
+            "text": text,
+            "finish_reason": finish_reason,
+            "usage": {
+                "prompt_tokens": estimate_tokens(user),
+                "completion_tokens": estimate_tokens(text),
+            },
+        }
+
+    def _delay(self, completion_tokens: int) -> float:
+        d = self.latency
+        if self.jitter:
+            with self._lock:
+                d += self._rng.uniform(0, self.jitter)
+        if self.tokens_per_second:
+            d += completion_tokens / self.tokens_per_second
+        return d
+
+    def complete(
+        self, model: str, system: str, user: str, max_tokens: int, temperature: float
+    ) -> Dict:
+        out = self._render(system, user, max_tokens)
+        time.sleep(self._delay(out["usage"]["completion_tokens"]))
+        return out
+
+    def stream(
+        self, model: str, system: str, user: str, max_tokens: int, temperature: float
+    ) -> Iterator[Dict]:
+        out = self._render(system, user, max_tokens)
+        text = out["text"]
+        step = 32  # ~8 tokens per chunk
+        n_chunks = max(1, (len(text) + step - 1) // step)
+        per_chunk = self._delay(out["usage"]["completion_tokens"]) / n_chunks
+        for i in range(0, len(text), step):
+            time.sleep(per_chunk)
+            yield {"delta": text[i : i + step]}
+        yield {
+            "delta": "",
+            "finish_reason": out["finish_reason"],
+            "usage": out["usage"],
+        }
+
+
+def make_backend(name: str, api_key: str, options: Optional[Dict] = None):
+    """Backend factory for settings.llm_backend ("openai" | "fake")."""
+    if (name or "openai").lower() == "fake":
+        return FakeLLMBackend(**(options or {}))
+    return OpenAIBackend(api_key=api_key)
@@ -10,17 +10,84 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     openai_model: str = "gpt-4o-mini"  # You can switch to "gpt-4o"
     openai_temperature: float = 0.2
-    openai_max_tokens: int = 800  # Safety cap
+    openai_max_tokens: int = 800  # Safety cap (used as-is when adaptive budget is off)
+
+    # --- Adaptive output budget ---
+    # Size max_tokens per batch from file count, changed lines and max inline comments
+    adaptive_max_tokens: bool = True
+    max_tokens_floor: int = 400
+    max_tokens_ceiling: int = 4000
+    # When a response is cut off (finish_reason=length), split the batch and retry
+    split_batches_on_truncation: bool = True
+
+    # --- LLM backend ---
+    llm_backend: str = (
+        "openai"  # "openai" | "fake" (offline, deterministic; no API key)
+    )
+    llm_stream: bool = False  # consume completions as a stream
+    fake_llm_latency: float = 0.0  # seconds per call
+    fake_llm_tokens_per_second: float = 0.0  # 0 = no per-token delay
+    fake_llm_mode: str = "ok"  # "ok" | "malformed" | "truncated"
 
     # --- GitHub ---
     github_token: str = ""  # In Actions, GitHub passes this as GITHUB_TOKEN
     github_repository: Optional[str] = None  # e.g., "RunicWolf/gpt-pr-review-bot"
     pull_request_number: Optional[int] = None
+    # REST API root; Actions sets GITHUB_API_URL (GHES), tests/benchmarks use a fake
+    github_api_url: str = "https://api.github.com"
+    # PR head commit (HEAD_SHA: ${{ github.event.pull_request.head.sha }}); keys the
+    # checkpoint journal so a rerun of the same head resumes instead of repeating work
+    head_sha: Optional[str] = None
+    # Where patches come from: "api" (PR files API) or "git" (`git diff base...head`
+    # in a local checkout; no API truncation or 3000-file cap, needs the history)
+    diff_source: str = "api"
+    base_sha: Optional[str] = None  # PR base commit (BASE_SHA) for diff_source=git
+    git_repo_dir: str = "."
+    # Add each hunk's enclosing function/class (from the checkout with diff_source=git,
+    # else the git blobs API) to the prompt; scopes longer than the cap keep only
+    # their signature. Blobs are cached by SHA in blob_cache_dir across runs.
+    scope_context: bool = False
+    scope_context_max_lines: int = 80
+    blob_cache_dir: str = ".review_blob_cache"  # "" keeps the cache in memory
+    # Append-only SQLite history of runs and findings for trend queries
+    # (tools/findings_query.py); "" disables it
+    findings_db: str = ""
+    # Also stream the report as JSON Lines (.review_report.jsonl), one record per
+    # batch as it finishes; tools/ci_summary.py reads it incrementally
+    report_stream: bool = True
+    checkpoint_dir: str = ".review_checkpoints"  # "" disables journaling
+    # Batch reviews/comments posted in parallel; GitHub's secondary limits punish
+    # bursts of concurrent writes, so keep this small
+    github_post_concurrency: int = 2
+    # Retry a rate-limited (403/429) request when GitHub asks to wait at most this long
+    github_rate_limit_max_wait: float = 10.0
+    # Post every batch as one review (one write, one notification) instead of one each
+    consolidate_batches: bool = False
+    max_comments_per_review: int = 50  # larger consolidated reviews are continued
+    # Reruns edit the bot's marked issue comments in place and skip inline comments
+    # already posted on the same line
+    update_existing_comments: bool = True
+    # Login the bot posts as; only its own marked comments are edited. Empty = the
+    # token's user (GET /user), or github-actions[bot] for tokens that cannot read it
+    github_bot_login: str = ""
 
     # --- Safety / cost controls ---
     max_files: int = 6
     max_patch_chars: int = 8000  # Per-file cap
     max_total_patch_chars: int = 24000  # Total across selected files
+    # Oversized file diffs are split at hunk boundaries into parts of <= max_patch_chars
+    max_parts_per_file: int = 10
+    llm_concurrency: int = 4  # batches reviewed by the LLM in parallel
+    # Cheaper model that first sorts patches into "trivial" / "review"; only the
+    # latter reach openai_model. "" disables triage. Verdicts are cached per patch hash
+    triage_model: str = ""
+    triage_batch_chars: int = 12000  # patch chars per triage call
+    triage_cache_dir: str = ".review_triage_cache"  # "" keeps verdicts in memory
+    # Match the rulepacks' compiled patterns against added lines before any LLM call;
+    # findings are posted as their own first batch. With skip_llm, patches whose
+    # changed lines are all flagged here or clean (blank, comments, docs) skip the LLM
+    static_checks: bool = False
+    static_checks_skip_llm: bool = True
 
     # --- Review behavior ---
     review_mode: str = "comment"  # "comment" (single) or "review" (inline PR review)
@@ -57,6 +124,35 @@ class Settings(BaseSettings):
     only_changed_lines: bool = True
     # Number of surrounding context lines to keep around each change hunk
     changed_context_lines: int = 2
+    # Python hunks also keep the enclosing def/class signature and are re-cut into
+    # exact-line hunks (app/structural_slimmer.py); other languages stay line-based
+    structural_slimming: bool = True
+    # Collapse whitespace-only, reordered, moved and lockstep-renamed lines into
+    # one-line annotations before prompt building
+    compact_diffs: bool = True
+    compact_min_move_lines: int = 3
+    # Review identical hunks (license headers, import swaps) once across the PR and
+    # fan findings back out to every file that carries them
+    dedup_hunks: bool = True
+
+    # --- File prioritization ---
+    # Rank files (rulepack language, sensitive paths, churn, tests last) before
+    # filling max_files / max_total_patch_chars
+    prioritize_files: bool = True
+    priority_paths: List[str] = [
+        "**/auth/**",
+        "**/*auth*",
+        "**/*security*",
+        "**/*crypto*",
+        "**/*secret*",
+        "**/*token*",
+        "**/*password*",
+        "**/*permission*",
+        "**/*payment*",
+        "**/.github/workflows/**",
+        "**/Dockerfile",
+        "**/dockerfile",
+    ]
 
     # Extra ignore sources
     # Repo-root file with glob patterns to skip (similar to .gitignore)
@@ -76,7 +172,13 @@ class Settings(BaseSettings):
     # --- CI summary & gate enforcement ---
     enable_job_summary: bool = True  # write a Markdown job summary to GitHub Actions
     enforce_gate_on_ci: bool = False  # if True and REQUEST_CHANGES, fail the job
+    # With enforce_gate_on_ci, stop at the first batch whose findings reach
+    # severity_gate and cancel the LLM calls of the remaining batches
+    fail_fast_gate: bool = False
     summary_title: str = "🤖 GPT Code Review"
+    # Append each batch's section to GITHUB_STEP_SUMMARY while the review runs;
+    # tools/ci_summary.py then only adds the outcome and totals
+    live_job_summary: bool = True
 
 
 # Initialize with env first
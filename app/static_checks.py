@@ -0,0 +1,166 @@
+# app/static_checks.py
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.diff_compactor import ANNOTATION_PREFIX
+from app.review_strategy import language_of
+from app.rulepacks import HEURISTIC_RULES, LOCAL_RULES
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+_STRING_RE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`")
+# Line-comment marker per language family; in other languages (C's #include,
+# "*ptr = x;") no line is taken for a comment
+_COMMENT_PREFIX = {
+    "Python": "#",
+    "YAML": "#",
+    "JavaScript": "//",
+    "TypeScript": "//",
+}
+# Families with /* ... */ block comments
+_BLOCK_COMMENT = ("JavaScript", "TypeScript")
+# Every line of these is prose: nothing in them needs a model unless a rule fires
+PROSE_LANGUAGES = ("Markdown",)
+
+
+def _family(filename: str) -> str:
+    # "TypeScript/React" shares the TypeScript rules
+    return language_of(filename).split("/")[0]
+
+
+def _code_of(text: str, comment: Optional[str]) -> str:
+    """The line with string literals emptied and any trailing comment cut off."""
+    code = _STRING_RE.sub('""', text)
+    if comment and comment in code:
+        code = code[: code.index(comment)]
+    return code
+
+
+def _comment_only(text: str, family: str, in_block: bool) -> Tuple[bool, bool]:
+    """Whether the line is only comment, and whether a /* */ block is open after it."""
+    s = text.strip()
+    if family in _BLOCK_COMMENT:
+        if not in_block and s.startswith("/*"):
+            in_block, s = True, s[2:]
+        if in_block:
+            if "*/" not in s:
+                return True, True
+            return not s[s.index("*/") + 2 :].strip(), False
+    marker = _COMMENT_PREFIX.get(family)
+    return bool(marker) and s.startswith(marker), False
+
+
+def _is_clean(text: str, family: str, in_block: bool) -> Tuple[bool, bool]:
+    """
+    Blank, comment-only or prose lines have nothing for a reviewer model. Returns
+    (clean, whether a /* */ block is open after the line).
+    """
+    comment, in_block = _comment_only(text, family, in_block)
+    return family in PROSE_LANGUAGES or not text.strip() or comment, in_block
+
+
+def check_patch(filename: str, patch: str) -> Tuple[List[Dict], bool]:
+    """
+    Run the local rules over the added lines of one patch. Returns findings in the
+    LLM comment schema (plus the exact RIGHT-side "line" and the "rule" id) and
+    whether the patch still needs the model: any changed line that is neither
+    clean nor flagged here (HEURISTIC_RULES hits do not count), and any compacted
+    (elided) change, does.
+    """
+    family = _family(filename)
+    rules = [r for r in LOCAL_RULES if not r[1] or family in r[1]]
+    comment = _COMMENT_PREFIX.get(family)
+    findings: List[Dict] = []
+    needs_llm = False
+    line_no = 0
+    in_hunk = False
+    # Open /* */ blocks on the old (LEFT) and new (RIGHT) side
+    old_block = new_block = False
+    for ln in patch.splitlines():
+        m = _HUNK_RE.match(ln)
+        if m:
+            line_no = int(m.group(1)) - 1
+            in_hunk = True
+            old_block = new_block = False
+            continue
+        if not in_hunk:
+            continue
+        if ln.startswith("\\"):
+            needs_llm = needs_llm or ln.startswith(ANNOTATION_PREFIX)
+            continue
+        if ln.startswith("-"):
+            clean, old_block = _is_clean(ln[1:], family, old_block)
+            needs_llm = needs_llm or not clean
+            continue
+        line_no += 1
+        text = ln[1:]
+        if not ln.startswith("+"):
+            _, old_block = _is_clean(text, family, old_block)
+            _, new_block = _is_clean(text, family, new_block)
+            continue
+        clean, new_block = _is_clean(text, family, new_block)
+        code = "" if clean else _code_of(text, comment)
+        hit = False
+        for rule_id, _, pattern, message, severity, code_only in rules:
+            found = pattern.search(code if code_only else text)
+            if found:
+                hit = hit or rule_id not in HEURISTIC_RULES
+                findings.append(
+                    {
+                        "line": line_no,
+                        "line_hint": found.group(0).strip(),
+                        "message": message,
+                        "severity": severity,
+                        "rule": rule_id,
+                    }
+                )
+        if not hit and not clean:
+            needs_llm = True
+    return findings, needs_llm
+
+
+def run_static_checks(
+    patches: List[Dict], skip_llm: bool = True
+) -> Tuple[Optional[Dict], List[Dict], List[Dict]]:
+    """
+    Check every patch locally. Returns (parsed, checked, remaining):
+    - parsed: an LLM-shaped response with all local findings, or None when
+      nothing was found and no patch skips the model
+    - checked: the patches behind `parsed` (for inline line mapping)
+    - remaining: patches that still go to the model, in order. Their local
+      findings are kept as `static_findings` so the prompt can say they are known.
+    With skip_llm=False every patch remains.
+    """
+    by_file: Dict[str, List[Dict]] = {}
+    checked: List[Dict] = []
+    remaining: List[Dict] = []
+    skipped = 0
+    for p in patches:
+        found, needs_llm = check_patch(p["filename"], p["patch"])
+        to_llm = needs_llm or not skip_llm
+        if found:
+            by_file.setdefault(p["filename"], []).extend(found)
+        if found or not to_llm:
+            checked.append(p)
+        if to_llm:
+            if found:
+                p["static_findings"] = found
+            remaining.append(p)
+        else:
+            skipped += 1
+    if not checked:
+        return None, [], remaining
+
+    n = sum(len(c) for c in by_file.values())
+    summary = (
+        f"- Static rule checks (no LLM): {n} finding(s) in {len(by_file)} file(s)."
+    )
+    if skipped:
+        summary += (
+            f"\n- {skipped} patch(es) had nothing else to review and skipped the LLM."
+        )
+    parsed = {
+        "summary_markdown": summary,
+        "decision": "comment",
+        "files": [{"filename": f, "comments": c} for f, c in by_file.items()],
+    }
+    return parsed, checked, remaining
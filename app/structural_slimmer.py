@@ -0,0 +1,233 @@
+# app/structural_slimmer.py
+import io
+import re
+import tokenize
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.review_strategy import language_of
+
+# (patch, ctx, marker) -> slimmed patch ("" when nothing is left), same contract as
+# diff_slimmer.slim_patch_to_changed(..., trailing_newline=False)
+Slimmer = Callable[[str, int, Optional[str]], str]
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+_PY_DEF_RE = re.compile(r"^\s*(?:async\s+def|def|class)\b")
+
+_SLIMMERS: Dict[str, Slimmer] = {}
+
+
+def register_slimmer(language: str, slimmer: Slimmer) -> None:
+    """Use `slimmer` for files whose LANG_BY_EXT language is `language`."""
+    _SLIMMERS[language] = slimmer
+
+
+def slimmer_for(filename: str) -> Optional[Slimmer]:
+    return _SLIMMERS.get(language_of(filename))
+
+
+def _indent(s: str) -> int:
+    return len(s) - len(s.lstrip(" \t"))
+
+
+def _tag(line: str) -> str:
+    """'+', '-', '\\' or ' ' (context, including lines whose space was stripped)."""
+    tag = line[:1]
+    return tag if tag in ("+", "-", "\\") else " "
+
+
+# --- Python -------------------------------------------------------------------------
+def _python_signatures(source: List[str]) -> Dict[int, int]:
+    """
+    def/class statements in a fragment of Python: {first row: last row} (0-based),
+    where a multi-line signature ends at its colon. Tokenizing (rather than matching
+    lines) ignores "def" inside strings; a fragment that does not tokenize cleanly
+    (cut mid-string/bracket, uneven dedent) falls back to line matching.
+    """
+    sigs: Dict[int, int] = {}
+    start: Optional[int] = None
+    depth = 0
+    first = True  # next significant token starts a logical line
+    try:
+        readline = io.StringIO("\n".join(source) + "\n").readline
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type in (tokenize.NL, tokenize.COMMENT, tokenize.INDENT):
+                continue
+            if tok.type in (tokenize.NEWLINE, tokenize.DEDENT):
+                first = True
+                start = None
+                continue
+            if first:
+                first = False
+                rest = tok.line[tok.end[1] :].lstrip()
+                if tok.type == tokenize.NAME and (
+                    tok.string in ("def", "class")
+                    or (tok.string == "async" and rest.startswith("def"))
+                ):
+                    start = tok.start[0] - 1
+                    depth = 0
+            if start is None or tok.type != tokenize.OP:
+                continue
+            if tok.string in "([{":
+                depth += 1
+            elif tok.string in ")]}":
+                depth -= 1
+            elif tok.string == ":" and depth == 0:
+                sigs[start] = tok.start[0] - 1
+                start = None
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        if not sigs:
+            return {i: i for i, s in enumerate(source) if _PY_DEF_RE.match(s)}
+    return sigs
+
+
+def _enclosing_signature(
+    source: List[str], sigs: Dict[int, int], row: int
+) -> Optional[int]:
+    """First row of the innermost def/class above `row` (by indentation), if any."""
+    # Rows of multi-line signatures ("    path,", ") -> dict:") belong to their def
+    sig_of = {r: s for s, e in sigs.items() for r in range(s, e + 1)}
+    depth = _indent(source[row]) if source[row].strip() else None
+    for r in range(row - 1, -1, -1):
+        s = source[r]
+        if not s.strip():
+            continue
+        start = sig_of.get(r)
+        if start is not None:
+            if depth is None or _indent(source[start]) < depth:
+                return start
+            continue
+        d = _indent(s)
+        if depth is not None and d >= depth:
+            continue
+        # An if/for/... block: the def/class must sit further left still
+        depth = d
+    return None
+
+
+def _first_line(start: str, count: Optional[str]) -> int:
+    # An empty range ("-0,0" of an added file) names the line before it
+    return int(start) + (count == "0")
+
+
+def _hunk_header(old_no: int, old_n: int, new_no: int, new_n: int, heading: str) -> str:
+    def rng(start: int, n: int) -> str:
+        # git's empty-range convention: the line before, so "0,0" at the file start
+        if n == 0:
+            return f"{start - 1},0"
+        return str(start) if n == 1 else f"{start},{n}"
+
+    tail = f" {heading}" if heading else ""
+    return f"@@ -{rng(old_no, old_n)} +{rng(new_no, new_n)} @@{tail}"
+
+
+def _slim_python_hunk(
+    header: Tuple[int, int, str], body: List[str], ctx: int
+) -> List[str]:
+    old_start, new_start, heading = header
+    # New-side source of the hunk (context + added) and each body line's row in it
+    source: List[str] = []
+    rows: List[Optional[int]] = []
+    tags = [_tag(ln) for ln in body]
+    for ln, tag in zip(body, tags):
+        if tag in ("+", " "):
+            rows.append(len(source))
+            source.append(ln[1:])
+        else:
+            rows.append(None)
+    sigs = _python_signatures(source)
+    body_of = {r: i for i, r in enumerate(rows) if r is not None}
+
+    changed = [i for i, tag in enumerate(tags) if tag in ("+", "-")]
+    keep: Set[int] = set()
+    enclosing: Dict[int, Optional[int]] = {}  # changed body index -> signature row
+    for i in changed:
+        keep.update(range(max(0, i - ctx), min(len(body), i + ctx + 1)))
+        # A removed line sits where the next new-side line is
+        row = rows[i]
+        if row is None:
+            nxt = next((r for r in rows[i:] if r is not None), None)
+            row = nxt if nxt is not None else len(source) - 1
+        sig = _enclosing_signature(source, sigs, row) if row >= 0 else None
+        enclosing[i] = sig
+        if sig is not None:
+            keep.update(body_of[r] for r in range(sig, sigs[sig] + 1))
+    # Annotation lines ("\ No newline at end of file") stay with their line
+    for i, tag in enumerate(tags):
+        if tag == "\\" and i - 1 in keep:
+            keep.add(i)
+
+    out: List[str] = []
+    old_no, new_no = old_start, new_start
+    run: List[int] = []
+
+    def flush() -> None:
+        if not run:
+            return
+        o_n = sum(1 for i in run if tags[i] in (" ", "-"))
+        n_n = sum(1 for i in run if tags[i] in (" ", "+"))
+        first_change = next((i for i in run if i in enclosing), None)
+        sig = enclosing.get(first_change) if first_change is not None else None
+        # Name the enclosing def/class unless its signature opens this very run
+        title = heading
+        if sig is not None and body_of[sig] < run[0]:
+            title = source[sig].strip()
+        out.append(_hunk_header(run_old, o_n, run_new, n_n, title))
+        out.extend(body[i] for i in run)
+
+    run_old, run_new = old_no, new_no
+    for i, tag in enumerate(tags):
+        if i in keep:
+            if not run:
+                run_old, run_new = old_no, new_no
+            run.append(i)
+        elif run:
+            flush()
+            run = []
+        if tag in (" ", "-"):
+            old_no += 1
+        if tag in (" ", "+"):
+            new_no += 1
+    flush()
+    return out
+
+
+def slim_python_patch(patch: str, ctx: int, marker: Optional[str] = None) -> str:
+    """
+    Structural slimming for Python: each hunk keeps its changed lines, `ctx` lines
+    around them and the signature of the def/class enclosing each change; the
+    unchanged body lines in between are elided. Every kept run becomes its own hunk
+    with exact line numbers, titled with the enclosing def/class when its signature
+    is not in the run. Hunks containing `marker` are dropped, like the line slimmer.
+    """
+    if not patch:
+        return patch
+    if patch.endswith("\n"):
+        patch = patch[:-1]
+    out: List[str] = []
+    header: Optional[Tuple[int, int, str]] = None
+    body: List[str] = []
+
+    def emit() -> None:
+        if header is None or not any(_tag(ln) in ("+", "-") for ln in body):
+            return
+        if marker and any(marker in ln for ln in body):
+            return
+        out.extend(_slim_python_hunk(header, body, ctx))
+
+    for ln in patch.split("\n"):
+        m = _HUNK_RE.match(ln)
+        if m:
+            emit()
+            header = (
+                _first_line(m.group(1), m.group(2)),
+                _first_line(m.group(3), m.group(4)),
+                m.group(5),
+            )
+            body = []
+        elif header is not None:
+            body.append(ln)
+    emit()
+    return "\n".join(out)
+
+
+register_slimmer("Python", slim_python_patch)
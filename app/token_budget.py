@@ -0,0 +1,49 @@
+# app/token_budget.py
+from typing import Dict, List
+
+from app.settings import settings
+
+# Rough output-token costs for the JSON the model returns (see JSON_INSTRUCTIONS).
+BASE_TOKENS = 250  # summary_markdown + decision + JSON scaffolding
+TOKENS_PER_FILE = 60  # {"filename": ..., "comments": [...]} entry
+TOKENS_PER_CHANGED_LINE = 6  # longer diffs -> longer summaries
+TOKENS_PER_COMMENT = 90  # one {"line_hint", "message", "severity"} item
+
+
+def count_changed_lines(patch: str) -> int:
+    """Number of real added/removed lines in a unified diff (file headers excluded)."""
+    n = 0
+    for ln in (patch or "").splitlines():
+        if ln.startswith(("+++", "---")):
+            continue
+        if ln.startswith(("+", "-")):
+            n += 1
+    return n
+
+
+def max_tokens_for_batch(patches: List[Dict]) -> int:
+    """
+    Size the completion budget from the batch contents instead of a fixed cap.
+    Falls back to `openai_max_tokens` when adaptive budgeting is disabled.
+    """
+    if not settings.adaptive_max_tokens:
+        return settings.openai_max_tokens
+
+    changed = sum(count_changed_lines(p.get("patch", "")) for p in patches)
+    # The model cannot usefully comment more often than there are changed lines
+    comments = min(settings.max_inline_comments, changed) if changed else 0
+    budget = (
+        BASE_TOKENS
+        + TOKENS_PER_FILE * len(patches)
+        + TOKENS_PER_CHANGED_LINE * changed
+        + TOKENS_PER_COMMENT * comments
+    )
+    return max(settings.max_tokens_floor, min(settings.max_tokens_ceiling, budget))
+
+
+def split_batch(batch: List[Dict]) -> List[List[Dict]]:
+    """Split a batch into two halves (used when a response was cut off)."""
+    if len(batch) < 2:
+        return [batch]
+    mid = len(batch) // 2
+    return [batch[:mid], batch[mid:]]
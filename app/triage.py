@@ -0,0 +1,167 @@
+# app/triage.py
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.services.llm import LLMClient
+
+TRIVIAL = "trivial"
+REVIEW = "review"
+# Bump when the prompt changes so cached verdicts of the old prompt are not reused
+TRIAGE_VERSION = "1"
+
+TRIAGE_SYSTEM = (
+    "You triage pull request diffs before a code review.\n"
+    f'For each numbered patch answer "{TRIVIAL}" when it cannot plausibly hide a bug '
+    "or security issue worth a reviewer's time (docs, comments, formatting, typo "
+    f'fixes, version bumps, plain config values) and "{REVIEW}" otherwise. '
+    f'When unsure, answer "{REVIEW}".\n'
+    'Return ONLY JSON: {"verdicts": {"<number>": "trivial" | "review", ...}}'
+)
+
+
+def triage_key(patch: Dict, model: str) -> str:
+    """Cache key of one patch's verdict: prompt version, model, filename and patch."""
+    h = hashlib.sha1()
+    h.update(f"{TRIAGE_VERSION}\0{model}\0{patch['filename']}\0".encode("utf-8"))
+    h.update(patch["patch"].encode("utf-8"))
+    return h.hexdigest()
+
+
+class TriageCache:
+    """
+    Verdicts keyed by triage_key (prompt version, triage model and patch hash).
+    Memory serves one run, `directory` (if set) later runs; an unreadable entry or
+    anything but a known verdict counts as missing.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._mem: Dict[str, str] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self._mem:
+            return self._mem[key]
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                verdict = f.read().strip()
+        except OSError:
+            return None
+        if verdict not in (TRIVIAL, REVIEW):
+            return None
+        self._mem[key] = verdict
+        return verdict
+
+    def put(self, key: str, verdict: str) -> None:
+        self._mem[key] = verdict
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(verdict)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Caching is best-effort; the review itself must not fail on it
+            print(f"Triage cache write skipped: {e}")
+
+
+def build_triage_prompt(patches: List[Dict]) -> str:
+    return "\n\n".join(
+        f"### [{i}] {p['filename']}\n```\n{p['patch']}\n```"
+        for i, p in enumerate(patches, start=1)
+    )
+
+
+def parse_verdicts(text: str, count: int) -> Dict[int, str]:
+    """1-based patch number -> verdict; missing or unreadable entries are left out."""
+    try:
+        data = json.loads(text)
+        verdicts = data.get("verdicts", {}) if isinstance(data, dict) else {}
+    except ValueError:
+        return {}
+    out: Dict[int, str] = {}
+    for k, v in verdicts.items() if isinstance(verdicts, dict) else ():
+        try:
+            i = int(k)
+        except (TypeError, ValueError):
+            continue
+        v = str(v).lower()
+        if 1 <= i <= count and v in (TRIVIAL, REVIEW):
+            out[i] = v
+    return out
+
+
+def _chunks(patches: List[Dict], max_chars: int) -> List[List[Dict]]:
+    chunks: List[List[Dict]] = []
+    cur: List[Dict] = []
+    cur_len = 0
+    for p in patches:
+        if cur and cur_len + len(p["patch"]) > max_chars:
+            chunks.append(cur)
+            cur, cur_len = [], 0
+        cur.append(p)
+        cur_len += len(p["patch"])
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+async def triage_patches(
+    llm: LLMClient,
+    patches: List[Dict],
+    model: str,
+    cache: TriageCache,
+    max_chars: int = 12000,
+    concurrency: int = 4,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Split patches into (to review, trivial) with one cheap-model call per chunk of
+    uncached patches. Anything the triage model did not clearly call trivial
+    (errors, truncated or malformed answers) is reviewed; order is preserved.
+    Patches over `max_chars` are reviewed without asking.
+    """
+    keys = [triage_key(p, model) for p in patches]
+    verdicts: Dict[str, Optional[str]] = {k: cache.get(k) for k in keys}
+    todo = [
+        p
+        for p, k in zip(patches, keys)
+        if verdicts[k] is None and len(p["patch"]) <= max_chars
+    ]
+    key_of = {id(p): k for p, k in zip(patches, keys)}
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(chunk: List[Dict]) -> None:
+        async with sem:
+            try:
+                text = await asyncio.to_thread(
+                    llm.triage_json,
+                    TRIAGE_SYSTEM,
+                    build_triage_prompt(chunk),
+                    model,
+                    32 + 16 * len(chunk),
+                )
+            except Exception as e:
+                print(f"Triage call failed ({e}); reviewing {len(chunk)} patch(es).")
+                return
+        for i, verdict in parse_verdicts(text, len(chunk)).items():
+            key = key_of[id(chunk[i - 1])]
+            verdicts[key] = verdict
+            cache.put(key, verdict)
+
+    await asyncio.gather(*(run(c) for c in _chunks(todo, max_chars)))
+
+    review: List[Dict] = []
+    trivial: List[Dict] = []
+    for p, k in zip(patches, keys):
+        (trivial if verdicts[k] == TRIVIAL else review).append(p)
+    return review, trivial
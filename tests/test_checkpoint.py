@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+import app.cli_review as cli
+from app.checkpoint import Checkpoint, batch_key
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+
+
+def test_journal_survives_a_torn_last_line(tmp_path):
+    path = tmp_path / "run.jsonl"
+    ckpt = Checkpoint(str(path))
+    key = batch_key([{"filename": "a.py", "patch": "+x"}])
+    ckpt.record_llm(key, {"text": "{}", "finish_reason": "stop"})
+    ckpt.record_post(key, "comment", [11])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "posted", "key": "tr')  # killed mid-write
+
+    again = Checkpoint(str(path))
+    assert again.llm_result(key) == {"text": "{}", "finish_reason": "stop"}
+    assert again.is_posted(key) and again.posted[key]["ids"] == [11]
+
+
+def test_key_covers_every_prompt_input(monkeypatch):
+    patch = {"filename": "a.py", "patch": "+x"}
+    key = batch_key([patch])
+    assert batch_key([dict(patch)]) == key
+    assert batch_key([dict(patch, context="def f():")]) != key
+    assert batch_key([dict(patch, static_findings=[{"line": 1}])]) != key
+    monkeypatch.setattr(settings, "openai_model", "other-model")
+    assert batch_key([patch]) != key
+    monkeypatch.setattr("app.checkpoint.PROMPT_VERSION", "next")
+    assert batch_key([patch]) != key
+
+
+def test_no_head_sha_means_no_journal(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "checkpoint_dir", str(tmp_path))
+    assert Checkpoint.for_run("o/r", 1, None).path is None
+    assert Checkpoint.for_run("o/r", 1, "abc123").path.endswith("o_r-1-abc123.jsonl")
+
+
+def test_rerun_resumes_after_a_crash(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 39
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_patch_chars = 2000
+    settings.max_total_patch_chars = 10000
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    monkeypatch.setattr(settings, "head_sha", "deadbeef")
+    monkeypatch.setattr(settings, "checkpoint_dir", str(tmp_path / "ckpt"))
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": "app/a.py", "patch": "@@ -1 +1 @@\n+a = 1"},
+            {"filename": "app/b.py", "patch": "@@ -1 +1 @@\n+b = 2"},
+        ]
+
+    llm_calls, posted = [], []
+    crash = {"on": "app/b.py"}
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        if crash["on"] and crash["on"] in body:
+            raise RuntimeError("runner preempted")
+        posted.append(body)
+        return {"id": len(posted)}
+
+    def fake_review_patches_json(self, patches, system, user):
+        fname = patches[0]["filename"]
+        llm_calls.append(fname)
+        return {
+            "text": json.dumps(
+                {
+                    "summary_markdown": f"about {fname}",
+                    "decision": "comment",
+                    "files": [],
+                }
+            ),
+            "finish_reason": "stop",
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cli.main())
+    assert sorted(llm_calls) == ["app/a.py", "app/b.py"]
+    assert len(posted) == 1 and "about app/a.py" in posted[0]
+
+    # Rerun of the same head: no LLM calls, only the missing batch is posted
+    crash["on"] = None
+    llm_calls.clear()
+    assert asyncio.run(cli.main()) == 0
+    assert llm_calls == []
+    assert len(posted) == 2 and "about app/b.py" in posted[1]
+
+    # A third run is a no-op for GitHub writes
+    assert asyncio.run(cli.main()) == 0
+    assert len(posted) == 2 and llm_calls == []
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+
+import app.cli_review as cli
+from app.comment_sync import CommentSync, marker_key, with_marker
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from app.services.llm import LLMClient
+from tools.fake_github import FakeGitHub, create_app, serve_in_thread
+
+PATCH = "@@ -1 +1,2 @@\n ctx\n+run(user_input)"
+
+
+def _review_twice(monkeypatch, tmp_path, review_mode, summaries, sync=True):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeGitHub()
+    fake.add_pr("owner/repo", 40, [{"filename": "app/x.py", "patch": PATCH}])
+    server, base_url = serve_in_thread(fake)
+    runs = iter(summaries)
+
+    def fake_review_patches_json(self, patches, system, user):
+        return {
+            "text": '{"summary_markdown":"%s","decision":"comment","files":['
+            '{"filename":"app/x.py","comments":[{"line_hint":"user_input",'
+            '"message":"Validate input.","severity":"low"}]}]}' % next(runs)
+        }
+
+    try:
+        settings.github_repository = "owner/repo"
+        settings.pull_request_number = 40
+        settings.github_token = "ghs_mock"
+        settings.openai_api_key = "sk-mock"
+        settings.review_mode = review_mode
+        settings.include_globs = []
+        settings.exclude_globs = []
+        settings.max_inline_comments = 5
+        monkeypatch.setattr(settings, "github_api_url", base_url)
+        monkeypatch.setattr(settings, "enable_auto_labels", False)
+        monkeypatch.setattr(settings, "update_existing_comments", sync)
+        monkeypatch.setattr(
+            LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+        )
+        for _ in summaries:
+            assert asyncio.run(cli.main()) == 0
+    finally:
+        server.should_exit = True
+    return fake
+
+
+def _clients(fake):
+    transport = httpx.ASGITransport(app=create_app(fake))
+    gh = GitHubClient(token="t", base_url="http://fake", transport=transport)
+    reviews = GitHubReviewsClient(
+        token="t", base_url="http://fake", transport=transport
+    )
+    return gh, reviews
+
+
+def test_marker_round_trip():
+    body = with_marker("## Review", "batch-1.2")
+    assert body.startswith("## Review")
+    assert marker_key(body) == "batch-1.2"
+    assert marker_key("no marker here") is None
+
+
+def test_rerun_edits_the_summary_comment(monkeypatch, tmp_path):
+    fake = _review_twice(monkeypatch, tmp_path, "comment", ["first", "second"])
+    comments = fake.pr("owner/repo", 40)["comments"]
+    assert len(comments) == 1
+    assert "second" in comments[0]["body"]
+    assert marker_key(comments[0]["body"]) == "batch-1"
+    assert fake.requests["post_issue_comment"] == 1
+    assert fake.requests["update_issue_comment"] == 1
+
+
+def test_rerun_skips_inline_comments_already_posted(monkeypatch, tmp_path):
+    fake = _review_twice(monkeypatch, tmp_path, "review", ["first", "second"])
+    pr = fake.pr("owner/repo", 40)
+    assert fake.requests["create_review"] == 1
+    assert len(pr["reviews"][0]["comments"]) == 1
+    # Nothing new inline: the rerun edits the summary in the earlier review's body
+    assert "second" in pr["reviews"][0]["body"]
+    assert fake.requests["update_review"] == 1
+    assert pr["comments"] == []
+
+
+def test_only_the_bots_own_marked_comment_is_edited(monkeypatch, tmp_path):
+    fake = FakeGitHub()
+    pr = fake.add_pr("owner/repo", 40, [])
+    # Someone quoted the bot's summary, marker included
+    pr["comments"].append(
+        {"id": 1, "body": with_marker("quoted", "batch-1"), "user": {"login": "alice"}}
+    )
+    gh, reviews = _clients(fake)
+    sync = CommentSync(gh, reviews, "owner/repo", 40)
+
+    asyncio.run(sync.upsert("batch-1", "summary"))
+    assert [c["body"].split("\n")[0] for c in pr["comments"]] == ["quoted", "summary"]
+    assert fake.requests["update_issue_comment"] == 0
+
+
+def test_failed_edit_falls_back_to_a_new_comment(monkeypatch, tmp_path, capsys):
+    fake = FakeGitHub()
+    pr = fake.add_pr("owner/repo", 40, [])
+    gh, reviews = _clients(fake)
+    asyncio.run(CommentSync(gh, reviews, "owner/repo", 40).upsert("batch-1", "one"))
+    fake.fail_next("update_issue_comment", status=403)
+
+    asyncio.run(CommentSync(gh, reviews, "owner/repo", 40).upsert("batch-1", "two"))
+    assert [c["body"].split("\n")[0] for c in pr["comments"]] == ["one", "two"]
+    assert "Could not update the earlier 'batch-1' summary" in capsys.readouterr().out
+
+    # The next run edits the newest copy, not the stale one
+    asyncio.run(CommentSync(gh, reviews, "owner/repo", 40).upsert("batch-1", "three"))
+    assert [c["body"].split("\n")[0] for c in pr["comments"]] == ["one", "three"]
+
+
+def test_disabled_posts_a_new_comment_per_run(monkeypatch, tmp_path):
+    fake = _review_twice(
+        monkeypatch, tmp_path, "comment", ["first", "second"], sync=False
+    )
+    assert len(fake.pr("owner/repo", 40)["comments"]) == 2
+    assert fake.requests["list_issue_comments"] == 0
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from app.services.llm import LLMClient
+
+
+def test_chunk_review_respects_body_and_comment_limits():
+    body = "\n".join(f"line {i}" for i in range(100))
+    comments = [{"path": "a.py", "line": i, "body": "x"} for i in range(7)]
+
+    chunks = cli.chunk_review(body, comments, max_body_chars=300, max_comments=3)
+
+    assert all(len(b) <= 300 for b, _ in chunks)
+    assert [len(c) for _, c in chunks][:3] == [3, 3, 1]
+    assert sum(len(c) for _, c in chunks) == 7
+    assert chunks[1][0].startswith(f"_(continued 2/{len(chunks)})_")
+    # Nothing of the body is lost
+    assert "line 99" in chunks[-1][0]
+
+
+def test_small_review_is_a_single_payload():
+    comments = [{"path": "a.py", "line": 1, "body": "x"}]
+    assert cli.chunk_review("body", comments, 1000, 50) == [("body", comments)]
+
+
+def test_all_batches_posted_as_one_review(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 37
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "review"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_patch_chars = 2000
+    settings.max_total_patch_chars = 10000
+    settings.max_inline_comments = 5
+    settings.severity_gate = "high"
+    monkeypatch.setattr(settings, "consolidate_batches", True)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": f"app/m{i}.py", "patch": f"@@ -1 +1 @@\n+call_{i}()"}
+            for i in range(3)
+        ]
+
+    reviews, comments = [], []
+
+    async def fake_create_review(self, repo, pull_number, body, comments, event):
+        reviews.append({"body": body, "comments": comments, "event": event})
+        return {"id": 1}
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        comments.append(body)
+        return {"id": 2}
+
+    def fake_review_patches_json(self, patches, system, user):
+        fname = patches[0]["filename"]
+        severity = "high" if fname.endswith("m1.py") else "low"
+        return {
+            "text": json.dumps(
+                {
+                    "summary_markdown": f"summary for {fname}",
+                    "decision": "comment",
+                    "files": [
+                        {
+                            "filename": fname,
+                            "comments": [
+                                {
+                                    "line_hint": "call_",
+                                    "message": "check",
+                                    "severity": severity,
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ),
+            "finish_reason": "stop",
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(GitHubReviewsClient, "create_review", fake_create_review)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    assert asyncio.run(cli.main()) == 0
+
+    assert comments == []
+    assert len(reviews) == 1
+    review = reviews[0]
+    assert review["event"] == "REQUEST_CHANGES"
+    assert [c["path"] for c in review["comments"]] == [f"app/m{i}.py" for i in range(3)]
+    for i in range(3):
+        assert f"### batch {i + 1}/3\nsummary for app/m{i}.py" in review["body"]
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert report["consolidated"] is True
+    assert report["overall_event"] == "REQUEST_CHANGES"
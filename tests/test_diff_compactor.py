@@ -0,0 +1,144 @@
+from app.diff_compactor import ANNOTATION_PREFIX, compact_patch
+from app.diff_slimmer import slim_patch_to_changed
+from app.inline_mapper import guess_line_for_hint
+
+
+def test_whitespace_and_reorder_are_annotated():
+    patch = (
+        "@@ -1,7 +1,8 @@\n"
+        "-import os\n"
+        "-import re\n"
+        "-import sys\n"
+        "+import sys\n"
+        "+import os\n"
+        "+import re\n"
+        " a = 1\n"
+        "-x  =  foo(1)\n"
+        "+x = foo(1)\n"
+        " b = 2\n"
+        "+real_change()"
+    )
+    out = compact_patch(patch, filename="app/m.py")
+
+    assert ANNOTATION_PREFIX + "reordered 3 line(s)" in out
+    assert ANNOTATION_PREFIX + "whitespace-only change (1 line(s))" in out
+    assert "import os" not in out
+    assert "+real_change()" in out
+    # The surviving added line keeps its RIGHT-side number (line 7)
+    assert guess_line_for_hint(out, "real_change") == 7
+
+
+def test_behaviour_changes_are_never_folded():
+    # Python dedent, whitespace inside a string literal, permuted calls and a
+    # keyword flip all change behaviour
+    patch = (
+        "@@ -1,12 +1,12 @@\n"
+        " if ready:\n"
+        "-    launch()\n"
+        "+launch()\n"
+        "-greet('hello world')\n"
+        "+greet('helloworld')\n"
+        "-lock()\n"
+        "-write()\n"
+        "-unlock()\n"
+        "+write()\n"
+        "+lock()\n"
+        "+unlock()\n"
+        "-run(cmd, shell=False)\n"
+        "+run(cmd, shell=True)\n"
+        "-call(a, shell=False)\n"
+        "+call(a, shell=True)"
+    )
+    assert compact_patch(patch, filename="app/m.py") == patch
+
+    # The same dedent in a brace language is only whitespace
+    js = "@@ -1,2 +1,2 @@\n if (ready) {\n-    launch();\n+launch();"
+    assert "whitespace-only" in compact_patch(js, filename="web/m.js")
+
+
+def test_moved_block_is_annotated_on_both_sides():
+    patch = (
+        "@@ -1,4 +1,1 @@\n"
+        "-def helper():\n"
+        "-    value = compute()\n"
+        "-    return value\n"
+        " keep\n"
+        "@@ -20,1 +17,5 @@\n"
+        " ctx\n"
+        "+def helper():\n"
+        "+    value = compute()\n"
+        "+    return value\n"
+        "+new_call()"
+    )
+    out = compact_patch(patch)
+
+    assert "moved 3 line(s) to new line 18" in out
+    assert "moved 3 line(s) from old line 1" in out
+    assert "compute()" not in out
+    assert guess_line_for_hint(out, "new_call") == 21
+
+
+def test_lockstep_rename_is_annotated():
+    patch = (
+        "@@ -1,2 +1,2 @@\n"
+        "-total = old_name(a)\n"
+        "+total = new_name(a)\n"
+        "@@ -10,1 +10,1 @@\n"
+        "-print(old_name(b))\n"
+        "+print(new_name(b))"
+    )
+    out = compact_patch(patch)
+    assert "renamed `old_name` -> `new_name` (2 line(s) in file)" in out
+    assert not [ln for ln in out.splitlines() if ln.startswith(("+", "-"))]
+
+
+def test_swapping_in_another_existing_name_is_not_a_rename():
+    patch = (
+        "@@ -1,4 +1,4 @@\n"
+        " def check_auth(user):\n"
+        "-    check_auth(user)\n"
+        "-    return check_auth(user)\n"
+        "+    skip_auth(user)\n"
+        "+    return skip_auth(user)\n"
+        " check_auth(admin)"
+    )
+    assert compact_patch(patch) == patch
+
+    # Renaming the definition along with its uses is still a rename
+    renamed = (
+        "@@ -1,4 +1,4 @@\n"
+        "-def check_auth(user):\n"
+        "-    return check_auth(user.parent)\n"
+        "+def verify_auth(user):\n"
+        "+    return verify_auth(user.parent)\n"
+        " check_auth(admin)"
+    )
+    assert "renamed `check_auth` -> `verify_auth`" in compact_patch(renamed)
+
+
+def test_notes_on_a_slimmed_patch_use_real_line_numbers():
+    raw = (
+        "@@ -1,9 +1,9 @@\n"
+        "-def helper():\n"
+        "-    value = compute()\n"
+        "-    return value\n"
+        " a\n"
+        " b\n"
+        " c\n"
+        " d\n"
+        "+def helper():\n"
+        "+    value = compute()\n"
+        "+    return value\n"
+        " e\n"
+        " f"
+    )
+    # Slimming splits the hunk; each run carries an exact header of its own
+    slimmed = slim_patch_to_changed(raw, ctx=0, trailing_newline=False)
+    out = compact_patch(slimmed)
+    assert "moved 3 line(s) to new line 5" in out
+    assert "moved 3 line(s) from old line 1" in out
+
+
+def test_real_changes_pass_through_unchanged():
+    patch = "@@ -1,4 +1,6 @@\n- old\n+ new\n"
+    assert compact_patch(patch) == patch
@@ -0,0 +1,58 @@
+from app.diff_slimmer import slim_patch_to_changed
+from app.inline_mapper import commentable_lines
+
+PATCH = "\n".join(
+    [
+        "@@ -1,7 +1,7 @@",
+        " a",
+        " b",
+        " c",
+        "-d",
+        "+D",
+        " e",
+        " f",
+        " g",
+        "@@ -20,3 +20,3 @@",
+        " x",
+        "+y  # no-ai-review",
+        " z",
+    ]
+)
+
+
+def test_keeps_changes_with_context_and_drops_marked_hunks():
+    out = slim_patch_to_changed(PATCH, ctx=1, marker="no-ai-review")
+    assert out == "@@ -3,3 +3,3 @@\n c\n-d\n+D\n e\n"
+
+
+def test_without_trailing_newline():
+    out = slim_patch_to_changed(
+        PATCH, ctx=0, marker="no-ai-review", trailing_newline=False
+    )
+    assert out == "@@ -4,1 +4,1 @@\n-d\n+D"
+
+
+def test_nothing_to_slim_returns_the_same_string():
+    patch = "@@ -1,2 +1,2 @@\n-a\n+b"
+    assert slim_patch_to_changed(patch, ctx=3, trailing_newline=False) is patch
+    assert slim_patch_to_changed(patch + "\n", ctx=3) == patch + "\n"
+
+
+def test_context_only_hunks_are_dropped():
+    assert slim_patch_to_changed("@@ -1,2 +1,2 @@\n a\n b", ctx=2) == ""
+
+
+def test_every_kept_run_gets_exact_line_numbers():
+    patch = "\n".join(
+        ["@@ -10,9 +10,10 @@ def f():", " a", "+b", " c", " d", " e", " f"]
+        + [" g", "-h", " i", " j"]
+    )
+    out = slim_patch_to_changed(patch, ctx=1, trailing_newline=False)
+    assert out == (
+        "@@ -10,2 +10,3 @@ def f():\n a\n+b\n c\n@@ -15,3 +16,2 @@ def f():\n g\n-h\n i"
+    )
+    # Kept lines keep their real new-file numbers
+    assert sorted(commentable_lines(out)) == [10, 11, 12, 16, 17]
+
+    added = "@@ -0,0 +1,3 @@\n+x\n+y\n+z"
+    assert slim_patch_to_changed(added, ctx=1, trailing_newline=False) is added
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+
+
+@pytest.mark.parametrize("enforced", [True, False])
+def test_tripped_gate_cancels_remaining_batches(monkeypatch, tmp_path: Path, enforced):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 48
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "severity_gate", "high")
+    monkeypatch.setattr(settings, "enforce_gate_on_ci", enforced)
+    monkeypatch.setattr(settings, "fail_fast_gate", True)
+    monkeypatch.setattr(settings, "llm_concurrency", 1)
+    monkeypatch.setattr(settings, "prioritize_files", False)
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    # One batch per file
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": f"app/{n}.py", "patch": f"@@ -1 +1 @@\n+{n} = 1"}
+            for n in ("a", "b", "c")
+        ]
+
+    posted = []
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        posted.append(body)
+        return {"id": len(posted)}
+
+    called = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        name = patches[0]["filename"]
+        called.append(name)
+        if name != "app/a.py":
+            # Still with the LLM when batch 1 trips the gate
+            time.sleep(0.2)
+        comments = [{"severity": "high"}] if name == "app/a.py" else []
+        return {
+            "text": json.dumps(
+                {
+                    "summary_markdown": "ok",
+                    "decision": "comment",
+                    "files": [{"filename": name, "comments": comments}],
+                }
+            )
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    assert asyncio.run(cli.main()) == 0
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert report["overall_event"] == "REQUEST_CHANGES"
+    if enforced:
+        # Batch 3 was still waiting for the LLM slot and never ran
+        assert "app/c.py" not in called
+        assert report["fail_fast"] == {"after_batch": 1, "skipped_batches": 2}
+        assert len(report["batches"]) == 1 and len(posted) == 1
+    else:
+        # Without the CI gate the remaining batches are still worth reviewing
+        assert called == ["app/a.py", "app/b.py", "app/c.py"]
+        assert report["fail_fast"] is None
+        assert len(report["batches"]) == 3 and len(posted) == 3
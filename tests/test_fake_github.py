@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from app.services.llm import LLMClient
+from tools.fake_github import FakeGitHub, create_app, serve_in_thread
+
+
+def _clients(fake):
+    transport = httpx.ASGITransport(app=create_app(fake))
+    gh = GitHubClient(token="t", base_url="http://fake", transport=transport)
+    reviews = GitHubReviewsClient(
+        token="t", base_url="http://fake", transport=transport
+    )
+    return gh, reviews
+
+
+def test_paginated_files_comments_reviews_and_labels():
+    fake = FakeGitHub()
+    files = [
+        {"filename": f"f{i}.py", "patch": "@@ -1 +1,2 @@\n ctx\n+new"}
+        for i in range(250)
+    ]
+    fake.add_pr("o/r", 1, files)
+    gh, reviews = _clients(fake)
+
+    async def run():
+        got = await gh.list_pr_files("o/r", 1)
+        await gh.post_issue_comment("o/r", 1, "hello")
+        await gh.add_labels("o/r", 1, ["gpt-review:comment"])
+        await reviews.create_review(
+            "o/r",
+            1,
+            "body",
+            [{"path": "f0.py", "side": "RIGHT", "line": 2, "body": "x"}],
+        )
+        return got
+
+    got = asyncio.run(run())
+    assert len(got) == 250
+    assert fake.requests["list_pr_files"] == 3
+    pr = fake.pr("o/r", 1)
+    assert pr["comments"][0]["body"] == "hello"
+    assert pr["labels"] == ["gpt-review:comment"]
+    assert pr["reviews"][0]["comments"][0]["line"] == 2
+
+
+def test_injected_failures_rate_limits_and_bad_lines():
+    fake = FakeGitHub(rate_limit=3)
+    fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": "@@ -1 +1 @@\n+x"}])
+    fake.fail_next("post_issue_comment", status=502)
+    gh, reviews = _clients(fake)
+
+    async def run():
+        with pytest.raises(httpx.HTTPStatusError) as bad_line:
+            await reviews.create_review(
+                "o/r",
+                1,
+                "b",
+                [{"path": "a.py", "side": "RIGHT", "line": 99, "body": "x"}],
+            )
+        with pytest.raises(httpx.HTTPStatusError) as injected:
+            await gh.post_issue_comment("o/r", 1, "x")
+        await gh.post_issue_comment(
+            "o/r", 1, "x"
+        )  # uses the last request of the budget
+        with pytest.raises(httpx.HTTPStatusError) as limited:
+            await gh.post_issue_comment("o/r", 1, "x")
+        return bad_line.value, injected.value, limited.value
+
+    bad_line, injected, limited = asyncio.run(run())
+    assert bad_line.response.status_code == 422
+    assert injected.response.status_code == 502
+    assert limited.response.status_code == 403
+    assert limited.response.headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_cli_runs_end_to_end_against_localhost_fake(monkeypatch):
+    fake = FakeGitHub(latency=0.001)
+    fake.add_pr(
+        "owner/repo",
+        31,
+        [{"filename": "app/x.py", "patch": "@@ -1 +1,2 @@\n ctx\n+run(user_input)"}],
+    )
+    server, base_url = serve_in_thread(fake)
+    try:
+        settings.github_repository = "owner/repo"
+        settings.pull_request_number = 31
+        settings.github_token = "ghs_mock"
+        settings.openai_api_key = "sk-mock"
+        settings.review_mode = "review"
+        settings.include_globs = []
+        settings.exclude_globs = []
+        settings.max_inline_comments = 5
+        monkeypatch.setattr(settings, "github_api_url", base_url)
+        monkeypatch.setattr(settings, "enable_auto_labels", True)
+
+        def fake_review_patches_json(self, patches, system, user):
+            return {
+                "text": '{"summary_markdown":"ok","decision":"comment","files":['
+                '{"filename":"app/x.py","comments":[{"line_hint":"user_input",'
+                '"message":"Validate input.","severity":"low"}]}]}'
+            }
+
+        monkeypatch.setattr(
+            LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+        )
+        rc = asyncio.run(cli.main())
+    finally:
+        server.should_exit = True
+
+    assert rc == 0
+    pr = fake.pr("owner/repo", 31)
+    assert pr["reviews"][0]["comments"][0]["line"] == 2
+    assert pr["labels"]
+    assert fake.requests["list_pr_files"] == 1
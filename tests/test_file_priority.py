@@ -0,0 +1,86 @@
+import asyncio
+
+import app.cli_review as cli
+from app.file_priority import is_test_path, rank_candidates
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+
+
+def _c(filename, changes=5, status="modified"):
+    return {
+        "filename": filename,
+        "patch": "@@ -1 +1 @@\n+x",
+        "changes": changes,
+        "status": status,
+    }
+
+
+def test_rank_puts_sensitive_source_before_docs_and_tests():
+    ranked = rank_candidates(
+        [
+            _c("README.md"),
+            _c("tests/test_login.py"),
+            _c("app/utils.py"),
+            _c("app/auth/session.py"),
+            _c("docs/guide.rst", changes=500),
+        ]
+    )
+    names = [c["filename"] for c in ranked]
+    assert names[0] == "app/auth/session.py"
+    assert names.index("app/utils.py") < names.index("tests/test_login.py")
+    assert names.index("tests/test_login.py") < names.index("README.md")
+
+
+def test_is_test_path():
+    assert is_test_path("tests/test_x.py")
+    assert is_test_path("src/app.spec.ts")
+    assert is_test_path("pkg/handler_test.go")
+    assert not is_test_path("app/contest.py")
+
+
+def test_budget_is_filled_with_highest_value_files(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 30
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 2
+    settings.max_patch_chars = 2000
+    settings.max_total_patch_chars = 10000
+    monkeypatch.setattr(settings, "prioritize_files", True)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {
+                "filename": name,
+                "patch": f"@@ -1 +1 @@\n-{i} = 0\n+{i} = 1\n",
+                "changes": 2,
+            }
+            for i, name in enumerate(
+                ["CHANGELOG.md", "app/a_helpers.py", "app/crypto.py"]
+            )
+        ]
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    reviewed = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        reviewed.extend(p["filename"] for p in patches)
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        GitHubClient, "post_issue_comment", fake_post_issue_comment, raising=True
+    )
+    monkeypatch.setattr(
+        LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+    )
+
+    rc = asyncio.run(cli.main())
+    assert rc == 0
+    assert reviewed == ["app/crypto.py", "app/a_helpers.py"]
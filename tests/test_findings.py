@@ -0,0 +1,57 @@
+from app.cli_review import _batch_metrics, _inline_comments
+from app.findings import NO_LINE, FindingsTable, severity_code
+
+PARSED_1 = {
+    "files": [
+        {
+            "filename": "app/a.py",
+            "comments": [
+                {"line_hint": "eval(", "message": "No eval.", "severity": "high"},
+                {"line_hint": "x", "message": "Name.", "severity": "LOW"},
+            ],
+        },
+        {"filename": "app/empty.py", "comments": []},
+    ]
+}
+PARSED_2 = {
+    "files": [
+        {"filename": "app/a.py", "comments": [{"message": "?", "severity": "bogus"}]},
+        {"filename": "app/b.py", "comments": [{"message": "?"}]},
+    ]
+}
+
+
+def test_severity_codes_normalize_case_and_unknowns():
+    values = ("low", "HIGH", "Medium", None, 3)
+    assert [severity_code(v) for v in values] == [1, 3, 2, 2, 2]
+
+
+def test_histograms_gates_and_per_file_counts():
+    t = FindingsTable()
+    rows1 = t.add_parsed(PARSED_1, batch=1)
+    rows2 = t.add_parsed(PARSED_2, batch=2)
+    assert (rows1, rows2) == ((0, 2), (2, 4))
+    assert t.histogram(*rows1) == {"low": 1, "medium": 0, "high": 1}
+    assert t.histogram() == {"low": 1, "medium": 2, "high": 1}
+    assert (t.max_severity(*rows1), t.max_severity(*rows2)) == (3, 2)
+    assert t.max_severity(4, 4) == 0
+    assert t.per_file() == {"app/a.py": 3, "app/b.py": 1}
+    assert list(t.batch) == [1, 1, 2, 2]
+    assert t.filenames == ["app/a.py", "app/b.py"]
+
+    m = _batch_metrics(PARSED_1, t, rows1)
+    assert m == {
+        "severity_histogram": {"low": 1, "medium": 0, "high": 1},
+        "files_count": 2,
+        "comments_count": 2,
+    }
+
+
+def test_inline_placement_records_lines_on_the_rows():
+    t = FindingsTable()
+    t.add_parsed(PARSED_2, batch=1)  # rows of an earlier batch
+    rows = t.add_parsed(PARSED_1, batch=2)
+    batch = [{"filename": "app/a.py", "patch": "@@ -1 +1,2 @@\n x = 1\n+y = eval(s)"}]
+    payload = _inline_comments(batch, PARSED_1, t, rows[0])
+    assert payload[0]["line"] == 2
+    assert list(t.line) == [NO_LINE, NO_LINE, *(c["line"] for c in payload)]
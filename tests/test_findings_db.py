@@ -0,0 +1,145 @@
+import asyncio
+import json
+import sys
+
+import app.cli_review as cli
+from app.findings import FindingsTable
+from app.findings_db import (
+    connect,
+    hot_files,
+    record_run,
+    severity_trend,
+    tokens_per_pr,
+)
+from app.settings import settings
+from app.services.llm import LLMClient
+from tools import findings_query
+from tools.fake_github import FakeGitHub, serve_in_thread
+
+
+def _table(*files):
+    t = FindingsTable()
+    t.add_parsed(
+        {
+            "files": [
+                {"filename": f, "comments": [{"severity": s, "rule": "py-eval"}]}
+                for f, s in files
+            ]
+        },
+        batch=1,
+    )
+    return t
+
+
+RUNS = [
+    # (repo, pr, head, event, prompt tokens, findings, created_at)
+    ("o/r", 1, "a", "COMMENT", 100, [("x.py", "low")], "2024-06-01T10:00:00Z"),
+    # A rerun of PR 1 supersedes its findings but still costs tokens
+    (
+        "o/r",
+        1,
+        "b",
+        "REQUEST_CHANGES",
+        100,
+        [("x.py", "high"), ("y.py", "medium")],
+        "2024-06-02T10:00:00Z",
+    ),
+    ("o/r", 2, "c", "COMMENT", 500, [("x.py", "medium")], "2024-06-02T11:00:00Z"),
+    ("o/other", 7, "d", "COMMENT", 100, [("z.py", "low")], "2024-06-03T10:00:00Z"),
+]
+
+
+def _seed(db):
+    for repo, pr, head, event, prompt, files, at in RUNS:
+        usage = {"calls": 1, "prompt_tokens": prompt, "completion_tokens": 20}
+        t = _table(*files)
+        record_run(db, repo, pr, head, event, usage, t, len(files), created_at=at)
+
+
+def test_trend_queries(tmp_path):
+    db = str(tmp_path / "findings.db")
+    _seed(db)
+    conn = connect(db)
+    try:
+        hot = hot_files(conn, repo="o/r")
+        assert [(r["file"], r["findings"], r["high"], r["prs"]) for r in hot] == [
+            ("x.py", 2, 1, 2),
+            ("y.py", 1, 0, 1),
+        ]
+        trend = severity_trend(conn, repo="o/r")
+        assert trend == [
+            {"period": "2024-06-01", "runs": 1, "low": 1, "medium": 0, "high": 0},
+            {"period": "2024-06-02", "runs": 2, "low": 0, "medium": 2, "high": 1},
+        ]
+        tokens = tokens_per_pr(conn, since="2024-06-02")
+        assert [(r["repo"], r["pr"], r["runs"], r["total_tokens"]) for r in tokens] == [
+            ("o/r", 2, 1, 520),
+            ("o/other", 7, 1, 120),
+            ("o/r", 1, 1, 120),
+        ]
+        rule_rows = conn.execute(
+            "SELECT COUNT(*) FROM findings WHERE rule = 'py-eval'"
+        ).fetchone()[0]
+        assert rule_rows == 5
+    finally:
+        conn.close()
+
+
+def test_query_cli_prints_json(tmp_path, monkeypatch, capsys):
+    db = str(tmp_path / "findings.db")
+    _seed(db)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["findings_query", "--db", db, "--json", "hot-files", "--limit", "1"],
+    )
+    assert findings_query.main() == 0
+    assert json.loads(capsys.readouterr().out)[0]["file"] == "x.py"
+
+
+def test_each_review_run_is_appended(tmp_path, monkeypatch):
+    fake = FakeGitHub()
+    fake.add_pr(
+        "owner/repo",
+        45,
+        [{"filename": "app/x.py", "patch": "@@ -1 +1,2 @@\n ctx\n+run(user_input)"}],
+    )
+    server, base_url = serve_in_thread(fake)
+
+    def fake_review_patches_json(self, patches, system, user):
+        return {
+            "text": '{"summary_markdown":"ok","decision":"comment","files":['
+            '{"filename":"app/x.py","comments":[{"line_hint":"user_input",'
+            '"message":"Validate input.","severity":"high"}]}]}',
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+        }
+
+    monkeypatch.chdir(tmp_path)
+    try:
+        settings.github_repository = "owner/repo"
+        settings.pull_request_number = 45
+        settings.github_token = "ghs_mock"
+        settings.openai_api_key = "sk-mock"
+        settings.review_mode = "review"
+        settings.include_globs = []
+        settings.exclude_globs = []
+        settings.max_inline_comments = 5
+        monkeypatch.setattr(settings, "github_api_url", base_url)
+        monkeypatch.setattr(settings, "enable_auto_labels", False)
+        monkeypatch.setattr(settings, "findings_db", str(tmp_path / "f.db"))
+        monkeypatch.setattr(
+            LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+        )
+        for _ in range(2):
+            assert asyncio.run(cli.main()) == 0
+    finally:
+        server.should_exit = True
+
+    conn = connect(str(tmp_path / "f.db"))
+    try:
+        runs = conn.execute("SELECT repo, pr, comments FROM runs").fetchall()
+        assert [tuple(r) for r in runs] == [("owner/repo", 45, 1)] * 2
+        found = conn.execute("SELECT file, severity, line FROM findings").fetchall()
+        assert [tuple(r) for r in found] == [("app/x.py", 3, 2)] * 2
+    finally:
+        conn.close()
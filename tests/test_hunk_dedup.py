@@ -0,0 +1,121 @@
+import asyncio
+
+import app.cli_review as cli
+from app.diff_slimmer import slim_patch_to_changed
+from app.hunk_dedup import DEDUP_PREFIX, dedup_hunks, fan_out_line
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from app.services.llm import LLMClient
+
+HEADER_SWAP = (
+    "@@ -1,2 +1,2 @@\n-# Copyright 2023 Acme\n+# Copyright 2024 Acme\n import os"
+)
+
+
+def test_identical_hunks_are_kept_once_with_fan_out():
+    patches = [
+        {
+            "filename": "a.py",
+            "patch": HEADER_SWAP + "\n@@ -10,1 +10,1 @@\n-x = 1\n+x = 2",
+        },
+        {"filename": "b.py", "patch": HEADER_SWAP.replace("-1,2 +1,2", "-3,2 +3,2")},
+        {"filename": "c.py", "patch": HEADER_SWAP},
+    ]
+    out = dedup_hunks(patches)
+
+    # b.py and c.py only carried the duplicate, so only a.py is left to review
+    assert [p["filename"] for p in out] == ["a.py"]
+    assert (
+        DEDUP_PREFIX + "identical hunk also in 2 file(s): b.py, c.py" in out[0]["patch"]
+    )
+    assert "+x = 2" in out[0]["patch"]
+
+    # Line 1 of a.py's hunk is line 3 in b.py (hunk starts later) and line 1 in c.py
+    assert fan_out_line(out[0]["dedup"], 1) == [("b.py", 3), ("c.py", 1)]
+    assert fan_out_line(out[0]["dedup"], 10) == []
+
+
+def test_fan_out_skips_lines_a_copy_cannot_take():
+    # A stale owner header claims more lines than the copy's hunk actually carries
+    dedup = [(1, 4, [("b.py", 3, frozenset({3, 4})), ("c.py", 1, frozenset({1, 2}))])]
+    assert fan_out_line(dedup, 2) == [("b.py", 4), ("c.py", 2)]
+    assert fan_out_line(dedup, 3) == []
+
+
+def test_fan_out_after_slimming_different_leading_context():
+    # Same edit, but the raw hunks open with a different amount of context
+    raws = {
+        "a.py": "@@ -1,6 +1,6 @@\n p\n q\n z\n-old()\n+new()\n t",
+        "b.py": "@@ -10,5 +10,5 @@\n r\n z\n-old()\n+new()\n t",
+    }
+    patches = [
+        {
+            "filename": f,
+            "patch": slim_patch_to_changed(raw, ctx=1, trailing_newline=False),
+        }
+        for f, raw in raws.items()
+    ]
+    out = dedup_hunks(patches)
+
+    assert [p["filename"] for p in out] == ["a.py"]
+    # new() is line 4 of a.py and line 12 of b.py
+    assert fan_out_line(out[0]["dedup"], 4) == [("b.py", 12)]
+
+
+def test_unique_hunks_pass_through():
+    patches = [{"filename": "a.py", "patch": HEADER_SWAP}]
+    assert dedup_hunks(patches) == patches
+
+
+def test_findings_are_placed_in_every_copy(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 29
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "review"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 10
+    settings.max_patch_chars = 2000
+    settings.max_total_patch_chars = 10000
+    settings.max_inline_comments = 10
+    monkeypatch.setattr(settings, "dedup_hunks", True)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [{"filename": f"pkg/m{i}.py", "patch": HEADER_SWAP} for i in range(3)]
+
+    reviewed = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        reviewed.extend(p["filename"] for p in patches)
+        return {
+            "text": '{"summary_markdown":"ok","decision":"comment","files":['
+            '{"filename":"pkg/m0.py","comments":[{"line_hint":"2024",'
+            '"message":"Year bump only?","severity":"low"}]}]}'
+        }
+
+    posted = {}
+
+    async def fake_create_review(
+        self, repo, pull_number, body, comments, event="COMMENT"
+    ):
+        posted["comments"] = comments
+        return {"id": 1}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+    )
+    monkeypatch.setattr(
+        GitHubReviewsClient, "create_review", fake_create_review, raising=True
+    )
+
+    rc = asyncio.run(cli.main())
+    assert rc == 0
+    assert reviewed == ["pkg/m0.py"]
+    assert [(c["path"], c["line"]) for c in posted["comments"]] == [
+        ("pkg/m0.py", 1),
+        ("pkg/m1.py", 1),
+        ("pkg/m2.py", 1),
+    ]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from pathlib import Path
+
+import app.cli_review as cli
+from app.diff_slimmer import split_patch_by_hunks
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+
+
+def _hunk(start: int, body: str) -> str:
+    return f"@@ -{start},1 +{start},1 @@\n-old_{start}\n+{body}"
+
+
+def test_split_patch_cuts_only_at_hunk_boundaries():
+    patch = "\n".join(_hunk(i * 10, "x" * 40) for i in range(1, 6))
+    parts = split_patch_by_hunks(patch, max_chars=120)
+
+    assert len(parts) > 1
+    assert all(p.startswith("@@ ") for p in parts)
+    assert all(len(p) <= 120 for p in parts)
+    # Nothing is lost: parts re-join to the original diff
+    assert "\n".join(parts) == patch
+
+
+def test_small_patch_is_returned_unchanged():
+    patch = _hunk(1, "y")
+    assert split_patch_by_hunks(patch, max_chars=1000) == [patch]
+
+
+def test_oversized_file_is_reviewed_in_parts(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 27
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_patch_chars = 120
+    settings.max_total_patch_chars = 1000
+
+    patch = "\n".join(_hunk(i * 10, f"line_{i} = {'z' * 30}") for i in range(1, 6))
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [{"filename": "db/migration.py", "patch": patch}]
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    seen = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        seen.extend(patches)
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        GitHubClient, "post_issue_comment", fake_post_issue_comment, raising=True
+    )
+    monkeypatch.setattr(
+        LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+    )
+
+    rc = asyncio.run(cli.main())
+    assert rc == 0
+    assert len(seen) > 1
+    assert {p["filename"] for p in seen} == {"db/migration.py"}
+    assert all("...[truncated]..." not in p["patch"] for p in seen)
+    # The last hunk made it to the model instead of being cut off
+    assert any("line_5" in p["patch"] for p in seen)
+
+
+def test_parts_over_the_per_file_cap_are_reported(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 27
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_patch_chars = 120
+    settings.max_total_patch_chars = 1000
+    monkeypatch.setattr(settings, "max_parts_per_file", 2)
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+
+    patch = "\n".join(_hunk(i * 10, f"line_{i} = {'z' * 30}") for i in range(1, 6))
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [{"filename": "db/migration.py", "patch": patch}]
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    def fake_review_patches_json(self, patches, system, user):
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    assert asyncio.run(cli.main()) == 0
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    [skipped] = report["budget_skipped"]
+    assert skipped["filename"] == "db/migration.py"
+    assert skipped["reason"] == "max_parts_per_file"
+    assert skipped["parts_dropped"] == skipped["parts"] - 2 > 0
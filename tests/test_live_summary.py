@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from tools import ci_summary
+
+
+def test_batches_reach_the_job_summary_while_the_review_runs(
+    monkeypatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    summary = tmp_path / "step_summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 47
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    monkeypatch.setattr(settings, "live_job_summary", True)
+    # One batch per file
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": "app/a.py", "patch": "@@ -1 +1 @@\n+a = 1"},
+            {"filename": "app/b.py", "patch": "@@ -1 +1 @@\n+b = eval(x)"},
+        ]
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    seen = {}
+
+    def fake_review_patches_json(self, patches, system, user):
+        name = patches[0]["filename"]
+        if name == "app/b.py":
+            # Batch 1 is already in the job summary while batch 2 is with the LLM
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                text = summary.read_text("utf-8") if summary.exists() else ""
+                if "### Batch 1/2" in text:
+                    break
+                time.sleep(0.01)
+            seen["early"] = text
+        comments = [{"severity": "high"}] if name == "app/b.py" else []
+        return {
+            "text": json.dumps(
+                {
+                    "summary_markdown": f"Looked at {name}",
+                    "decision": "comment",
+                    "files": [{"filename": name, "comments": comments}],
+                }
+            )
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    assert asyncio.run(cli.main()) == 0
+    assert "> Looked at app/a.py" in seen["early"]
+    assert "Batch 2/2" not in seen["early"]
+
+    assert ci_summary.main() == 0
+    md = summary.read_text("utf-8")
+    # Batches appear once (streamed), followed by the outcome and totals
+    assert md.count("### Batch 1/2") == 1 and md.count("### Batch 2/2") == 1
+    assert md.index("### Batch 2/2") < md.index("**Outcome:** ❌ `REQUEST_CHANGES`")
+    assert "| 2 | 1 | 1 | 0 | 0 |" in md
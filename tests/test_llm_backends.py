@@ -0,0 +1,110 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.cli_review as cli
+from app.review_strategy import (
+    build_llm_prompt_from_patches,
+    parse_llm_json_or_fallback,
+)
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from app.services.llm_backends import FakeLLMBackend, OpenAIBackend
+
+PATCHES = [
+    {"filename": "app/run.py", "patch": "@@ -1 +1,2 @@\n ctx\n+eval(user_input)"},
+    {"filename": "app/ok.py", "patch": "@@ -1 +1 @@\n+x = 1"},
+]
+
+
+def test_fake_backend_is_deterministic_and_schema_valid():
+    system, user = build_llm_prompt_from_patches(PATCHES)
+    a = LLMClient(api_key="", model="m", backend=FakeLLMBackend())
+    b = LLMClient(api_key="", model="m", backend=FakeLLMBackend())
+
+    ra = a.review_patches_json(PATCHES, system, user)
+    rb = b.review_patches_json(PATCHES, system, user)
+    assert ra["text"] == rb["text"]
+    assert ra["finish_reason"] == "stop"
+    assert ra["usage"]["prompt_tokens"] > 0
+
+    parsed = parse_llm_json_or_fallback(ra["text"])
+    assert parsed["decision"] == "request_changes"
+    assert parsed["files"][0]["filename"] == "app/run.py"
+    assert parsed["files"][0]["comments"][0]["severity"] == "high"
+    assert a.usage["calls"] == 1
+
+
+def test_fake_backend_malformed_truncated_and_streaming(monkeypatch):
+    system, user = build_llm_prompt_from_patches(PATCHES)
+
+    malformed = LLMClient("", "m", backend=FakeLLMBackend(mode="malformed"))
+    text = malformed.review_patches_json(PATCHES, system, user)["text"]
+    assert parse_llm_json_or_fallback(text)["files"] == []
+
+    truncated = LLMClient("", "m", backend=FakeLLMBackend(mode="truncated"))
+    out = truncated.review_patches_json(PATCHES, system, user)
+    assert out["finish_reason"] == "length"
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(out["text"])
+
+    plain = LLMClient("", "m", backend=FakeLLMBackend()).review_patches_json(
+        PATCHES, system, user
+    )
+    monkeypatch.setattr(settings, "llm_stream", True)
+    streamed = LLMClient("", "m", backend=FakeLLMBackend()).review_patches_json(
+        PATCHES, system, user
+    )
+    assert streamed["text"] == plain["text"]
+    assert streamed["usage"] == plain["usage"]
+
+
+def test_openai_stream_keeps_finish_reason_without_a_usage_chunk():
+    def chunk(content=None, finish_reason=None):
+        delta = SimpleNamespace(content=content)
+        choice = SimpleNamespace(delta=delta, finish_reason=finish_reason)
+        return SimpleNamespace(choices=[choice], usage=None)
+
+    def create(**kwargs):
+        return iter([chunk('{"summary'), chunk(finish_reason="length")])
+
+    backend = OpenAIBackend.__new__(OpenAIBackend)
+    backend.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    events = list(backend.stream("m", "s", "u", 10, 0.0))
+    assert "".join(e["delta"] for e in events) == '{"summary'
+    assert events[-1]["finish_reason"] == "length"
+
+
+def test_cli_runs_offline_with_fake_backend(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 32
+    settings.github_token = "ghs_mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.severity_gate = "high"
+    monkeypatch.setattr(settings, "openai_api_key", "")
+    monkeypatch.setattr(settings, "llm_backend", "fake")
+
+    async def fake_list_pr_files(self, repo, pr):
+        return PATCHES
+
+    posted = []
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        posted.append(body)
+        return {"id": 1}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        GitHubClient, "post_issue_comment", fake_post_issue_comment, raising=True
+    )
+
+    rc = asyncio.run(cli.main())
+    assert rc == 0
+    assert posted and "Fake review" in posted[0]
@@ -0,0 +1,38 @@
+from app.settings import settings
+from tools.load_test import SHAPES, compare, percentile, run_load
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_run_load_reports_stages_memory_and_requests():
+    before = settings.llm_backend
+    result = run_load(shape="tiny", prs=2, overrides={"max_files": "20"})
+
+    assert settings.llm_backend == before  # settings restored
+    assert result["prs"] == 2 and result["prs_per_min"] > 0
+    assert result["stages"]["total"]["count"] == 2
+    assert result["stages"]["llm"]["p95"] >= result["stages"]["llm"]["p50"]
+    assert result["peak_traced_mb"] > 0
+    assert result["requests"]["github"]["list_pr_files"] >= 2
+    assert result["requests"]["llm"]["calls"] >= 2
+
+
+def test_compare_reports_deltas():
+    base = {"prs_per_min": 10, "stages": {"llm": {"p50": 2.0, "p95": 4.0, "p99": 4.0}}}
+    new = {"prs_per_min": 20, "stages": {"llm": {"p50": 1.0, "p95": 4.0, "p99": 4.0}}}
+    rows = {r["metric"]: r for r in compare(base, new)}
+    assert rows["prs_per_min"]["delta_pct"] == 100.0
+    assert rows["stage.llm.p50"]["delta_pct"] == -50.0
+
+
+def test_shapes_are_distinct_per_pr():
+    for make in SHAPES.values():
+        assert {f["filename"] for f in make(1)}.isdisjoint(
+            {f["filename"] for f in make(2)}
+        )
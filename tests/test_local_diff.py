@@ -0,0 +1,115 @@
+import asyncio
+import subprocess
+
+import pytest
+
+import app.cli_review as cli
+from app.local_diff import iter_local_files, parse_git_diff
+from app.settings import settings
+from app.services.llm import LLMClient
+from tools.fake_github import FakeGitHub, serve_in_thread
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "include_globs", [])
+    monkeypatch.setattr(settings, "exclude_globs", ["**/*.lock"])
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "app.py").write_text("a = 1\nb = 2\n")
+    (tmp_path / "old name.py").write_text("".join(f"x{i} = {i}\n" for i in range(20)))
+    (tmp_path / "gone.py").write_text("bye\n")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    (tmp_path / "app.py").write_text("a = 1\nb = 3\nc = eval(x)\n")
+    _git(tmp_path, "mv", "old name.py", "new name.py")
+    (tmp_path / "gone.py").unlink()
+    (tmp_path / "deps.lock").write_text("pinned\n")
+    (tmp_path / "logo.bin").write_bytes(b"\0\1\2")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "change")
+    return tmp_path
+
+
+def test_local_diff_matches_files_api_shape(repo):
+    files = {f.filename: f for f in iter_local_files("main", "feature", str(repo))}
+
+    app = files["app.py"]
+    assert app.status == "modified"
+    assert (app.additions, app.deletions, app.changes) == (2, 1, 3)
+    assert len(app.sha) == 40 and files["gone.py"].sha is None
+    assert app.patch == "@@ -1,2 +1,3 @@\n a = 1\n-b = 2\n+b = 3\n+c = eval(x)"
+
+    assert files["new name.py"].status == "renamed"
+    assert files["new name.py"].patch is None
+    assert files["gone.py"].status == "removed"
+    assert files["gone.py"].patch == "@@ -1 +0,0 @@\n-bye"
+    # Excluded files keep their stats but not their patch; binaries have none
+    assert files["deps.lock"].status == "added" and files["deps.lock"].patch is None
+    assert files["deps.lock"].additions == 1
+    assert files["logo.bin"].patch is None
+
+
+def test_bad_revision_raises(repo):
+    with pytest.raises(RuntimeError, match="git diff"):
+        list(iter_local_files("nope", "feature", str(repo)))
+
+
+def test_parser_keeps_no_newline_annotations(monkeypatch):
+    monkeypatch.setattr(settings, "include_globs", [])
+    diff = [
+        "diff --git a/x.py b/x.py\n",
+        "--- a/x.py\n",
+        "+++ b/x.py\n",
+        "@@ -1 +1 @@\n",
+        "-old\n",
+        "\\ No newline at end of file\n",
+        "+--flag\n",
+    ]
+    (f,) = parse_git_diff(diff)
+    assert f.patch == "@@ -1 +1 @@\n-old\n\\ No newline at end of file\n+--flag"
+    assert (f.additions, f.deletions) == (1, 1)
+
+
+def test_cli_reviews_the_local_diff_without_the_files_api(repo, monkeypatch):
+    fake = FakeGitHub()
+    fake.add_pr("owner/repo", 41, [])
+    server, base_url = serve_in_thread(fake)
+    seen = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        seen.extend(p["filename"] for p in patches)
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    monkeypatch.chdir(repo)
+    try:
+        settings.github_repository = "owner/repo"
+        settings.pull_request_number = 41
+        settings.github_token = "ghs_mock"
+        settings.openai_api_key = "sk-mock"
+        settings.review_mode = "comment"
+        monkeypatch.setattr(settings, "github_api_url", base_url)
+        monkeypatch.setattr(settings, "enable_auto_labels", False)
+        monkeypatch.setattr(settings, "diff_source", "git")
+        monkeypatch.setattr(settings, "base_sha", "main")
+        monkeypatch.setattr(settings, "head_sha", "feature")
+        monkeypatch.setattr(settings, "checkpoint_dir", "")
+        monkeypatch.setattr(
+            LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+        )
+        assert asyncio.run(cli.main()) == 0
+    finally:
+        server.should_exit = True
+
+    assert fake.requests["list_pr_files"] == 0
+    assert sorted(seen) == ["app.py", "gone.py"]
+    assert len(fake.pr("owner/repo", 41)["comments"]) == 1
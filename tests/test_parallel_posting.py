@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+
+import httpx
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient, rate_limit_wait
+from app.services.llm import LLMClient
+
+
+def test_posts_and_labels_overlap_later_llm_batches(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 36
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_patch_chars = 2000
+    settings.max_total_patch_chars = 10000
+    settings.severity_gate = "high"
+    # One batch per file
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+    monkeypatch.setattr(settings, "enable_auto_labels", True)
+    monkeypatch.setattr(settings, "prioritize_files", False)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": "app/a.py", "patch": "@@ -1 +1 @@\n+eval(a)"},
+            {"filename": "app/b.py", "patch": "@@ -1 +1 @@\n+b = 2"},
+        ]
+
+    posted = threading.Event()
+    labelled = threading.Event()
+    seen = {}
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        posted.set()
+        return {"id": 1}
+
+    async def fake_add_labels(self, repo, issue_number, labels):
+        seen["labels"] = labels
+        labelled.set()
+        return []
+
+    def fake_review_patches_json(self, patches, system, user):
+        if patches[0]["filename"] == "app/b.py":
+            # Batch 2 is still "with the LLM" until batch 1 was posted and labelled
+            seen["overlap"] = posted.wait(5) and labelled.wait(5)
+            files = []
+        else:
+            files = [
+                {
+                    "filename": "app/a.py",
+                    "comments": [
+                        {"line_hint": "eval", "message": "no", "severity": "high"}
+                    ],
+                }
+            ]
+        return {
+            "text": json.dumps(
+                {"summary_markdown": "s", "decision": "comment", "files": files}
+            ),
+            "finish_reason": "stop",
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(GitHubClient, "add_labels", fake_add_labels)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+
+    assert asyncio.run(cli.main()) == 0
+    assert seen["overlap"] is True
+    assert seen["labels"] == ["gpt-review:request-changes", "gpt-review:high"]
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert [b["event"] for b in report["batches"]] == ["REQUEST_CHANGES", "COMMENT"]
+    assert report["overall_event"] == "REQUEST_CHANGES"
+
+
+def test_short_rate_limits_are_retried(monkeypatch):
+    monkeypatch.setattr(settings, "github_rate_limit_max_wait", 1.0)
+    statuses = [429, 403, 201]
+
+    def handler(request):
+        status = statuses.pop(0)
+        if status == 429:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if status == 403:
+            # Long waits are not retried; the caller sees the error
+            return httpx.Response(403, headers={"Retry-After": "60"})
+        return httpx.Response(201, json={"id": 7})
+
+    gh = GitHubClient(
+        token="t", base_url="http://fake", transport=httpx.MockTransport(handler)
+    )
+
+    async def run():
+        with_retry = None
+        try:
+            await gh.post_issue_comment("o/r", 1, "x")
+        except httpx.HTTPStatusError as e:
+            with_retry = e.response.status_code
+        return with_retry, await gh.post_issue_comment("o/r", 1, "y")
+
+    first, second = asyncio.run(run())
+    assert first == 403  # 429 retried after 0s, then the long 403 surfaced
+    assert second == {"id": 7}
+
+
+def test_malformed_rate_limit_headers_do_not_raise():
+    limited = {"X-RateLimit-Remaining": "0"}
+    assert rate_limit_wait(httpx.Response(403, headers=limited)) is None
+    for reset in ("", "soon"):
+        r = httpx.Response(403, headers={**limited, "X-RateLimit-Reset": reset})
+        assert rate_limit_wait(r) is None
+    # A bad reset falls back to a usable Retry-After, and vice versa
+    r = httpx.Response(
+        429, headers={**limited, "X-RateLimit-Reset": "soon", "Retry-After": "2"}
+    )
+    assert rate_limit_wait(r) == 2.0
+    r = httpx.Response(
+        429, headers={**limited, "X-RateLimit-Reset": "0", "Retry-After": "later"}
+    )
+    assert rate_limit_wait(r) == 0.0
@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.pr_files import PRFile, ingest_files
+from app.services.github import GitHubClient
+from app.settings import settings
+from tools.fake_github import FakeGitHub, create_app
+
+
+@pytest.fixture
+def globs():
+    saved = (settings.include_globs, settings.exclude_globs)
+    settings.include_globs = []
+    settings.exclude_globs = ["vendor/**"]
+    yield
+    settings.include_globs, settings.exclude_globs = saved
+
+
+def test_ingest_drops_urls_and_excluded_patches(globs):
+    raw = [
+        {
+            "filename": "app/a.py",
+            "status": "modified",
+            "additions": 1,
+            "deletions": 0,
+            "changes": 1,
+            "sha": "abc",
+            "blob_url": "https://example/blob",
+            "patch": "@@ -1 +1 @@\n-a\n+b",
+        },
+        {"filename": "vendor/lib/big.js", "status": "added", "patch": "+x\n" * 1000},
+    ]
+    kept, vendored = ingest_files(raw)
+
+    assert kept.patch.endswith("+b")
+    assert kept.stats() == {
+        "status": "modified",
+        "additions": 1,
+        "deletions": 0,
+        "changes": 1,
+    }
+    assert not hasattr(kept, "__dict__")  # __slots__ only, no per-record dict
+    assert vendored.patch is None and vendored.status == "added"
+
+
+def test_list_pr_files_returns_compact_records(globs):
+    fake = FakeGitHub()
+    files = [
+        {"filename": f"vendor/m{i}.js", "patch": "@@ -0,0 +1 @@\n+v"}
+        for i in range(150)
+    ]
+    files.append({"filename": "src/x.py", "patch": "@@ -1 +1 @@\n-a\n+b"})
+    fake.add_pr("o/r", 1, files)
+    gh = GitHubClient(
+        token="t",
+        base_url="http://fake",
+        transport=httpx.ASGITransport(app=create_app(fake)),
+    )
+
+    got = asyncio.run(gh.list_pr_files("o/r", 1))
+
+    assert len(got) == 151 and all(isinstance(f, PRFile) for f in got)
+    assert [f.filename for f in got if f.patch] == ["src/x.py"]
+
+
+def test_release_patch_hands_over_the_only_reference():
+    rec = PRFile.from_api({"filename": "a.py", "patch": "@@ -1 +1 @@\n+x"})
+    assert rec.release_patch().endswith("+x")
+    assert rec.patch is None
@@ -0,0 +1,126 @@
+import asyncio
+import json
+from pathlib import Path
+
+import app.cli_review as cli
+from app.report_stream import REPORT_STREAM_FILE, ReportStream, read_report_stream
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from tools import ci_summary
+
+
+def _run_review(monkeypatch, files):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 46
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+
+    async def fake_list_pr_files(self, repo, pr):
+        return files
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    def fake_review_patches_json(self, patches, system, user):
+        name = patches[0]["filename"]
+        sev = "high" if name.endswith("b.py") else "low"
+        return {
+            "text": json.dumps(
+                {
+                    "summary_markdown": f"Reviewed {name}",
+                    "decision": "comment",
+                    "files": [{"filename": name, "comments": [{"severity": sev}]}],
+                }
+            )
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", fake_review_patches_json)
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    # One batch per file
+    monkeypatch.setattr(cli, "chunk_patches", lambda patches, _: [[p] for p in patches])
+    return asyncio.run(cli.main())
+
+
+def test_stream_has_one_record_per_batch_and_a_summary(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    files = [
+        {"filename": f"app/{n}.py", "patch": f"@@ -1 +1 @@\n+{n} = compute({n})\n"}
+        for n in ("a", "b", "c")
+    ]
+    assert _run_review(monkeypatch, files) == 0
+
+    records = list(read_report_stream(str(tmp_path / REPORT_STREAM_FILE)))
+    assert [r["type"] for r in records] == ["run", "batch", "batch", "batch", "summary"]
+    assert records[0]["pr"] == 46
+    assert [r["batch"] for r in records[1:4]] == [1, 2, 3]
+    summary = records[-1]
+    assert summary["overall_event"] == "REQUEST_CHANGES"
+    assert summary["total_batches"] == 3
+    # The same batches as the single-document report
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert report["batches"] == [
+        {k: v for k, v in r.items() if k != "type"} for r in records[1:4]
+    ]
+
+
+def test_ci_summary_prefers_the_stream(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    files = [
+        {"filename": f"app/{n}.py", "patch": f"@@ -1 +1 @@\n+{n} = compute({n})\n"}
+        for n in ("a", "b")
+    ]
+    assert _run_review(monkeypatch, files) == 0
+    # A stale single-document report must not be used (or even decoded)
+    (tmp_path / cli.REPORT_FILE).write_bytes(b"\xff\xfe not json")
+
+    out = tmp_path / "summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(out))
+    assert ci_summary.main() == 0
+    md = out.read_text("utf-8")
+    assert "`REQUEST_CHANGES`" in md
+    assert "| 2 | 2 | 1 | 0 | 1 |" in md
+    assert "### Batch 1/2" in md and "### Batch 2/2" in md
+    assert "> Reviewed app/b.py" in md
+
+
+def test_unfinished_stream_rolls_up_completed_batches(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    stream = ReportStream()
+    stream.write("run", {"version": 1})
+    for n, event in ((1, "COMMENT"), (2, "REQUEST_CHANGES")):
+        stream.write(
+            "batch",
+            {
+                "batch": n,
+                "total_batches": 3,
+                "event": event,
+                "files_in_batch": [f"f{n}.py"],
+                "metrics": {
+                    "severity_histogram": {"low": 0, "medium": n, "high": 0},
+                    "comments_count": n,
+                },
+            },
+        )
+    stream.close()
+    # A batch record cut off mid-write
+    with open(REPORT_STREAM_FILE, "a", encoding="utf-8") as f:
+        f.write('{"type":"batch","batch":3,')
+
+    out = tmp_path / "summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(out))
+    assert ci_summary.main() == 0
+    md = out.read_text("utf-8")
+    assert "`REQUEST_CHANGES`" in md
+    assert "did not finish" in md
+    assert "| 2 | 3 | 0 | 3 | 0 |" in md
+    assert "### Batch 2/2" in md and "Batch 3" not in md
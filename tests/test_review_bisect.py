@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+
+import app.cli_review as cli
+from app.diff_slimmer import slim_patch_to_changed
+from app.services.github import GitHubClient
+from app.services.github_reviews import GitHubReviewsClient
+from tools.fake_github import FakeGitHub, create_app
+
+PATCH = "@@ -1,2 +1,4 @@\n ctx\n+a = 1\n+b = 2\n+c = 3"
+
+
+def _comment(line):
+    return {"path": "a.py", "side": "RIGHT", "line": line, "body": f"at {line}"}
+
+
+def _clients(fake):
+    transport = httpx.ASGITransport(app=create_app(fake))
+    gh = GitHubClient(token="t", base_url="http://fake", transport=transport)
+    reviews = GitHubReviewsClient(
+        token="t", base_url="http://fake", transport=transport
+    )
+    return gh, reviews
+
+
+def test_422_bisects_out_bad_comments_and_keeps_the_rest():
+    fake = FakeGitHub()
+    fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": PATCH}])
+    gh, reviews = _clients(fake)
+    payload = [_comment(2), _comment(3), _comment(4), _comment(99)]
+
+    asyncio.run(
+        cli._post_inline_review(reviews, gh, "o/r", 1, "summary", payload, "COMMENT")
+    )
+
+    pr = fake.pr("o/r", 1)
+    # One published review; the pending probes were deleted
+    [review] = pr["reviews"]
+    assert [c["line"] for c in review["comments"]] == [2, 3, 4]
+    assert (review["body"], review["event"]) == ("summary", "COMMENT")
+    assert pr["comments"] == []  # no whole-review fallback
+    # all -> 422, probes: [2,3] ok, [4,99] -> 422, [4] ok, [99] -> 422; then [2,3,4]
+    assert fake.requests["create_review"] == 6
+    assert fake.requests["delete_pending_review"] == 2
+
+
+def test_422_not_caused_by_comments_is_not_bisected():
+    fake = FakeGitHub()
+    fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": PATCH}])
+    gh, reviews = _clients(fake)
+    # e.g. REQUEST_CHANGES on one's own pull request
+    fake.fail_next("create_review", status=422)
+
+    asyncio.run(
+        cli._post_inline_review(
+            reviews, gh, "o/r", 1, "summary", [_comment(2), _comment(3)], "COMMENT"
+        )
+    )
+
+    pr = fake.pr("o/r", 1)
+    assert pr["reviews"] == []
+    assert [c["body"] for c in pr["comments"]] == ["summary"]
+    # The failed post, then two probes that both place
+    assert fake.requests["create_review"] == 3
+
+
+def test_all_comments_rejected_falls_back_to_issue_comment():
+    fake = FakeGitHub()
+    fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": PATCH}])
+    gh, reviews = _clients(fake)
+
+    asyncio.run(
+        cli._post_inline_review(
+            reviews, gh, "o/r", 1, "summary", [_comment(50), _comment(60)], "COMMENT"
+        )
+    )
+
+    pr = fake.pr("o/r", 1)
+    assert pr["reviews"] == []
+    assert [c["body"] for c in pr["comments"]] == ["summary"]
+
+
+def test_concurrent_posts_to_one_pr_do_not_collide_while_probing():
+    # Probes are pending reviews, and GitHub allows one per user and PR at a time
+    fake = FakeGitHub(latency=0.01)
+    fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": PATCH}])
+    gh, reviews = _clients(fake)
+
+    async def post_both():
+        await asyncio.gather(
+            cli._post_inline_review(
+                reviews, gh, "o/r", 1, "one", [_comment(2), _comment(99)], "COMMENT"
+            ),
+            cli._post_inline_review(
+                reviews, gh, "o/r", 1, "two", [_comment(3), _comment(98)], "COMMENT"
+            ),
+        )
+
+    asyncio.run(post_both())
+    pr = fake.pr("o/r", 1)
+    posted = {r["body"]: [c["line"] for c in r["comments"]] for r in pr["reviews"]}
+    assert posted == {"one": [2], "two": [3]}
+    assert pr["comments"] == []
+
+
+def test_a_leftover_pending_review_is_not_taken_for_bad_comments():
+    fake = FakeGitHub()
+    pr = fake.add_pr("o/r", 1, [{"filename": "a.py", "patch": PATCH}])
+    pr["reviews"].append({"id": 1, "body": "", "event": "PENDING", "comments": []})
+    gh, reviews = _clients(fake)
+
+    asyncio.run(
+        cli._post_inline_review(
+            reviews, gh, "o/r", 1, "summary", [_comment(2), _comment(3)], "COMMENT"
+        )
+    )
+    # No probing: the summary goes out as a comment instead
+    assert fake.requests["create_review"] == 1
+    assert [c["body"] for c in pr["comments"]] == ["summary"]
+
+
+def test_lines_are_mapped_on_the_slimmed_patch():
+    raw = "@@ -1,6 +1,6 @@\n a\n b\n c\n d\n-e\n+E = 1\n f"
+    slimmed = slim_patch_to_changed(raw, ctx=1, trailing_newline=False)
+    batch = [{"filename": "a.py", "patch": slimmed}]
+    parsed = {
+        "files": [
+            {"filename": "a.py", "comments": [{"line_hint": "E = 1", "message": "m"}]}
+        ]
+    }
+    assert [c["line"] for c in cli._inline_comments(batch, parsed)] == [5]
+
+
+def test_comments_outside_the_diff_are_dropped_before_posting(monkeypatch):
+    monkeypatch.setattr(cli, "guess_line_for_hint", lambda patch, hint: int(hint))
+    batch = [{"filename": "a.py", "patch": PATCH}]
+    parsed = {
+        "files": [
+            {
+                "filename": "a.py",
+                "comments": [
+                    {"line_hint": "3", "message": "ok"},
+                    {"line_hint": "42", "message": "stale"},
+                ],
+            }
+        ]
+    }
+    assert [c["line"] for c in cli._inline_comments(batch, parsed)] == [3]
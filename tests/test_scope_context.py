@@ -0,0 +1,157 @@
+import asyncio
+
+import app.cli_review as cli
+from app.diff_slimmer import slim_patch_to_changed
+from app.review_strategy import build_llm_prompt_from_patches
+from app.scope_context import (
+    BlobCache,
+    add_scope_context,
+    changed_spans,
+    enclosing_scope,
+    scope_context,
+)
+from app.settings import settings
+from app.services.llm import LLMClient
+from tools.fake_github import FakeGitHub, serve_in_thread
+
+SOURCE = """import os
+
+
+class Store:
+    def __init__(self):
+        self.items = {}
+
+    def load(
+        self,
+        path,
+    ) -> dict:
+        if os.path.exists(path):
+            with open(path) as f:
+                data = f.read()
+                return eval(data)
+        return {}
+
+
+def helper():
+    return 1
+"""
+LINES = SOURCE.split("\n")
+# Line 15 ("return eval(data)") changed inside Store.load
+PATCH = (
+    "@@ -13,4 +13,4 @@\n"
+    "             with open(path) as f:\n"
+    "                 data = f.read()\n"
+    "-                return json.loads(data)\n"
+    "+                return eval(data)\n"
+    "         return {}"
+)
+
+
+def test_changed_spans_follow_new_side_numbering():
+    assert changed_spans(PATCH) == [(15, 15)]
+    assert changed_spans("@@ -1,3 +1,2 @@\n a\n-b\n c\n@@ -9 +8 @@\n+x") == [
+        (2, 2),
+        (8, 8),
+    ]
+
+
+def test_innermost_scope_spans_the_multiline_signature():
+    assert enclosing_scope(LINES, (15, 15), 80) == (8, 16)
+    # Too long for the cap: just the signature line
+    assert enclosing_scope(LINES, (15, 15), 5) == (8, 8)
+    # Top-level code has no enclosing scope
+    assert enclosing_scope(LINES, (1, 1), 80) is None
+
+
+def test_brace_scopes_include_the_closing_brace():
+    js = "function a() {\n  if (x) {\n    y();\n  }\n}\n\nfunction b() {}".split("\n")
+    assert enclosing_scope(js, (3, 3), 80) == (1, 5)
+
+
+def test_scope_context_skips_scopes_the_patch_already_shows():
+    ctx = scope_context(PATCH, LINES, 80)
+    assert ctx.startswith("[lines 8-16]\n    def load(")
+    whole = "@@ -19,2 +19,2 @@\n def helper():\n-    return 0\n+    return 1"
+    assert scope_context(whole, LINES, 80) == ""
+
+
+def test_slimmed_patches_keep_their_scopes():
+    # The full hunk of helper()'s change starts in Store.load; slimming drops the
+    # lines above the change, and the spans must still point at line 20
+    raw = (
+        "@@ -13,8 +13,8 @@\n"
+        + "\n".join(" " + ln for ln in LINES[12:19])
+        + "\n-    return 0\n+    return 1"
+    )
+    slimmed = slim_patch_to_changed(raw, ctx=0, trailing_newline=False)
+    assert changed_spans(slimmed) == changed_spans(raw) == [(20, 20)]
+    assert (
+        scope_context(slimmed, LINES, 80)
+        == "[lines 19-20]\ndef helper():\n    return 1"
+    )
+
+
+def test_blobs_are_read_once_and_cached_on_disk(tmp_path):
+    reads = []
+
+    async def read_blob(sha):
+        reads.append(sha)
+        return SOURCE.encode()
+
+    patches = [
+        {"filename": "store.py", "patch": PATCH, "sha": "abc123", "part": 1},
+        {"filename": "store.py", "patch": PATCH, "sha": "abc123", "part": 2},
+        {"filename": "bin.dat", "patch": PATCH},
+    ]
+    cache = BlobCache(str(tmp_path))
+    assert asyncio.run(add_scope_context(patches, read_blob, cache, 80)) == 2
+    assert reads == ["abc123"]
+    assert "context" not in patches[2]
+
+    # A later run finds the blob on disk
+    again = [{"filename": "store.py", "patch": PATCH, "sha": "abc123"}]
+    asyncio.run(add_scope_context(again, read_blob, BlobCache(str(tmp_path)), 80))
+    assert reads == ["abc123"]
+    assert again[0]["context"] == patches[0]["context"]
+
+    _, user = build_llm_prompt_from_patches(again)
+    assert "Enclosing scope at the PR head" in user
+    assert "    def load(" in user
+
+
+def test_cli_fetches_scope_context_through_the_blobs_api(monkeypatch, tmp_path):
+    fake = FakeGitHub()
+    fake.add_pr(
+        "owner/repo",
+        42,
+        [{"filename": "store.py", "patch": PATCH, "contents": SOURCE}],
+    )
+    server, base_url = serve_in_thread(fake)
+    prompts = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        prompts.append(user)
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    monkeypatch.chdir(tmp_path)
+    try:
+        settings.github_repository = "owner/repo"
+        settings.pull_request_number = 42
+        settings.github_token = "ghs_mock"
+        settings.openai_api_key = "sk-mock"
+        settings.review_mode = "comment"
+        settings.include_globs = []
+        settings.exclude_globs = []
+        monkeypatch.setattr(settings, "github_api_url", base_url)
+        monkeypatch.setattr(settings, "enable_auto_labels", False)
+        monkeypatch.setattr(settings, "scope_context", True)
+        monkeypatch.setattr(settings, "blob_cache_dir", str(tmp_path / "blobs"))
+        monkeypatch.setattr(
+            LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+        )
+        assert asyncio.run(cli.main()) == 0
+    finally:
+        server.should_exit = True
+
+    assert fake.requests["get_blob"] == 1
+    assert "[lines 8-16]" in prompts[0]
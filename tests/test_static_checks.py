@@ -0,0 +1,157 @@
+import asyncio
+import json
+from pathlib import Path
+
+import app.cli_review as cli
+from app.diff_slimmer import slim_patch_to_changed
+from app.review_strategy import build_llm_prompt_from_patches
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from app.static_checks import check_patch, run_static_checks
+
+
+def test_rules_fire_on_added_code_only():
+    patch = (
+        "@@ -10,3 +10,6 @@ def handler(req):\n"
+        " ctx = 1\n"
+        "-old = run(req)\n"
+        "+out = eval(req.body)  # eval( in the comment is ignored\n"
+        "+subprocess.run(cmd, shell=True)\n"
+        '+msg = "call eval(x) later"\n'
+        '+API_KEY = "sk-live-1234567890"\n'
+        " tail = 2\n"
+    )
+    found, needs_llm = check_patch("app/h.py", patch)
+    assert [(c["rule"], c["line"], c["severity"]) for c in found] == [
+        ("py-eval", 11, "high"),
+        ("py-shell", 12, "high"),
+        ("hardcoded-secret", 14, "medium"),
+    ]
+    # The string-literal line is neither flagged nor clean
+    assert needs_llm
+
+    js = "@@ -1 +1,3 @@\n-let a = 1\n+var a = 1\n+if (a == b && c !== d) {}"
+    found, _ = check_patch("web/x.tsx", js)
+    assert [c["rule"] for c in found] == ["js-var", "js-eqeq"]
+
+
+def test_secret_rule_skips_key_names_and_plain_words():
+    patch = (
+        "@@ -1 +1,5 @@\n"
+        '+token_type = "bearer"\n'
+        '+password_field = "password"\n'
+        '+secret_name = "prod-db"\n'
+        '+DB_PASSWORD = "hunter2hunter2"\n'
+        '+api_key: "AKIA1234567890ABCD"'
+    )
+    found, needs_llm = check_patch("conf/app.yml", patch)
+    assert [(c["rule"], c["line"]) for c in found] == [
+        ("hardcoded-secret", 4),
+        ("hardcoded-secret", 5),
+    ]
+    # A secret-looking line is still a guess: the model looks at it too
+    assert needs_llm
+    assert check_patch("app/k.py", '@@ -1 +1 @@\n+KEY_TOKEN = "abc123def456"')[1]
+
+
+def test_comment_detection_follows_the_language():
+    # Python unpacking, C preprocessor lines and pointer writes are code
+    assert check_patch("app/f.py", "@@ -1 +1 @@\n+f(*args, **kwargs)")[1]
+    assert check_patch("src/m.c", "@@ -1 +1,2 @@\n+#include <x.h>\n+*ptr = 0;")[1]
+    # Inside a JS block comment, even a bare "*" line and an eval( mention are prose
+    js = "@@ -1 +1,4 @@\n+/**\n+ * Never eval(input).\n+ */\n+// done"
+    assert check_patch("web/a.js", js) == ([], False)
+    # ... but a "*" line outside one is code
+    assert check_patch("web/a.js", "@@ -1 +1 @@\n+* 2")[1]
+
+
+def test_lines_are_numbered_on_the_slimmed_patch():
+    raw = "@@ -1,5 +1,5 @@\n a\n b\n c\n-d\n+eval(d)\n e"
+    # Slimming drops the context above the change but keeps exact line numbers
+    slimmed = slim_patch_to_changed(raw, ctx=1, trailing_newline=False)
+    assert check_patch("app/a.py", slimmed)[0][0]["line"] == 4
+
+
+def test_clean_and_fully_flagged_patches_skip_the_llm():
+    patches = [
+        {"filename": "docs/guide.md", "patch": "@@ -1 +1 @@\n-Helo\n+Hello"},
+        {"filename": "app/a.py", "patch": "@@ -1 +1,2 @@\n ctx\n+eval(data)"},
+        {"filename": "app/b.py", "patch": "@@ -1 +1,2 @@\n ctx\n+# just a comment\n"},
+        {"filename": "app/c.py", "patch": "@@ -1 +1,3 @@\n ctx\n+exec(s)\n+y = f(s)"},
+        {"filename": "app/d.py", "patch": "@@ -1,2 +1 @@\n ctx\n-check(user)"},
+    ]
+    parsed, checked, remaining = run_static_checks(patches)
+    assert [p["filename"] for p in remaining] == ["app/c.py", "app/d.py"]
+    assert [p["filename"] for p in checked] == [
+        "docs/guide.md",
+        "app/a.py",
+        "app/b.py",
+        "app/c.py",
+    ]
+    assert [f["filename"] for f in parsed["files"]] == ["app/a.py", "app/c.py"]
+    assert "3 patch(es)" in parsed["summary_markdown"]
+
+    # The model is told what is already reported
+    _, user = build_llm_prompt_from_patches(remaining[:1])
+    assert "line 2: Avoid exec/eval on untrusted input." in user
+
+    _, _, remaining = run_static_checks(patches, skip_llm=False)
+    assert len(remaining) == len(patches)
+
+
+def test_static_findings_are_posted_without_an_llm_call(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 50
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "review"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_inline_comments = 5
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "static_checks", True)
+    monkeypatch.setattr(settings, "severity_gate", "high")
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": "app/a.py", "patch": "@@ -4 +4,2 @@\n ctx\n+eval(data)"},
+            {"filename": "README.md", "patch": "@@ -1 +1 @@\n-Helo\n+Hello"},
+        ]
+
+    reviews = []
+
+    async def fake_create_review(self, repo, pull_number, body, comments, event):
+        reviews.append({"event": event, "comments": comments})
+        return {"id": len(reviews)}
+
+    def no_llm(self, patches, system, user):
+        raise AssertionError("the LLM must not be called")
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(cli.GitHubReviewsClient, "create_review", fake_create_review)
+    monkeypatch.setattr(LLMClient, "review_patches_json", no_llm)
+
+    assert asyncio.run(cli.main()) == 0
+    assert reviews == [
+        {
+            "event": "REQUEST_CHANGES",
+            "comments": [
+                {
+                    "path": "app/a.py",
+                    "side": "RIGHT",
+                    "line": 5,
+                    "body": "Avoid exec/eval on untrusted input.",
+                }
+            ],
+        }
+    ]
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert [b["static"] for b in report["batches"]] == [True]
+    assert report["batches"][0]["files_in_batch"] == ["app/a.py", "README.md"]
@@ -0,0 +1,86 @@
+from app import structural_slimmer
+from app.inline_mapper import commentable_lines
+from app.structural_slimmer import register_slimmer, slim_python_patch, slimmer_for
+
+PATCH = """@@ -10,20 +10,21 @@ class Store:
+     def load(
+         self,
+         path,
+     ) -> dict:
+         a = 1
+         b = 2
+         c = 3
+         d = 4
+         e = 5
+-        f = 6
++        f = 7
++        g = 8
+         h = 9
+         i = 10
+         j = 11
+         k = 12
+         l = 13
+         m = 14
+     def save(self):
+         x = 1
+         y = 2
+-        z = 3
++        z = 4"""
+
+
+def test_keeps_enclosing_signatures_and_exact_line_numbers():
+    out = slim_python_patch(PATCH, ctx=1)
+    assert out.split("\n")[:5] == [
+        "@@ -10,4 +10,4 @@ class Store:",
+        "     def load(",
+        "         self,",
+        "         path,",
+        "     ) -> dict:",
+    ]
+    assert "@@ -18,3 +18,4 @@ def load(" in out
+    assert "@@ -26 +27 @@ class Store:\n     def save(self):" in out
+    assert "         a = 1" not in out and "         l = 13" not in out
+    # Every kept line keeps its real new-file number
+    assert sorted(commentable_lines(out)) == [
+        *range(10, 14),
+        *range(18, 22),
+        27,
+        29,
+        30,
+    ]
+
+
+def test_def_inside_a_string_is_not_a_signature():
+    patch = '@@ -1,6 +1,6 @@\n DOC = """\n def fake():\n """\n x = 1\n-y = 2\n+y = 3'
+    out = slim_python_patch(patch, ctx=1)
+    assert out == "@@ -4,2 +4,2 @@\n x = 1\n-y = 2\n+y = 3"
+
+
+def test_marker_hunks_and_context_only_hunks_are_dropped():
+    patch = "@@ -1,2 +1,2 @@\n x = 1  # no-ai-review\n-y\n+z\n@@ -9 +9 @@\n ctx"
+    assert slim_python_patch(patch, ctx=1, marker="no-ai-review") == ""
+
+
+def test_slimmers_are_registered_per_language(monkeypatch):
+    monkeypatch.setattr(
+        structural_slimmer, "_SLIMMERS", dict(structural_slimmer._SLIMMERS)
+    )
+    assert slimmer_for("pkg/mod.py") is slim_python_patch
+    assert slimmer_for("web/app.ts") is None
+
+    def keep_all(patch, ctx, marker):
+        return patch
+
+    register_slimmer("TypeScript", keep_all)
+    assert slimmer_for("web/app.ts") is keep_all
+
+
+def test_added_file_keeps_an_empty_old_range():
+    body = [f"+x{i} = {i}" for i in range(1, 13)]
+    out = slim_python_patch("@@ -0,0 +1,12 @@\n" + "\n".join(body), ctx=1)
+    assert out.split("\n")[0] == "@@ -0,0 +1,12 @@"
+    assert sorted(commentable_lines(out)) == list(range(1, 13))
+
+    # A deleted file's empty new range at the start stays "+0,0" too
+    gone = slim_python_patch("@@ -1,2 +0,0 @@\n-a = 1\n-b = 2", ctx=1)
+    assert gone.split("\n")[0] == "@@ -1,2 +0,0 @@"
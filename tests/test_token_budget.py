@@ -0,0 +1,143 @@
+import asyncio
+
+import app.cli_review as cli
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from app.token_budget import max_tokens_for_batch
+
+
+def test_budget_grows_with_batch_and_is_clamped(monkeypatch):
+    monkeypatch.setattr(settings, "adaptive_max_tokens", True)
+    monkeypatch.setattr(settings, "max_tokens_floor", 500)
+    monkeypatch.setattr(settings, "max_tokens_ceiling", 4000)
+    monkeypatch.setattr(settings, "max_inline_comments", 12)
+
+    tiny = [{"filename": "a.py", "patch": "@@ -1 +1 @@\n+x\n"}]
+    big = [
+        {"filename": f"f{i}.py", "patch": "@@ -1,50 +1,50 @@\n" + "+y\n" * 50}
+        for i in range(8)
+    ]
+    huge = big * 20
+
+    assert max_tokens_for_batch(tiny) == 500
+    assert 500 < max_tokens_for_batch(big) <= 4000
+    assert max_tokens_for_batch(huge) == 4000
+
+    monkeypatch.setattr(settings, "adaptive_max_tokens", False)
+    assert max_tokens_for_batch(big) == settings.openai_max_tokens
+
+
+def test_truncated_batch_is_split_and_retried(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 26
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 10000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "split_batches_on_truncation", True)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {"filename": "app/a.py", "patch": "@@ -1 +1 @@\n+a = 1\n"},
+            {"filename": "app/b.py", "patch": "@@ -1 +1 @@\n+b = 2\n"},
+        ]
+
+    posted = []
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        posted.append(body)
+        return {"id": 1}
+
+    calls = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        calls.append([p["filename"] for p in patches])
+        if len(patches) > 1:
+            return {"text": '{"summary_markdown": "cut', "finish_reason": "length"}
+        return {
+            "text": '{"summary_markdown":"ok","decision":"comment","files":[]}',
+            "finish_reason": "stop",
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        GitHubClient, "post_issue_comment", fake_post_issue_comment, raising=True
+    )
+    monkeypatch.setattr(
+        LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+    )
+
+    rc = asyncio.run(cli.main())
+    assert rc == 0
+    # Halves are retried concurrently, so only the first call order is fixed
+    assert calls[0] == ["app/a.py", "app/b.py"]
+    assert sorted(calls[1:]) == [["app/a.py"], ["app/b.py"]]
+    # Only the two retried halves are posted, as parts of the original batch
+    assert len(posted) == 2
+    assert sorted(b for p in posted for b in ("part 1/2", "part 2/2") if b in p) == [
+        "part 1/2",
+        "part 2/2",
+    ]
+    assert all("(batch 1/1, part" in p for p in posted)
+
+
+def test_truncated_single_file_is_split_by_hunks(monkeypatch):
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 26
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 10000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "split_batches_on_truncation", True)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return [
+            {
+                "filename": "app/a.py",
+                "patch": "@@ -1 +1 @@\n+a = 1\n@@ -40 +40 @@\n+b = 2\n",
+            },
+            {"filename": "app/one.py", "patch": "@@ -1 +1 @@\n+c = 3\n"},
+        ]
+
+    posted = []
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        posted.append(body)
+        return {"id": 1}
+
+    calls = []
+
+    def fake_review_patches_json(self, patches, system, user):
+        calls.append(tuple(p.get("part") for p in patches))
+        # Cut off whenever both of a.py's hunks, or one.py, are in the prompt
+        if ("+a = 1" in user and "+b = 2" in user) or "+c = 3" in user:
+            return {"text": '{"summary_markdown": "cut', "finish_reason": "length"}
+        return {
+            "text": '{"summary_markdown":"ok","decision":"comment","files":[]}',
+            "finish_reason": "stop",
+        }
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files, raising=True)
+    monkeypatch.setattr(
+        GitHubClient, "post_issue_comment", fake_post_issue_comment, raising=True
+    )
+    monkeypatch.setattr(
+        LLMClient, "review_patches_json", fake_review_patches_json, raising=True
+    )
+
+    assert asyncio.run(cli.main()) == 0
+    # The pair is halved, then a.py's two hunks are retried as parts 1/2 and 2/2
+    assert sorted(c for c in calls if None not in c) == [(1,), (2,)]
+    # one.py has a single hunk: posted as is, flagged as partially reviewed
+    partial = [p for p in posted if "partially reviewed" in p]
+    assert len(posted) == 3
+    assert len(partial) == 1 and "`app/one.py`" in partial[0]
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from pathlib import Path
+
+import app.cli_review as cli
+import app.services.llm as llm_module
+from app.settings import settings
+from app.services.github import GitHubClient
+from app.services.llm import LLMClient
+from app.services.llm_backends import FakeLLMBackend
+from app.triage import TriageCache, parse_verdicts, triage_patches
+
+PATCHES = [
+    {"filename": "app/run.py", "patch": "@@ -1 +1,2 @@\n ctx\n+eval(user_input)"},
+    {"filename": "README.md", "patch": "@@ -1 +1 @@\n-Hello\n+Hello, world"},
+    {"filename": "config.yml", "patch": "@@ -1 +1 @@\n-retries: 2\n+retries: 3"},
+]
+
+
+class RecordingBackend(FakeLLMBackend):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.models = []
+
+    def complete(self, model, system, user, max_tokens, temperature):
+        self.models.append(model)
+        return super().complete(model, system, user, max_tokens, temperature)
+
+
+def test_trivial_patches_are_dropped_and_verdicts_cached(tmp_path: Path):
+    backend = RecordingBackend()
+    llm = LLMClient(api_key="", model="big", backend=backend)
+    cache_dir = str(tmp_path / "triage")
+
+    review, trivial = asyncio.run(
+        triage_patches(llm, PATCHES, "small", TriageCache(cache_dir), max_chars=80)
+    )
+    assert [p["filename"] for p in review] == ["app/run.py"]
+    assert [p["filename"] for p in trivial] == ["README.md", "config.yml"]
+    # Chunked by patch size, all on the triage model
+    assert backend.models == ["small", "small"]
+
+    # A later run with the same patches asks nothing; an edited patch is re-triaged
+    edited = [*PATCHES[:2], dict(PATCHES[2], patch=PATCHES[2]["patch"] + "\n+x: 1")]
+    review, trivial = asyncio.run(
+        triage_patches(llm, edited, "small", TriageCache(cache_dir))
+    )
+    assert len(backend.models) == 3
+    assert [p["filename"] for p in review] == ["app/run.py"]
+
+
+def test_oversized_patches_are_reviewed_without_asking():
+    backend = RecordingBackend()
+    llm = LLMClient(api_key="", model="big", backend=backend)
+    review, trivial = asyncio.run(
+        triage_patches(llm, PATCHES[1:2], "small", TriageCache(), max_chars=10)
+    )
+    assert review == PATCHES[1:2] and trivial == []
+    assert backend.models == []
+
+
+def test_unclear_answers_fall_back_to_review():
+    assert parse_verdicts("not json", 2) == {}
+    assert parse_verdicts(
+        '{"verdicts": {"1": "TRIVIAL", "2": "maybe", "7": "trivial", "x": "review"}}',
+        2,
+    ) == {1: "trivial"}
+
+    llm = LLMClient(api_key="", model="big", backend=FakeLLMBackend(mode="malformed"))
+    review, trivial = asyncio.run(triage_patches(llm, PATCHES, "small", TriageCache()))
+    assert review == PATCHES and trivial == []
+
+
+def test_only_flagged_patches_reach_the_review_model(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 49
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    settings.max_files = 5
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "llm_backend", "fake")
+    monkeypatch.setattr(settings, "openai_model", "big")
+    monkeypatch.setattr(settings, "triage_model", "small")
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+
+    backend = RecordingBackend()
+    monkeypatch.setattr(llm_module, "make_backend", lambda *a, **k: backend)
+    prompts = []
+    real_review = LLMClient.review_patches_json
+
+    def spy_review(self, patches, system, user):
+        prompts.append([p["filename"] for p in patches])
+        return real_review(self, patches, system, user)
+
+    async def fake_list_pr_files(self, repo, pr):
+        return PATCHES
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", spy_review)
+
+    assert asyncio.run(cli.main()) == 0
+    assert backend.models == ["small", "big"]
+    assert prompts == [["app/run.py"]]
+    report = json.loads((tmp_path / cli.REPORT_FILE).read_text("utf-8"))
+    assert report["triaged_trivial"] == ["README.md", "config.yml"]
+    assert report["overall_event"] == "REQUEST_CHANGES"
+
+
+def test_budget_freed_by_trivial_patches_is_backfilled(monkeypatch, tmp_path: Path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    settings.github_repository = "owner/repo"
+    settings.pull_request_number = 49
+    settings.github_token = "ghs_mock"
+    settings.openai_api_key = "sk-mock"
+    settings.review_mode = "comment"
+    settings.include_globs = []
+    settings.exclude_globs = []
+    # Room for two of the three files only
+    settings.max_files = 2
+    settings.max_total_patch_chars = 5000
+    settings.max_patch_chars = 2000
+    monkeypatch.setattr(settings, "llm_backend", "fake")
+    monkeypatch.setattr(settings, "triage_model", "small")
+    monkeypatch.setattr(settings, "triage_cache_dir", "")
+    monkeypatch.setattr(settings, "prioritize_files", False)
+    monkeypatch.setattr(settings, "update_existing_comments", False)
+    monkeypatch.setattr(settings, "enable_auto_labels", False)
+    files = [
+        PATCHES[1],
+        {"filename": "app/a.py", "patch": "@@ -1 +1,2 @@\n ctx\n+eval(a)"},
+        {"filename": "app/b.py", "patch": "@@ -1 +1,2 @@\n ctx\n+eval(b)"},
+    ]
+    prompts = []
+
+    def spy_review(self, patches, system, user):
+        prompts.extend(p["filename"] for p in patches)
+        return {"text": '{"summary_markdown":"ok","decision":"comment","files":[]}'}
+
+    async def fake_list_pr_files(self, repo, pr):
+        return files
+
+    async def fake_post_issue_comment(self, repo, issue_number, body):
+        return {"id": 1}
+
+    monkeypatch.setattr(GitHubClient, "list_pr_files", fake_list_pr_files)
+    monkeypatch.setattr(GitHubClient, "post_issue_comment", fake_post_issue_comment)
+    monkeypatch.setattr(LLMClient, "review_patches_json", spy_review)
+
+    assert asyncio.run(cli.main()) == 0
+    # The trivial README no longer takes one of the two slots
+    assert prompts == ["app/a.py", "app/b.py"]
@@ -2,10 +2,14 @@
 import json
 import os
 from pathlib import Path
+from typing import Dict, List, Set, Tuple
 
+from app.live_summary import batch_section
+from app.report_stream import REPORT_STREAM_FILE, read_report_stream
 from app.settings import settings
 
 REPORT = Path(".review_report.json")
+REPORT_STREAM = Path(REPORT_STREAM_FILE)
 
 
 def _read_json_any_encoding(path: Path):
@@ -27,21 +31,73 @@ def _read_json_any_encoding(path: Path):
     return json.loads(raw.decode("utf-8", errors="replace"))
 
 
+def _read_stream(path: Path) -> Tuple[Dict, List[List[str]]]:
+    """
+    Fold a JSON Lines report into the legacy top-level fields plus the rendered batch
+    sections, one record at a time. Without a summary record (the run died midway)
+    the outcome and metrics are rolled up from the batches that made it.
+    """
+    data: Dict = {}
+    sections: List[List[str]] = []
+    event = "COMMENT"
+    hist = {"high": 0, "medium": 0, "low": 0}
+    files: Set[str] = set()
+    comments = 0
+    for rec in read_report_stream(str(path)):
+        kind = rec.get("type")
+        if kind == "batch":
+            if rec.get("event") == "REQUEST_CHANGES":
+                event = "REQUEST_CHANGES"
+            m = rec.get("metrics", {})
+            for k, v in m.get("severity_histogram", {}).items():
+                hist[k] = hist.get(k, 0) + v
+            files.update(rec.get("files_in_batch", []))
+            comments += m.get("comments_count", 0)
+            # The final count is only known from the summary; filled in below
+            sections.append(batch_section(rec, "{total}"))
+        elif kind == "run":
+            data["live_summary"] = rec.get("live_summary", False)
+        elif kind == "summary":
+            data.update(rec)
+    if "overall_event" not in data:
+        data["overall_event"] = event
+        data["incomplete"] = True
+        data["metrics"] = {
+            "overall_severity_histogram": hist,
+            "overall_files_reviewed": len(files),
+            "overall_comments": comments,
+        }
+    total = str(data.get("total_batches") or len(sections))
+    for sec in sections:
+        sec[0] = sec[0].replace("{total}", total)
+    return data, sections
+
+
 def main() -> int:
     if not settings.enable_job_summary:
         print("Job summary disabled via settings.enable_job_summary.")
         return 0
 
-    if not REPORT.exists():
+    if REPORT_STREAM.exists():
+        # Written by the bot itself: plain UTF-8, read line by line
+        try:
+            data, sections = _read_stream(REPORT_STREAM)
+        except Exception as e:
+            print(f"Could not read/parse {REPORT_STREAM}: {e}")
+            return 0
+    elif REPORT.exists():
+        try:
+            data = _read_json_any_encoding(REPORT)
+        except Exception as e:
+            print(f"Could not read/parse .review_report.json: {e}")
+            return 0
+        sections = [
+            batch_section(b, b.get("total_batches")) for b in data.get("batches", [])
+        ]
+    else:
         print("No .review_report.json found; nothing to summarize.")
         return 0
 
-    try:
-        data = _read_json_any_encoding(REPORT)
-    except Exception as e:
-        print(f"Could not read/parse .review_report.json: {e}")
-        return 0
-
     overall = data.get("overall_event", "COMMENT")
     metrics = data.get("metrics", {})
     hist = metrics.get("overall_severity_histogram", {})
@@ -55,6 +111,37 @@ def main() -> int:
     lines.append("")
     status_emoji = "✅" if overall == "COMMENT" else "❌"
     lines.append(f"**Outcome:** {status_emoji} `{overall}`")
+    fail_fast = data.get("fail_fast")
+    if fail_fast:
+        lines.append("")
+        lines.append(
+            f"_Fail-fast: the severity gate tripped in batch {fail_fast.get('after_batch')}; "
+            f"{fail_fast.get('skipped_batches')} remaining batch(es) were not reviewed._"
+        )
+    trivial = data.get("triaged_trivial") or []
+    if trivial:
+        lines.append("")
+        lines.append(
+            f"_Triage skipped {len(trivial)} trivial file(s): `{', '.join(trivial)}`_"
+        )
+    budget_skipped = data.get("budget_skipped") or []
+    if budget_skipped:
+        lines.append("")
+        lines.append(
+            f"_Over the review budget ({len(budget_skipped)} file(s) skipped or cut short):_"
+        )
+        for item in budget_skipped:
+            cut = (
+                f" — {item['parts_dropped']}/{item['parts']} part(s) not reviewed"
+                if item.get("parts")
+                else ""
+            )
+            lines.append(f"- `{item['filename']}`: {item['reason']}{cut}")
+    if data.get("incomplete"):
+        lines.append("")
+        lines.append(
+            "_The review did not finish; showing the batches completed so far._"
+        )
     lines.append("")
     lines.append("## Metrics")
     lines.append("")
@@ -64,23 +151,14 @@ def main() -> int:
         f"| {files_reviewed} | {comments} | {hist.get('high',0)} | {hist.get('medium',0)} | {hist.get('low',0)} |"
     )
     lines.append("")
-    lines.append("## Batches")
-    lines.append("")
-    for b in data.get("batches", []):
-        lines.append(f"### Batch {b.get('batch')}/{b.get('total_batches')}")
-        lines.append(f"- **Event:** `{b.get('event')}`")
-        files_list = ", ".join(b.get("files_in_batch", [])) or "—"
-        lines.append(f"- **Files:** `{files_list}`")
-        m = b.get("metrics", {})
-        sh = m.get("severity_histogram", {})
-        lines.append(
-            f"- **Severities:** high={sh.get('high',0)}, medium={sh.get('medium',0)}, low={sh.get('low',0)}"
-        )
-        excerpt = (b.get("summary_excerpt") or "").strip()
-        if excerpt:
-            lines.append("")
-            lines.append("> " + excerpt.replace("\n", "\n> "))
-            lines.append("")
+    if data.get("live_summary"):
+        # cli_review already appended each batch's section while it ran
+        lines.append(f"_{len(sections)} batch(es) reviewed; details streamed above._")
+    else:
+        lines.append("## Batches")
+        lines.append("")
+        for sec in sections:
+            lines.extend(sec)
     lines.append("")
     lines.append(
         "_Tip: tune gates/filters in `.gpt-pr-bot.yml` or `.gpt-pr-bot-ignore`._"
@@ -89,7 +167,9 @@ def main() -> int:
     summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
     md = "\n".join(lines)
     if summary_path:
-        Path(summary_path).write_text(md, encoding="utf-8")
+        # Append: the review step may already have streamed batch sections here
+        with open(summary_path, "a", encoding="utf-8") as f:
+            f.write(md + "\n")
     else:
         # Fallback to stdout if not running in Actions
         print(md)
@@ -0,0 +1,365 @@
+# tools/fake_github.py
+"""
+Offline stand-in for the parts of the GitHub REST API the bot uses:
+the authenticated user, paginated PR files, git blobs, issue comments
+(list/create/edit), PR reviews (create/list/edit/delete pending) and their
+comments, and labels.
+
+In-process:
+    fake = FakeGitHub()
+    fake.add_pr("owner/repo", 1, files=[{"filename": "a.py", "patch": "..."}])
+    # a file's "contents" become a blob; its "sha" is set like the real API's
+    transport = httpx.ASGITransport(app=create_app(fake))
+    gh = GitHubClient(token="x", base_url="http://fake", transport=transport)
+
+On localhost (then set GITHUB_API_URL=http://127.0.0.1:8765):
+    uv run python -m tools.fake_github --port 8765 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.inline_mapper import commentable_lines
+
+
+class FakeGitHub:
+    """State + fault injection shared by all routes of the fake server."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: int = 5000,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        login: str = "github-actions[bot]",
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._failures: Dict[str, List[int]] = {}
+        self.prs: Dict[str, Dict] = {}
+        self.blobs: Dict[str, bytes] = {}
+        self.requests: Counter = Counter()  # route -> count
+        self._next_id = 1000
+        self.login = login  # author of everything posted through the fake
+
+    # --- setup -------------------------------------------------------------
+    def add_blob(self, contents: str) -> str:
+        """Store file contents as a blob; returns its git blob SHA."""
+        data = contents.encode("utf-8")
+        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+        self.blobs[sha] = data
+        return sha
+
+    def add_pr(self, repo: str, number: int, files: List[Dict]) -> Dict:
+        files = [
+            {k: v for k, v in f.items() if k != "contents"}
+            | ({"sha": self.add_blob(f["contents"])} if "contents" in f else {})
+            for f in files
+        ]
+        pr = {"files": files, "comments": [], "reviews": [], "labels": []}
+        self.prs[f"{repo}#{number}"] = pr
+        return pr
+
+    def pr(self, repo: str, number: int) -> Dict:
+        return self.prs.setdefault(
+            f"{repo}#{number}",
+            {"files": [], "comments": [], "reviews": [], "labels": []},
+        )
+
+    def fail_next(self, route: str, status: int = 500, times: int = 1) -> None:
+        """Make the next `times` calls to `route` (e.g. "create_review") return `status`."""
+        self._failures.setdefault(route, []).extend([status] * times)
+
+    def new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    # --- per-request gate ---------------------------------------------------
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Used": str(self.rate_limit - max(0, self.remaining)),
+        }
+
+    async def gate(self, route: str) -> Optional[JSONResponse]:
+        """Count, delay and possibly fail a request; returns an error response or None."""
+        self.requests[route] += 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        self.remaining -= 1
+        if self.remaining < 0:
+            return JSONResponse(
+                {"message": "API rate limit exceeded"},
+                status_code=403,
+                headers={**self._rate_headers(), "Retry-After": "60"},
+            )
+        queued = self._failures.get(route)
+        if queued:
+            status = queued.pop(0)
+            return JSONResponse(
+                {"message": f"Injected failure ({status})"},
+                status_code=status,
+                headers=self._rate_headers(),
+            )
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return JSONResponse(
+                {"message": "Server Error"},
+                status_code=502,
+                headers=self._rate_headers(),
+            )
+        return None
+
+    def ok(
+        self, payload, status: int = 200, headers: Optional[Dict] = None
+    ) -> JSONResponse:
+        return JSONResponse(
+            payload,
+            status_code=status,
+            headers={**self._rate_headers(), **(headers or {})},
+        )
+
+
+def create_app(fake: FakeGitHub) -> FastAPI:
+    app = FastAPI(title="Fake GitHub API")
+
+    @app.get("/user")
+    async def get_user():
+        if err := await fake.gate("get_user"):
+            return err
+        return fake.ok({"login": fake.login})
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/files")
+    async def list_files(
+        owner: str, name: str, number: int, per_page: int = 30, page: int = 1
+    ):
+        if err := await fake.gate("list_pr_files"):
+            return err
+        files = fake.pr(f"{owner}/{name}", number)["files"]
+        per_page = max(1, min(per_page, 100))
+        chunk = files[(page - 1) * per_page : page * per_page]
+        return fake.ok(chunk)
+
+    @app.get("/repos/{owner}/{name}/git/blobs/{sha}")
+    async def get_blob(owner: str, name: str, sha: str):
+        if err := await fake.gate("get_blob"):
+            return err
+        if sha not in fake.blobs:
+            return fake.ok({"message": "Not Found"}, status=404)
+        content = base64.b64encode(fake.blobs[sha]).decode("ascii")
+        return fake.ok({"sha": sha, "encoding": "base64", "content": content})
+
+    @app.get("/repos/{owner}/{name}/issues/{number}/comments")
+    async def list_comments(
+        owner: str, name: str, number: int, per_page: int = 30, page: int = 1
+    ):
+        if err := await fake.gate("list_issue_comments"):
+            return err
+        comments = fake.pr(f"{owner}/{name}", number)["comments"]
+        per_page = max(1, min(per_page, 100))
+        return fake.ok(comments[(page - 1) * per_page : page * per_page])
+
+    @app.post("/repos/{owner}/{name}/issues/{number}/comments")
+    async def post_comment(owner: str, name: str, number: int, request: Request):
+        if err := await fake.gate("post_issue_comment"):
+            return err
+        data = await request.json()
+        comment = {
+            "id": fake.new_id(),
+            "body": data.get("body", ""),
+            "user": {"login": fake.login},
+        }
+        fake.pr(f"{owner}/{name}", number)["comments"].append(comment)
+        return fake.ok(comment, status=201)
+
+    @app.patch("/repos/{owner}/{name}/issues/comments/{comment_id}")
+    async def update_comment(owner: str, name: str, comment_id: int, request: Request):
+        if err := await fake.gate("update_issue_comment"):
+            return err
+        data = await request.json()
+        for pr in fake.prs.values():
+            for c in pr["comments"]:
+                if c["id"] == comment_id:
+                    c["body"] = data.get("body", c["body"])
+                    return fake.ok(c)
+        return fake.ok({"message": "Not Found"}, status=404)
+
+    @app.post("/repos/{owner}/{name}/pulls/{number}/reviews")
+    async def create_review(owner: str, name: str, number: int, request: Request):
+        if err := await fake.gate("create_review"):
+            return err
+        data = await request.json()
+        pr = fake.pr(f"{owner}/{name}", number)
+        # Like GitHub: while the user has a pending review no other can be created
+        if any(r["event"] == "PENDING" for r in pr["reviews"]):
+            return fake.ok(
+                {
+                    "message": "Unprocessable Entity",
+                    "errors": [
+                        "User can only have one pending review per pull request"
+                    ],
+                },
+                status=422,
+            )
+        # Like GitHub: one comment on a line outside the diff rejects the whole review
+        patches = {f["filename"]: f.get("patch", "") for f in pr["files"]}
+        for c in data.get("comments", []):
+            if c.get("line") not in commentable_lines(patches.get(c.get("path"), "")):
+                return fake.ok(
+                    {
+                        "message": "Unprocessable Entity",
+                        "errors": ["Line could not be resolved"],
+                    },
+                    status=422,
+                )
+        review = {
+            "id": fake.new_id(),
+            "body": data.get("body", ""),
+            # Without an event GitHub keeps the review as an unpublished draft
+            "event": data.get("event", "PENDING"),
+            "user": {"login": fake.login},
+            "comments": [dict(c, id=fake.new_id()) for c in data.get("comments", [])],
+        }
+        pr["reviews"].append(review)
+        return fake.ok(review)
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/reviews")
+    async def list_reviews(
+        owner: str, name: str, number: int, per_page: int = 30, page: int = 1
+    ):
+        if err := await fake.gate("list_reviews"):
+            return err
+        reviews = [
+            {k: v for k, v in r.items() if k != "comments"}
+            for r in fake.pr(f"{owner}/{name}", number)["reviews"]
+        ]
+        per_page = max(1, min(per_page, 100))
+        return fake.ok(reviews[(page - 1) * per_page : page * per_page])
+
+    @app.put("/repos/{owner}/{name}/pulls/{number}/reviews/{review_id}")
+    async def update_review(
+        owner: str, name: str, number: int, review_id: int, request: Request
+    ):
+        if err := await fake.gate("update_review"):
+            return err
+        data = await request.json()
+        for r in fake.pr(f"{owner}/{name}", number)["reviews"]:
+            if r["id"] == review_id:
+                r["body"] = data.get("body", r["body"])
+                return fake.ok({k: v for k, v in r.items() if k != "comments"})
+        return fake.ok({"message": "Not Found"}, status=404)
+
+    @app.delete("/repos/{owner}/{name}/pulls/{number}/reviews/{review_id}")
+    async def delete_pending_review(owner: str, name: str, number: int, review_id: int):
+        if err := await fake.gate("delete_pending_review"):
+            return err
+        pr = fake.pr(f"{owner}/{name}", number)
+        for r in pr["reviews"]:
+            if r["id"] == review_id:
+                if r["event"] != "PENDING":
+                    return fake.ok(
+                        {"message": "Can not delete a non-pending review"}, status=422
+                    )
+                pr["reviews"].remove(r)
+                return fake.ok(r)
+        return fake.ok({"message": "Not Found"}, status=404)
+
+    @app.get("/repos/{owner}/{name}/pulls/{number}/comments")
+    async def list_review_comments(
+        owner: str, name: str, number: int, per_page: int = 30, page: int = 1
+    ):
+        if err := await fake.gate("list_review_comments"):
+            return err
+        pr = fake.pr(f"{owner}/{name}", number)
+        comments = [c for r in pr["reviews"] for c in r["comments"]]
+        per_page = max(1, min(per_page, 100))
+        return fake.ok(comments[(page - 1) * per_page : page * per_page])
+
+    @app.post("/repos/{owner}/{name}/issues/{number}/labels")
+    async def add_labels(owner: str, name: str, number: int, request: Request):
+        if err := await fake.gate("add_labels"):
+            return err
+        data = await request.json()
+        pr = fake.pr(f"{owner}/{name}", number)
+        for label in data.get("labels", []):
+            if label not in pr["labels"]:
+                pr["labels"].append(label)
+        return fake.ok([{"name": lbl} for lbl in pr["labels"]])
+
+    return app
+
+
+def serve_in_thread(fake: FakeGitHub, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the fake on localhost in a daemon thread (port 0 = any free port).
+    Returns (server, base_url); stop with `server.should_exit = True`.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(fake), host=host, port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    bound = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound}"
+
+
+def main() -> int:
+    import uvicorn
+
+    ap = argparse.ArgumentParser(
+        description="Serve a fake GitHub REST API on localhost."
+    )
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random seconds")
+    ap.add_argument("--rate-limit", type=int, default=5000)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 502s")
+    ap.add_argument(
+        "--fixture",
+        help='JSON file: {"owner/repo#1": [{"filename": ..., "patch": ...}, ...]}',
+    )
+    args = ap.parse_args()
+
+    fake = FakeGitHub(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+    )
+    if args.fixture:
+        with open(args.fixture, "r", encoding="utf-8") as f:
+            for key, files in json.load(f).items():
+                repo, _, number = key.partition("#")
+                fake.add_pr(repo, int(number), files)
+
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="info")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+# tools/findings_query.py
+"""
+Trend queries over the cross-run findings database (settings.findings_db):
+
+    uv run python -m tools.findings_query hot-files --repo owner/repo --limit 20
+    uv run python -m tools.findings_query severity --since 2024-01-01 --bucket week
+    uv run python -m tools.findings_query tokens --json
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List
+
+from app.findings_db import connect, hot_files, severity_trend, tokens_per_pr
+from app.settings import settings
+
+
+def _print_table(rows: List[Dict]) -> None:
+    if not rows:
+        print("(no rows)")
+        return
+    cols = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in cols))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Query the review findings database.")
+    ap.add_argument("--db", default=settings.findings_db or ".review_findings.db")
+    ap.add_argument("--repo", help="owner/name (default: all repos)")
+    ap.add_argument("--since", help="ISO date/time lower bound, e.g. 2024-06-01")
+    ap.add_argument("--json", action="store_true", help="print JSON rows")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    hot = sub.add_parser("hot-files", help="files with the most findings")
+    hot.add_argument("--limit", type=int, default=10)
+    sev = sub.add_parser("severity", help="findings per severity over time")
+    sev.add_argument("--bucket", choices=("day", "week"), default="day")
+    tok = sub.add_parser("tokens", help="LLM tokens per PR")
+    tok.add_argument("--limit", type=int, default=20)
+
+    args = ap.parse_args()
+    if not os.path.exists(args.db):
+        print(f"No findings database at {args.db}.")
+        return 1
+    conn = connect(args.db)
+    try:
+        if args.cmd == "hot-files":
+            rows = hot_files(conn, args.repo, args.since, args.limit)
+        elif args.cmd == "severity":
+            rows = severity_trend(conn, args.repo, args.since, args.bucket)
+        else:
+            rows = tokens_per_pr(conn, args.repo, args.since, args.limit)
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_table(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,318 @@
+# tools/load_test.py
+"""
+End-to-end load test for the review pipeline: drives `app.cli_review.main` over a
+synthetic PR corpus against the offline GitHub (tools/fake_github.py) and LLM
+(llm_backend=fake) stand-ins, then reports throughput, per-stage latency
+percentiles, peak memory and request counts per backend.
+
+    uv run python -m tools.load_test run --shape tiny --prs 20 --out base.json
+    uv run python -m tools.load_test run --shape huge --llm-latency 0.5 --set llm_concurrency=8
+    uv run python -m tools.load_test compare base.json new.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import app.cli_review as cli
+from app.settings import settings
+from tools.fake_github import FakeGitHub, serve_in_thread
+
+REPO = "load/test"
+
+
+# --- synthetic corpora ----------------------------------------------------------
+def _hunk(file_no: int, hunk_no: int, lines: int) -> str:
+    start = 1 + hunk_no * (lines + 20)
+    body = [f" def f{file_no}_{hunk_no}():"]
+    for i in range(lines):
+        if i % 7 == 3:
+            body.append(f"+    print(value_{file_no}_{hunk_no}_{i})")
+        elif i % 11 == 5:
+            body.append(f"+    eval(expr_{file_no}_{hunk_no}_{i})")
+        else:
+            body.append(f"+    total_{file_no}_{hunk_no} += {i}")
+    body.append("     return None")
+    return f"@@ -{start},2 +{start},{lines + 2} @@\n" + "\n".join(body)
+
+
+def _file(path: str, file_no: int, hunks: int, lines: int) -> Dict:
+    patch = "\n".join(_hunk(file_no, h, lines) for h in range(hunks))
+    adds = hunks * lines
+    return {
+        "filename": path,
+        "status": "modified",
+        "additions": adds,
+        "deletions": 0,
+        "changes": adds,
+        "patch": patch,
+    }
+
+
+def shape_tiny(seed: int) -> List[Dict]:
+    """Many tiny files (e.g. a sweeping config change)."""
+    return [_file(f"src/mod_{seed}_{i}.py", i, 1, 3) for i in range(200)]
+
+
+def shape_huge(seed: int) -> List[Dict]:
+    """A few huge files (generated code, migrations)."""
+    return [_file(f"db/migration_{seed}_{i}.py", i, 400, 12) for i in range(3)]
+
+
+def shape_many_batches(seed: int) -> List[Dict]:
+    """Many mid-size files that need several LLM batches."""
+    return [_file(f"app/service_{seed}_{i}.py", i, 20, 6) for i in range(60)]
+
+
+def shape_duplicate(seed: int) -> List[Dict]:
+    """The same edit applied to many files (license header / import swap)."""
+    patch = (
+        "@@ -1,2 +1,2 @@\n-# Copyright 2023 Acme\n+# Copyright 2024 Acme\n import os"
+    )
+    return [
+        {
+            "filename": f"pkg/m_{seed}_{i}.py",
+            "status": "modified",
+            "changes": 2,
+            "patch": patch,
+        }
+        for i in range(300)
+    ]
+
+
+SHAPES: Dict[str, Callable[[int], List[Dict]]] = {
+    "tiny": shape_tiny,
+    "huge": shape_huge,
+    "many_batches": shape_many_batches,
+    "duplicate": shape_duplicate,
+}
+
+
+# --- stats ------------------------------------------------------------------------
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no samples)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "mean": round(sum(samples) / len(samples), 6) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def _coerce(current, raw: str):
+    if isinstance(current, bool):
+        return raw.lower() in ("1", "true", "yes", "on")
+    if isinstance(current, int):
+        return int(raw)
+    if isinstance(current, float):
+        return float(raw)
+    if isinstance(current, list):
+        return [x for x in raw.split(",") if x]
+    return raw
+
+
+# --- runner -----------------------------------------------------------------------
+def run_load(
+    shape: str = "tiny",
+    prs: int = 5,
+    llm_latency: float = 0.0,
+    llm_tokens_per_second: float = 0.0,
+    gh_latency: float = 0.0,
+    overrides: Optional[Dict[str, str]] = None,
+    trace_memory: bool = True,
+    quiet: bool = True,
+) -> Dict:
+    """Review `prs` synthetic PRs of `shape` sequentially and return the metrics."""
+    fake_gh = FakeGitHub(latency=gh_latency, rate_limit=10**9)
+    for n in range(1, prs + 1):
+        fake_gh.add_pr(REPO, n, SHAPES[shape](n))
+    server, base_url = serve_in_thread(fake_gh)
+
+    run_settings = {
+        "github_api_url": base_url,
+        "github_repository": REPO,
+        "github_token": "load-test",
+        "llm_backend": "fake",
+        "fake_llm_latency": llm_latency,
+        "fake_llm_tokens_per_second": llm_tokens_per_second,
+        "include_globs": [],
+        "exclude_globs": [],
+    }
+    for key, raw in (overrides or {}).items():
+        run_settings[key] = _coerce(getattr(settings, key), raw)
+    saved = {k: getattr(settings, k) for k in [*run_settings, "pull_request_number"]}
+
+    stages: Dict[str, List[float]] = {}
+    pr_latency: List[float] = []
+    batches = 0
+    llm_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    peak_bytes = 0
+    old_cwd = os.getcwd()
+    try:
+        for k, v in run_settings.items():
+            setattr(settings, k, v)
+        if trace_memory:
+            tracemalloc.start()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            started = time.perf_counter()
+            for n in range(1, prs + 1):
+                settings.pull_request_number = n
+                if trace_memory:
+                    tracemalloc.reset_peak()
+                t0 = time.perf_counter()
+                out = io.StringIO() if quiet else None
+                with (
+                    contextlib.redirect_stdout(out)
+                    if quiet
+                    else contextlib.nullcontext()
+                ):
+                    asyncio.run(cli.main())
+                pr_latency.append(time.perf_counter() - t0)
+                if trace_memory:
+                    peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+
+                with open(cli.REPORT_FILE, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+                batches += len(report.get("batches", []))
+                for stage, values in (report.get("timings") or {}).items():
+                    stages.setdefault(stage, []).extend(values)
+                for k, v in (report.get("metrics", {}).get("llm_usage") or {}).items():
+                    llm_usage[k] = llm_usage.get(k, 0) + v
+            wall = time.perf_counter() - started
+    finally:
+        os.chdir(old_cwd)
+        if trace_memory:
+            tracemalloc.stop()
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        server.should_exit = True
+
+    return {
+        "shape": shape,
+        "prs": prs,
+        "settings": {k: v for k, v in run_settings.items() if k != "github_api_url"},
+        "wall_s": round(wall, 6),
+        "prs_per_min": round(prs / wall * 60, 3) if wall else 0.0,
+        "batches": batches,
+        "batches_per_min": round(batches / wall * 60, 3) if wall else 0.0,
+        "pr_latency": summarize(pr_latency),
+        "stages": {k: summarize(v) for k, v in sorted(stages.items())},
+        "peak_traced_mb": round(peak_bytes / 2**20, 3),
+        # ru_maxrss is KiB on Linux (bytes on macOS); process-wide high-water mark
+        "max_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 3
+        ),
+        "requests": {"github": dict(fake_gh.requests), "llm": llm_usage},
+    }
+
+
+# --- comparison -------------------------------------------------------------------
+def _flatten(result: Dict) -> Dict[str, float]:
+    flat = {
+        "prs_per_min": result.get("prs_per_min", 0),
+        "batches_per_min": result.get("batches_per_min", 0),
+        "pr_latency.p50": result.get("pr_latency", {}).get("p50", 0),
+        "pr_latency.p95": result.get("pr_latency", {}).get("p95", 0),
+        "peak_traced_mb": result.get("peak_traced_mb", 0),
+    }
+    for stage, s in result.get("stages", {}).items():
+        for p in ("p50", "p95", "p99"):
+            flat[f"stage.{stage}.{p}"] = s.get(p, 0)
+    for backend, counts in result.get("requests", {}).items():
+        for name, v in counts.items():
+            flat[f"requests.{backend}.{name}"] = v
+    return flat
+
+
+def compare(base: Dict, new: Dict) -> List[Dict]:
+    """Per-metric rows {metric, base, new, delta_pct} (delta vs. base)."""
+    a, b = _flatten(base), _flatten(new)
+    rows = []
+    for metric in sorted(set(a) | set(b)):
+        va, vb = a.get(metric, 0), b.get(metric, 0)
+        delta = round((vb - va) / va * 100, 1) if va else None
+        rows.append({"metric": metric, "base": va, "new": vb, "delta_pct": delta})
+    return rows
+
+
+def _print_compare(rows: List[Dict]) -> None:
+    print(f"{'metric':<40} {'base':>12} {'new':>12} {'delta':>9}")
+    for r in rows:
+        delta = "n/a" if r["delta_pct"] is None else f"{r['delta_pct']:+.1f}%"
+        print(f"{r['metric']:<40} {r['base']:>12} {r['new']:>12} {delta:>9}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Load-test the review pipeline offline.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="run a load test")
+    run.add_argument("--shape", choices=sorted(SHAPES), default="tiny")
+    run.add_argument("--prs", type=int, default=5)
+    run.add_argument("--llm-latency", type=float, default=0.0)
+    run.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    run.add_argument("--gh-latency", type=float, default=0.0)
+    run.add_argument(
+        "--no-tracemalloc", action="store_true", help="skip peak-memory tracing"
+    )
+    run.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="settings override, e.g. --set max_files=200",
+    )
+    run.add_argument("--out", help="write results JSON here")
+
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+
+    args = ap.parse_args()
+    if args.cmd == "compare":
+        with (
+            open(args.base, "r", encoding="utf-8") as fa,
+            open(args.new, "r", encoding="utf-8") as fb,
+        ):
+            _print_compare(compare(json.load(fa), json.load(fb)))
+        return 0
+
+    overrides = dict(kv.split("=", 1) for kv in args.set)
+    result = run_load(
+        shape=args.shape,
+        prs=args.prs,
+        llm_latency=args.llm_latency,
+        llm_tokens_per_second=args.llm_tokens_per_second,
+        gh_latency=args.gh_latency,
+        overrides=overrides,
+        trace_memory=not args.no_tracemalloc,
+    )
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())